@@ -0,0 +1,299 @@
+"""
+Pluggable access to the PDM vault and the CAD application.
+
+LogicHandler only talks to a Backend: it connects the vault, finds or starts the
+CAD application, manages COM apartments, builds typed COM arguments and reads the
+registry through it. Two implementations are registered:
+
+    win32com  ConisioLib.EdmVault5 / SldWorks.Application via pywin32 (default)
+    sim       in-process pdm_sim fakes, for benchmarks and CI off Windows
+
+The pywin32 and winreg modules are imported on first use, not at import time.
+Select with set_backend() or the PDM_BACKEND environment variable.
+"""
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Protocol
+
+
+class Vault(Protocol):
+    """The subset of IEdmVault5 used by pdm_logic / pdm_index / pdm_cache."""
+
+    IsLoggedIn: bool
+    RootFolderPath: str
+
+    def LoginAuto(self, vault_name: str, hwnd: int) -> None: ...
+    def CreateSearch(self) -> Any: ...
+    def GetFileFromPath(self, path: str, folder: Any = None) -> Any: ...
+    def GetFolderFromPath(self, path: str) -> Any: ...
+
+
+class CadApp(Protocol):
+    """The subset of ISldWorks used by pdm_logic."""
+
+    Visible: bool
+
+    def OpenDoc6(self, path: str, doc_type: int, options: int, config: str, errors: Any, warnings: Any) -> Any: ...
+    def CloseDoc(self, name: str) -> None: ...
+    def ActivateDoc3(self, name: str, use_user_prefs: bool, option: int, errors: Any) -> Any: ...
+    def GetOpenDocumentNames(self) -> Any: ...
+    def NewDocument(self, template: str, doc_type: int, width: float, height: float) -> Any: ...
+    def GetMathUtility(self) -> Any: ...
+    def RevisionNumber(self) -> str: ...
+
+
+class Backend:
+    """Interface; see Win32ComBackend for the reference implementation."""
+
+    name = "base"
+
+    def connect_vault(self, vault_name):
+        """Logged-in Vault; raises on failure."""
+        raise NotImplementedError
+
+    def get_active_cad_app(self):
+        """Running CadApp; raises if none."""
+        raise NotImplementedError
+
+    def start_cad_app(self):
+        """Start (or attach to) the CadApp; raises on failure."""
+        raise NotImplementedError
+
+    def co_initialize(self):
+        """Enter a COM apartment on the calling thread; returns True if co_uninitialize is needed."""
+        return False
+
+    def co_uninitialize(self):
+        pass
+
+    def variant(self, vt_name, value):
+        """Typed by-ref argument (e.g. OpenDoc6 errors/warnings)."""
+        return value
+
+    def array(self, values, vt_name):
+        """Typed SAFEARRAY argument (e.g. AddComponents3 names/transforms)."""
+        return tuple(values)
+
+    def read_registry_value(self, key_path, name):
+        return ""
+
+    def write_registry_value(self, key_path, name, value):
+        pass
+
+    def marshal(self, obj):
+        """Token that lets another apartment use `obj`; call on the owning thread, unmarshal once."""
+        return obj
+
+    def unmarshal(self, token):
+        return token
+
+    def apartment_event(self):
+        """Event a connection-owning thread waits on (see wait_apartment)."""
+        return threading.Event()
+
+    def signal_event(self, event):
+        event.set()
+
+    def wait_apartment(self, event, timeout):
+        """Wait for `event` or `timeout` while serving calls made into this thread's apartment."""
+        event.wait(timeout)
+        event.clear()
+
+
+class Win32ComBackend(Backend):
+    name = "win32com"
+
+    def __init__(self):
+        self._client = None
+        self._pythoncom = None
+
+    def _modules(self):
+        if self._client is None:
+            import pythoncom
+            import win32com.client
+            self._pythoncom = pythoncom
+            self._client = win32com.client
+        return self._client, self._pythoncom
+
+    def connect_vault(self, vault_name):
+        client, _ = self._modules()
+        try:
+            vault = client.Dispatch("ConisioLib.EdmVault5")
+        except Exception:
+            vault = client.Dispatch("ConisioLib.EdmVault")
+        if not vault.IsLoggedIn:
+            vault.LoginAuto(vault_name, 0)
+        return vault
+
+    def get_active_cad_app(self):
+        client, _ = self._modules()
+        return client.GetActiveObject("SldWorks.Application")
+
+    def start_cad_app(self):
+        client, _ = self._modules()
+        return client.Dispatch("SldWorks.Application")
+
+    def co_initialize(self):
+        try:
+            _, pythoncom = self._modules()
+            pythoncom.CoInitialize()
+            return True
+        except Exception:
+            return False
+
+    def co_uninitialize(self):
+        try:
+            _, pythoncom = self._modules()
+            pythoncom.CoUninitialize()
+        except Exception:
+            pass
+
+    def variant(self, vt_name, value):
+        try:
+            client, pythoncom = self._modules()
+            return client.VARIANT(getattr(pythoncom, vt_name), value)
+        except Exception:
+            return value
+
+    def array(self, values, vt_name):
+        try:
+            client, pythoncom = self._modules()
+            return client.VARIANT(pythoncom.VT_ARRAY | getattr(pythoncom, vt_name), list(values))
+        except Exception:
+            return tuple(values)
+
+    def read_registry_value(self, key_path, name):
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key_path) as key:
+                val, _ = winreg.QueryValueEx(key, name)
+                return val or ""
+        except Exception:
+            return ""
+
+    def write_registry_value(self, key_path, name, value):
+        try:
+            import winreg
+            key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, key_path)
+            winreg.SetValueEx(key, name, 0, winreg.REG_SZ, value or "")
+        except Exception:
+            pass
+
+    def marshal(self, obj):
+        _, pythoncom = self._modules()
+        return pythoncom.CoMarshalInterThreadInterfaceInStream(pythoncom.IID_IDispatch, obj._oleobj_)
+
+    def unmarshal(self, token):
+        client, pythoncom = self._modules()
+        return client.Dispatch(pythoncom.CoGetInterfaceAndReleaseStream(token, pythoncom.IID_IDispatch))
+
+    def apartment_event(self):
+        import win32event
+        return win32event.CreateEvent(None, 0, 0, None)
+
+    def signal_event(self, event):
+        import win32event
+        win32event.SetEvent(event)
+
+    def wait_apartment(self, event, timeout):
+        # STA sahibi iş parçacığı: başka apartmanlardan gelen çağrılar mesaj olarak gelir
+        import win32event
+        _, pythoncom = self._modules()
+        win32event.MsgWaitForMultipleObjects([event], False, int(timeout * 1000), win32event.QS_ALLINPUT)
+        pythoncom.PumpWaitingMessages()
+
+
+class SimBackend(Backend):
+    """
+    pdm_sim fakes. Without arguments a vault with PDM_SIM_PARTS parts (codes
+    100000...) is built in a temporary directory on first use.
+    """
+
+    name = "sim"
+
+    def __init__(self, vault=None, cad_app=None, connect_latency=0.0):
+        self.vault = vault
+        self.cad_app = cad_app
+        self.registry = {}
+        self.lock = threading.Lock()
+        # Dispatch + LoginAuto / GetActiveObject maliyeti (bağlantı havuzu benchmarkı için)
+        self.connect_latency = connect_latency
+        self.connects = 0
+
+    def _connect_cost(self):
+        self.connects += 1
+        if self.connect_latency:
+            time.sleep(self.connect_latency)
+
+    def connect_vault(self, vault_name):
+        self._connect_cost()
+        with self.lock:
+            if self.vault is None:
+                import pdm_sim
+                count = int(os.environ.get("PDM_SIM_PARTS", "1000"))
+                root = tempfile.mkdtemp(prefix="pdm_sim_")
+                self.vault, _ = pdm_sim.build_sap_vault(count, root=root)
+            if not self.vault.IsLoggedIn:
+                self.vault.LoginAuto(vault_name, 0)
+            return self.vault
+
+    def get_active_cad_app(self):
+        self._connect_cost()
+        if self.cad_app is None:
+            raise RuntimeError("Simulated SolidWorks is not running")
+        return self.cad_app
+
+    def start_cad_app(self):
+        self._connect_cost()
+        with self.lock:
+            if self.cad_app is None:
+                import pdm_sim
+                self.cad_app = pdm_sim.SimSldWorks()
+            return self.cad_app
+
+    def read_registry_value(self, key_path, name):
+        return self.registry.get((key_path, name), "")
+
+    def write_registry_value(self, key_path, name, value):
+        self.registry[(key_path, name)] = value or ""
+
+
+BACKENDS = {
+    "win32com": Win32ComBackend,
+    "sim": SimBackend,
+}
+DEFAULT_BACKEND = "win32com"
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def register_backend(name, factory):
+    """Register a Backend factory (class or callable returning a Backend)."""
+    BACKENDS[name] = factory
+
+
+def set_backend(backend):
+    """Use `backend` (a Backend instance or a registered name) process-wide; returns it."""
+    global _backend
+    if isinstance(backend, str):
+        backend = BACKENDS[backend]()
+    with _backend_lock:
+        _backend = backend
+    return backend
+
+
+def get_backend():
+    """Process-wide backend; chosen by PDM_BACKEND on first use (default win32com)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("PDM_BACKEND", DEFAULT_BACKEND)
+            factory = BACKENDS.get(name)
+            if factory is None:
+                print(f"Unknown backend '{name}', using {DEFAULT_BACKEND}", flush=True)
+                factory = BACKENDS[DEFAULT_BACKEND]
+            _backend = factory()
+        return _backend
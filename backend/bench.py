@@ -0,0 +1,1198 @@
+"""
+Offline benchmarks for pdm_logic against the in-process simulator (pdm_sim).
+Runs on any platform; no PDM client, SolidWorks or pywin32 needed.
+
+Usage:
+    python bench.py e2e --sizes 10 100 1000 --output bench.json --baseline bench_prev.json
+    python bench.py search --codes 300 --latency 0.05 --workers 4
+    python bench.py strategy --codes 300 --var "SAP No"
+    python bench.py index --files 30000 --bom 800
+    python bench.py prefetch --codes 100 --download 0.2 --insert 0.1
+    python bench.py open --files 50 --open 0.05 --register 0.1
+    python bench.py components --sizes 50 200 1000
+    python bench.py session --files 200
+    python bench.py insert-strategy --files 100 --apis AddComponent4
+    python bench.py bulk --files 500 --insert 0.02 --component 0.002 --reject 5
+    python bench.py fast --files 200 --redraw 0.01 --rebuild 0.2
+    python bench.py lightweight --files 200 --open 0.02 --require-open AddComponent5
+    python bench.py config-cache --files 200 --open 0.02 --runs 3
+    python bench.py layout --files 1000
+    python bench.py startup --runs 5
+    python bench.py connections --runs 5 --codes 20 --connect 0.3
+    python bench.py events --clients 3 --idle 10 --codes 300
+    python bench.py bus --rate 10000 --seconds 3
+    python bench.py logstore --entries 200000 --capacity 1000 10000
+    python bench.py journal --events 100000 --codes 300
+    python bench.py jobs --jobs 3 --codes 40 --search 0.02 --download 0.05 --component 0.05
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.request
+from queue import Queue
+
+import pdm_cache
+import pdm_index
+import pdm_sim
+from backends import SimBackend
+from connections import ConnectionManager
+from logstore import LogStore
+from journal import RunJournal
+from events import EventBus, EVENT_LOG, EVENT_STATUS, EVENT_PROGRESS, EVENT_STATS
+from pdm_cache import ConfigNameCache
+from pdm_index import VaultIndex
+from layout import GridLayout
+from pdm_logic import LogicHandler, SapSearchStrategy, InsertStrategyMemo, PDM_VAR_NAMES, SW_DOC_PART
+
+
+def make_handler(vault, strategy=None, cache=None, config_cache=None, sw_app=None):
+    handler = LogicHandler(Queue(), Queue(), Queue(), lambda: False, lambda: True, Queue())
+    handler.backend = SimBackend(vault=vault, cad_app=sw_app)
+    handler.search_strategy = strategy or SapSearchStrategy(persist=False)
+    # Kalıcı önbellek/indeks benchmark ölçümlerini bozmasın; istenirse ":memory:" verilir
+    handler.resolution_cache = cache
+    handler.config_cache = config_cache
+    handler.sap_index = None
+    handler.insert_memo = InsertStrategyMemo(persist=False)
+    handler.is_running = True
+    return handler
+
+
+def bench_search(args):
+    vault, codes = pdm_sim.build_sap_vault(args.codes, search_latency=args.latency)
+    # Bulunamayan kodlar tüm değişkenleri ve dosya adı aramasını dener
+    codes += [f"X{i}" for i in range(args.misses)]
+    for workers in (1, args.workers):
+        vault.calls.reset()
+        handler = make_handler(vault)
+        start = time.perf_counter()
+        resolved = list(handler.resolve_codes(codes, vault, workers=workers))
+        elapsed = time.perf_counter() - start
+        assert [code for _, code, _ in resolved] == codes
+        found = sum(1 for _, _, path in resolved if path)
+        print(f"workers={workers:<3} codes={len(codes):<5} found={found:<5} "
+              f"CreateSearch={vault.calls.get('CreateSearch'):<6} time={elapsed:.3f}s")
+
+
+def bench_strategy(args):
+    cases = [
+        ("sabit sıra (eski)", False, SapSearchStrategy(learn=False, persist=False)),
+        ("öğrenen sıralama", False, SapSearchStrategy(persist=False)),
+        ("tek OR sorgusu", True, SapSearchStrategy(persist=False)),
+    ]
+    for label, multi, strategy in cases:
+        vault, codes = pdm_sim.build_sap_vault(args.codes, var_name=args.var, supports_multi_variable=multi)
+        codes += [f"X{i}" for i in range(args.misses)]
+        handler = make_handler(vault, strategy)
+        for code in codes:
+            handler.search_file_in_pdm(vault, code)
+        searches = vault.calls.get("CreateSearch")
+        print(f"{label:<20} codes={len(codes):<5} CreateSearch={searches:<6} per-code={searches / len(codes):.2f}")
+
+
+def bench_index(args):
+    vault, codes = pdm_sim.build_tree_vault(args.files)
+    index = VaultIndex(":memory:")
+
+    start = time.perf_counter()
+    status = index.build(vault, PDM_VAR_NAMES)
+    print(f"tam tarama     files={status['files']:<6} folders={status['folders']:<5} "
+          f"GetVar={vault.calls.get('GetVar'):<6} time={time.perf_counter() - start:.3f}s")
+
+    # %1 dosya yeni sürüm, birkaç dosya silinmiş
+    for path in list(vault.files)[::100]:
+        vault.files[path].CurrentVersion += 1
+    for path in list(vault.files)[1::1000]:
+        vault.remove_file(path)
+    vault.calls.reset()
+    start = time.perf_counter()
+    status = index.build(vault, PDM_VAR_NAMES)
+    print(f"artımlı tarama updated={status['updated']:<5} removed={status['removed']:<4} "
+          f"GetVar={vault.calls.get('GetVar'):<6} time={time.perf_counter() - start:.3f}s")
+
+    bom = codes[::max(1, len(codes) // args.bom)][:args.bom]
+    handler = make_handler(vault)
+    handler.sap_index = index
+    vault.calls.reset()
+    start = time.perf_counter()
+    resolved = list(handler.resolve_codes(bom, vault, workers=1))
+    found = sum(1 for _, _, path in resolved if path)
+    print(f"BOM çözümleme  codes={len(bom):<5} found={found:<5} "
+          f"CreateSearch={vault.calls.get('CreateSearch'):<4} time={time.perf_counter() - start:.3f}s")
+
+
+def bench_prefetch(args):
+    for label in ("seri", "ön-getirme"):
+        root = tempfile.mkdtemp(prefix="pdm_sim_")
+        try:
+            vault, codes = pdm_sim.build_sap_vault(args.codes, search_latency=args.latency, root=root)
+            vault.download_latency = args.download
+            handler = make_handler(vault)
+            start = time.perf_counter()
+            if label == "seri":
+                for code in codes:
+                    path = handler.resolve_sap_code(vault, code)
+                    if path and handler.ensure_local_file(vault, path):
+                        time.sleep(args.insert)
+            else:
+                for _, _, path, is_local in handler.prefetch_files(codes, vault, workers=args.workers):
+                    if is_local:
+                        time.sleep(args.insert)
+            print(f"{label:<11} codes={len(codes):<5} GetFileCopy={vault.calls.get('GetFileCopy'):<5} "
+                  f"time={time.perf_counter() - start:.3f}s")
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_open(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        sw_app = pdm_sim.SimSldWorks(open_latency=args.open, register_latency=args.register)
+        handler = make_handler(None)
+        start = time.perf_counter()
+        for path in paths:
+            handler.open_component_doc(sw_app, path, SW_DOC_PART)
+        elapsed = time.perf_counter() - start
+        waits = list(handler.doc_wait_times.values())
+        fixed = len(paths) * (args.open + 1.5)
+        print(f"files={len(paths):<5} time={elapsed:.3f}s bekleme toplam={sum(waits):.3f}s "
+              f"maks={max(waits):.3f}s | sabit 1.5s ile ~{fixed:.1f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def make_part_files(root, count):
+    paths = []
+    for i in range(count):
+        path = f"{root}/P{100000 + i}.SLDPRT"
+        with open(path, "wb") as f:
+            f.write(b"\0")
+        paths.append(path)
+    return paths
+
+
+def bench_components(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, max(args.sizes))
+        for size in args.sizes:
+            for label in ("GetComponents her eklemede", "bileşen kaydı"):
+                sw_app = pdm_sim.SimSldWorks()
+                handler = make_handler(None)
+                session = handler.init_assembly_doc(sw_app)
+                if label != "bileşen kaydı":
+                    session.registry = None
+                sw_app.calls.reset()
+                start = time.perf_counter()
+                for path in paths[:size]:
+                    handler.add_component_to_assembly(session, path)
+                elapsed = time.perf_counter() - start
+                calls = sw_app.calls.snapshot()
+                print(f"n={size:<5} {label:<27} COM={sum(calls.values()):<8} "
+                      f"GetComponents={calls.get('GetComponents', 0):<5} Name2={calls.get('Name2', 0):<7} "
+                      f"time={elapsed:.3f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_session(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        sw_app = pdm_sim.SimSldWorks()
+        handler = make_handler(None)
+        session = handler.init_assembly_doc(sw_app)
+        sw_app.calls.reset()
+        for path in paths:
+            handler.activate_assembly(session)
+            handler.add_component_to_assembly(session, path)
+        stats = handler.get_debug_stats()
+        print(f"inserts={stats['inserts']} COM/ekleme={stats['com_calls_per_insert']} "
+              f"(sahte SolidWorks sayacı: {sum(sw_app.calls.snapshot().values()) / len(paths):.1f})")
+        print("son ekleme:", ", ".join(f"{k}={v}" for k, v in sorted(stats["last_insert"].items())))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_insert_strategy(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        for label, memo in (("sabit sıra (eski)", InsertStrategyMemo(learn=False, persist=False)),
+                            ("öğrenen sıra", InsertStrategyMemo(persist=False))):
+            sw_app = pdm_sim.SimSldWorks(supported_apis=args.apis)
+            handler = make_handler(None)
+            handler.insert_memo = memo
+            session = handler.init_assembly_doc(sw_app)
+            sw_app.calls.reset()
+            added = sum(1 for path in paths if handler.add_component_to_assembly(session, path))
+            calls = sw_app.calls.snapshot()
+            insert_calls = sum(v for k, v in calls.items() if k in pdm_sim.SIM_INSERT_APIS)
+            print(f"{label:<18} added={added:<5} insert çağrısı={insert_calls:<6} "
+                  f"başarısız={session.failed_insert_calls:<6} ekleme başına={insert_calls / len(paths):.2f}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_bulk(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        # BOM adetleri: her parça art arda --repeat kez eklenir
+        paths = [p for p in paths for _ in range(max(1, args.repeat))]
+        for label in ("tek tek (eski)", "AddComponents3"):
+            sw_app = pdm_sim.SimSldWorks(open_latency=args.open, insert_latency=args.insert,
+                                         component_latency=args.component)
+            sw_app.reject_paths = set(paths[::max(1, len(paths) // args.reject)][:args.reject]) if args.reject else set()
+            handler = make_handler(None)
+            session = handler.init_assembly_doc(sw_app)
+            sw_app.calls.reset()
+            start = time.perf_counter()
+            if label == "AddComponents3":
+                added = handler.insert_components_bulk(session, paths)
+            else:
+                added = 0
+                for path in paths:
+                    handler.activate_assembly(session)
+                    added += bool(handler.add_component_to_assembly(session, path))
+            elapsed = time.perf_counter() - start
+            calls = sw_app.calls.snapshot()
+            positions = {c.transform.position for c in session.assembly_doc.components if c.transform is not None}
+            print(f"{label:<15} added={added:<5} AddComponents3={calls.get('AddComponents3', 0):<4} "
+                  f"OpenDoc6={calls.get('OpenDoc6', 0):<5} ActivateDoc3={calls.get('ActivateDoc3', 0):<5} "
+                  f"COM={sum(calls.values()):<7} farklı konum={len(positions):<5} "
+                  f"bileşen={len(session.assembly_doc.components):<5} başarısız={session.failed_insert_calls:<4} "
+                  f"time={elapsed:.3f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_fast(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        for fast in (False, True):
+            sw_app = pdm_sim.SimSldWorks(insert_latency=args.insert)
+            sw_app.redraw_latency = args.redraw
+            sw_app.rebuild_latency = args.rebuild
+            handler = make_handler(None)
+            session = handler.init_assembly_doc(sw_app)
+            doc = sw_app.docs[session.locked_title]
+            start = time.perf_counter()
+            suspended = 0
+            try:
+                if fast:
+                    handler.suspend_assembly_updates(session)
+                    suspended = len(session.suspended_state or [])
+                for i, path in enumerate(paths):
+                    if i == args.stop_at:
+                        raise RuntimeError("simulated stop")
+                    handler.activate_assembly(session)
+                    handler.add_component_to_assembly(session, path)
+            except RuntimeError:
+                pass
+            finally:
+                handler.restore_assembly_updates(session)
+            elapsed = time.perf_counter() - start
+            restored = doc.updates_enabled() and not sw_app.CommandInProgress
+            print(f"hızlı mod={'açık' if fast else 'kapalı':<6} inserts={session.inserts:<5} "
+                  f"yeniden çizim/oluşturma={doc.rebuilds:<5} kapatılan ayar={suspended} "
+                  f"ayarlar geri yüklendi={restored} time={elapsed:.3f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_lightweight(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        for lightweight in (False, True):
+            sw_app = pdm_sim.SimSldWorks(open_latency=args.open, supported_apis=args.apis)
+            sw_app.metadata_latency = args.metadata
+            sw_app.require_open_apis = set(args.require_open)
+            handler = make_handler(None)
+            handler.lightweight = lightweight
+            session = handler.init_assembly_doc(sw_app)
+            sw_app.calls.reset()
+            start = time.perf_counter()
+            added = 0
+            for path in paths:
+                handler.activate_assembly(session)
+                added += bool(handler.add_component_to_assembly(session, path))
+            elapsed = time.perf_counter() - start
+            calls = sw_app.calls.snapshot()
+            print(f"hafif mod={'açık' if lightweight else 'kapalı':<6} added={added:<5} "
+                  f"OpenDoc6={calls.get('OpenDoc6', 0):<5} en çok açık belge={sw_app.peak_open_docs:<4} "
+                  f"time={elapsed:.3f}s")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_config_cache(args):
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, args.files)
+        cache = ConfigNameCache(":memory:", max_entries=args.max_entries)
+        for run in range(1, args.runs + 1):
+            if run == args.runs and args.changed:
+                # Son çalıştırmadan önce bazı dosyalar yeni sürüm alır
+                for path in paths[:args.changed]:
+                    with open(path, "ab") as f:
+                        f.write(b"\0")
+            sw_app = pdm_sim.SimSldWorks(open_latency=args.open)
+            handler = make_handler(None, config_cache=cache)
+            session = handler.init_assembly_doc(sw_app)
+            sw_app.calls.reset()
+            start = time.perf_counter()
+            for path in paths:
+                handler.activate_assembly(session)
+                handler.add_component_to_assembly(session, path)
+            elapsed = time.perf_counter() - start
+            stats = handler.config_cache_stats
+            print(f"çalıştırma {run}: OpenDoc6={sw_app.calls.get('OpenDoc6'):<5} isabet={stats['hits']:<5} "
+                  f"ıska={stats['misses']:<5} time={elapsed:.3f}s")
+        print("önbellek:", ", ".join(f"{k}={v}" for k, v in sorted(cache.get_stats().items())))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+SHELF_GAP = 0.05
+
+
+def shelf_pack(sizes, max_width=None, gap=SHELF_GAP, origin=(0.0, 0.0, 0.0)):
+    """
+    Shelf packing of boxes ((dx, dy, dz) tuples) in the X/Y plane, as a reference point
+    for the grid: tallest first on shelves of width `max_width` (default: about a square
+    footprint). Returns the position of each box's minimum corner, in input order.
+    """
+    if not sizes:
+        return []
+    if max_width is None:
+        area = sum((dx + gap) * (dy + gap) for dx, dy, _ in sizes)
+        max_width = max(math.sqrt(area), max(dx for dx, _, _ in sizes))
+    # Kararlı sıralama: eşit yükseklikte giriş sırası korunur
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][1])
+    ox, oy, oz = origin
+    positions = [None] * len(sizes)
+    x = 0.0
+    shelf_y = 0.0
+    shelf_height = 0.0
+    for i in order:
+        dx, dy, _ = sizes[i]
+        if x > 0 and x + dx > max_width:
+            shelf_y += shelf_height + gap
+            x = 0.0
+            shelf_height = 0.0
+        positions[i] = (ox + x, oy - shelf_y - dy, oz)
+        x += dx + gap
+        shelf_height = max(shelf_height, dy)
+    return positions
+
+
+def bench_layout(args):
+    grid = GridLayout()
+    dx, dy, dz = grid.extent(args.files)
+    print(f"doğrusal Z yığını  n={args.files:<6} boyut=(0.00, 0.00, {(args.files - 1) * grid.pitch:.2f})m")
+    print(f"ızgara {grid.columns}x{grid.rows}      n={args.files:<6} boyut=({dx:.2f}, {dy:.2f}, {dz:.2f})m")
+
+    rng = random.Random(args.seed)
+    sizes = [(rng.uniform(0.02, 0.4), rng.uniform(0.02, 0.4), rng.uniform(0.02, 0.4)) for _ in range(args.files)]
+    start = time.perf_counter()
+    packed = shelf_pack(sizes)
+    elapsed = time.perf_counter() - start
+    width = max(x + s[0] for (x, _, _), s in zip(packed, sizes))
+    depth = -min(y for _, y, _ in packed)
+    assert packed == shelf_pack(sizes)
+    print(f"raf yerleşimi      n={args.files:<6} boyut=({width:.2f}, {depth:.2f}, 0.00)m time={elapsed * 1000:.1f}ms")
+
+    root = tempfile.mkdtemp(prefix="pdm_sim_")
+    try:
+        paths = make_part_files(root, min(args.files, 200))
+        sw_app = pdm_sim.SimSldWorks()
+        handler = make_handler(None)
+        session = handler.init_assembly_doc(sw_app)
+        handler.insert_components_bulk(session, paths[:len(paths) // 2])
+        for path in paths[len(paths) // 2:]:
+            handler.add_component_to_assembly(session, path)
+        placed = [c.transform.position for c in sw_app.docs[session.locked_title].components]
+        expected = grid.positions(0, len(paths))
+        print(f"sahte montaj       n={len(placed):<6} ızgarayla aynı={sorted(placed) == sorted(expected)} "
+              f"çakışma={len(placed) - len(set(placed))}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def run_e2e_case(size, mode, args, workdir):
+    root = os.path.join(workdir, f"{mode}-{size}")
+    vault, codes = pdm_sim.build_sap_vault(size, search_latency=args.search, root=root)
+    vault.download_latency = args.download
+    sw_app = pdm_sim.SimSldWorks(open_latency=args.open, insert_latency=args.insert,
+                                 component_latency=args.component)
+    sw_app.redraw_latency = args.redraw
+    handler = make_handler(vault, sw_app=sw_app)
+    handler.get_stop_on_not_found = (lambda: True) if mode == "batch" else (lambda: False)
+    handler.profile_dir = os.path.join(workdir, "profiles")
+    vault.calls.phase_source = handler.profiler.current_phase
+    sw_app.calls.phase_source = handler.profiler.current_phase
+
+    start = time.perf_counter()
+    # Sunucu/işleyici konsol çıktısı tabloyu bozmasın
+    with contextlib.redirect_stdout(io.StringIO()):
+        handler.run_process(codes)
+    elapsed = time.perf_counter() - start
+
+    logs = []
+    while not handler.log_queue.empty():
+        logs.append(handler.log_queue.get_nowait())
+    added = len(sw_app.docs[handler.assembly_session.locked_title].components) if handler.assembly_session else 0
+    com = {}
+    for counter in (vault.calls, sw_app.calls):
+        for phase, n in counter.phase_totals().items():
+            com[phase] = com.get(phase, 0) + n
+    return {
+        "size": size,
+        "mode": mode,
+        "added": added,
+        "wall": round(elapsed, 3),
+        "com_total": sum(com.values()),
+        "com_by_phase": com,
+        "phases": {name: p["total"] for name, p in handler.profiler.summary().items()},
+        "errors": [entry["message"] for entry in logs if entry.get("color") == "#ef4444"][:5],
+    }
+
+
+def compare_e2e(results, baseline_path, tolerance):
+    """Return regression messages against a previous --output file."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["size"], r["mode"]): r for r in json.load(f)["results"]}
+    problems = []
+    for r in results:
+        base = baseline.get((r["size"], r["mode"]))
+        if not base:
+            continue
+        label = f"{r['mode']} n={r['size']}"
+        if r["wall"] > base["wall"] * (1 + tolerance) and r["wall"] - base["wall"] > 0.05:
+            problems.append(f"{label}: süre {base['wall']:.3f}s -> {r['wall']:.3f}s")
+        if r["com_total"] > base["com_total"] * (1 + tolerance / 5):
+            problems.append(f"{label}: COM çağrısı {base['com_total']} -> {r['com_total']}")
+        if r["added"] < base["added"]:
+            problems.append(f"{label}: eklenen parça {base['added']} -> {r['added']}")
+    return problems
+
+
+def bench_e2e(args):
+    workdir = tempfile.mkdtemp(prefix="pdm_e2e_")
+    results = []
+    try:
+        for size in args.sizes:
+            for mode in args.modes:
+                r = run_e2e_case(size, mode, args, workdir)
+                results.append(r)
+                phases = " ".join(f"{k}={v:.2f}s" for k, v in sorted(r["phases"].items(), key=lambda kv: -kv[1])[:5])
+                com = " ".join(f"{k}={v}" for k, v in sorted(r["com_by_phase"].items(), key=lambda kv: -kv[1])[:5])
+                print(f"{mode:<9} n={size:<5} added={r['added']:<5} wall={r['wall']:.3f}s COM={r['com_total']:<7} "
+                      f"| {phases} | COM: {com}")
+                for message in r["errors"]:
+                    print(f"    hata: {message}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "params": {k: v for k, v in vars(args).items() if k != "func"},
+                       "results": results}, f, indent=2, ensure_ascii=False)
+    if args.baseline:
+        problems = compare_e2e(results, args.baseline, args.tolerance)
+        for message in problems:
+            print(f"GERİLEME: {message}")
+        if problems:
+            sys.exit(1)
+
+
+def bench_connections(args):
+    for pooled in (False, True):
+        workdir = tempfile.mkdtemp(prefix="pdm_conn_")
+        try:
+            vault, codes = pdm_sim.build_sap_vault(args.codes, root=workdir)
+            sw_app = pdm_sim.SimSldWorks()
+            backend = SimBackend(vault=vault, cad_app=sw_app, connect_latency=args.connect)
+            manager = ConnectionManager("PGR2024", backend=backend) if pooled else None
+            label = "bağlantı havuzu" if pooled else "her çalıştırmada"
+            for run in range(args.runs):
+                handler = make_handler(vault, sw_app=sw_app)
+                handler.backend = backend
+                handler.connections = manager
+                handler.profile_dir = os.path.join(workdir, "profiles")
+                connects = backend.connects
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    handler.run_process(codes)
+                elapsed = time.perf_counter() - start
+                connect = handler.profiler.summary().get("connect", {"total": 0.0, "count": 0})
+                print(f"{label:<17} çalıştırma {run + 1}  bağlanma={connect['total']:.3f}s "
+                      f"({connect['count']} çağrı, yeni bağlantı={backend.connects - connects:<2}) wall={elapsed:.3f}s")
+            if manager:
+                status = manager.get_status()
+                print(f"havuz: bağlı={status['connected']} kiralama={status['leases']} "
+                      f"yeniden kullanım={status['reuse_rate']:.2f} yetersiz={status['exhausted']}")
+                manager.close()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_startup(args, workdir):
+    """Spawn server.py on the sim backend; seconds until /api/status answers and until warm-up ends."""
+    port = free_port()
+    env = dict(os.environ, PDM_BACKEND="sim", PDM_SIM_PARTS=str(args.parts), PDM_SERVER_PORT=str(port),
+               TMPDIR=workdir, PYTHONUNBUFFERED="1")
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    url = f"http://127.0.0.1:{port}/api/status"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, server], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first = ready = None
+    try:
+        while time.perf_counter() - start < args.timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server.py exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as resp:
+                    status = json.load(resp)
+            except OSError:
+                time.sleep(0.005)
+                continue
+            now = time.perf_counter() - start
+            if first is None:
+                first = now
+            if status.get("warmup") in ("ready", "failed"):
+                ready = now
+                break
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+    return first, ready
+
+
+def start_server(workdir, parts, extra_env=None):
+    """server.py on the sim backend in a subprocess; returns (process, base url) once it answers."""
+    port = free_port()
+    env = dict(os.environ, PDM_BACKEND="sim", PDM_SIM_PARTS=str(parts), PDM_SERVER_PORT=str(port),
+               TMPDIR=workdir, PYTHONUNBUFFERED="1", **(extra_env or {}))
+    server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    proc = subprocess.Popen([sys.executable, server], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}/api"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/status", timeout=1) as resp:
+                if json.load(resp).get("warmup") in ("ready", "failed"):
+                    return proc, base
+        except OSError:
+            pass
+        time.sleep(0.02)
+    proc.kill()
+    raise RuntimeError("server.py did not start")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def process_cpu_seconds(pid):
+    """User + system CPU time of a running process (psutil or /proc); None if unavailable."""
+    try:
+        import psutil
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    except ImportError:
+        pass
+    except Exception:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def cpu_delta(before, after):
+    return f"{after - before:.2f}s" if before is not None and after is not None else "n/a"
+
+
+def poll_client(base, stop, latencies, requests_made):
+    since = 0
+    while not stop.is_set():
+        try:
+            with urllib.request.urlopen(f"{base}/status?since={since}", timeout=5) as resp:
+                data = json.load(resp)
+            now = time.time()
+            requests_made.append(1)
+            for entry in data.get("logs", []):
+                latencies.append(now - entry["timestamp"])
+            since = data.get("last_log_index", since)
+        except OSError:
+            pass
+        stop.wait(0.5)
+
+
+def sse_client(base, stop, latencies, requests_made):
+    try:
+        resp = urllib.request.urlopen(f"{base}/events", timeout=30)
+    except OSError:
+        return
+    requests_made.append(1)
+    event_type = None
+    with resp:
+        while not stop.is_set():
+            try:
+                line = resp.readline()
+            except OSError:
+                break
+            if not line:
+                break
+            line = line.decode("utf-8").rstrip("\n")
+            if line.startswith("event: "):
+                event_type = line[7:]
+            elif line.startswith("data: ") and event_type == "log":
+                latencies.append(time.time() - json.loads(line[6:])["timestamp"])
+
+
+# 10 olaylık desen: 7 log, ilerleme, durum, istatistik (çalıştırmadaki karışıma yakın)
+BUS_PATTERN = [EVENT_LOG] * 3 + [EVENT_PROGRESS] + [EVENT_LOG] * 2 + [EVENT_STATUS] + [EVENT_LOG] * 2 + [EVENT_STATS]
+
+
+def run_bus_producer(publish, rate, seconds):
+    """Publish BUS_PATTERN events at `rate`/s in 1 ms bursts; returns the count."""
+    per_ms = max(1, rate // 1000)
+    start = time.perf_counter()
+    sent = 0
+    tick = 0
+    while time.perf_counter() - start < seconds:
+        for _ in range(per_ms):
+            publish(BUS_PATTERN[sent % len(BUS_PATTERN)], sent)
+            sent += 1
+        tick += 1
+        delay = start + tick / 1000.0 - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return sent
+
+
+def bench_bus(args):
+    """Four queues + 100 ms polling loop (old server worker) vs EventBus.drain at a fixed event rate."""
+    import threading
+    from queue import Empty as QueueEmpty
+
+    def consume(get_batch, stop, result):
+        last_seq = -1
+        while not stop.is_set() or result["pending"]():
+            batch = get_batch()
+            result["wakeups"] += 1
+            now = time.perf_counter()
+            for event_type, seq, published in batch:
+                result["latencies"].append(now - published)
+                result["applied"] += 1
+                if seq < last_seq:
+                    result["out_of_order"] += 1
+                last_seq = max(last_seq, seq)
+
+    for mode in ("dört kuyruk", "olay veri yolu"):
+        stop = threading.Event()
+        result = {"latencies": [], "applied": 0, "wakeups": 0, "out_of_order": 0}
+        if mode == "dört kuyruk":
+            queues = {t: Queue() for t in (EVENT_LOG, EVENT_STATUS, EVENT_PROGRESS, EVENT_STATS)}
+
+            def publish(event_type, seq):
+                queues[event_type].put((event_type, seq, time.perf_counter()))
+
+            def get_batch():
+                # Eski işçi: kuyrukları boşalt, uygula, 0.1 sn uyu
+                time.sleep(0.1)
+                batch = []
+                for q in queues.values():
+                    while not q.empty():
+                        try:
+                            batch.append(q.get_nowait())
+                        except QueueEmpty:
+                            break
+                return batch
+
+            result["pending"] = lambda: any(not q.empty() for q in queues.values())
+        else:
+            bus = EventBus()
+
+            def publish(event_type, seq):
+                bus.publish(event_type, (seq, time.perf_counter()))
+
+            def get_batch():
+                return [(e.type, e.data[0], e.data[1]) for e in bus.drain(0.5)]
+
+            result["pending"] = lambda: bus.get_stats()["pending"] > 0
+
+        consumer = threading.Thread(target=consume, args=(get_batch, stop, result), daemon=True)
+        consumer.start()
+        idle_start = result["wakeups"]
+        time.sleep(1.0)
+        idle_wakeups = result["wakeups"] - idle_start
+        start = time.perf_counter()
+        sent = run_bus_producer(publish, args.rate, args.seconds)
+        produced = time.perf_counter() - start
+        stop.set()
+        if mode == "olay veri yolu":
+            bus.wake()
+        consumer.join(timeout=5)
+        elapsed = time.perf_counter() - start
+        latencies = sorted(result["latencies"])
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+        extra = ""
+        if mode == "olay veri yolu":
+            stats = bus.get_stats()
+            extra = f" birleştirilen={stats['coalesced']} en büyük parti={stats['max_batch']}"
+        print(f"{mode:<15} gönderilen={sent:<7} ({sent / produced:,.0f}/s) uygulanan={result['applied']:<7} "
+              f"gecikme p50={p50:.1f}ms p95={p95:.1f}ms sıra dışı={result['out_of_order']:<6} "
+              f"uyanma/sn boşta={idle_wakeups} yükte={result['wakeups'] / elapsed:.0f}{extra}")
+
+
+def bench_logstore(args):
+    """Old capped list (pop(0), since = list index) vs LogStore ring with sequence numbers."""
+    for capacity in args.capacity:
+        entries = [{"message": f"satır {i}", "color": "#6b7280", "timestamp": float(i)} for i in range(args.entries)]
+
+        # Eski: liste + pop(0), istemci her poll_every satırda since=len(önceki) ile okur
+        logs = []
+        since = 0
+        seen = []
+        start = time.perf_counter()
+        for i, entry in enumerate(entries):
+            logs.append(entry)
+            if len(logs) > capacity:
+                logs.pop(0)
+            if i % args.poll_every == 0:
+                delta = logs[since:] if since < len(logs) else []
+                seen.extend(e["timestamp"] for e in delta)
+                since = len(logs)
+        seen.extend(e["timestamp"] for e in (logs[since:] if since < len(logs) else []))
+        old_time = time.perf_counter() - start
+        old_missed = args.entries - len(set(seen))
+        old_dup = len(seen) - len(set(seen))
+
+        store = LogStore(capacity)
+        since = 0
+        seen = []
+        start = time.perf_counter()
+        for i, entry in enumerate(entries):
+            store.append(entry)
+            if i % args.poll_every == 0:
+                delta, _, since, _ = store.since(since)
+                seen.extend(e["timestamp"] for e in delta)
+        seen.extend(e["timestamp"] for e in store.since(since)[0])
+        ring_time = time.perf_counter() - start
+        ring_missed = args.entries - len(set(seen))
+        ring_dup = len(seen) - len(set(seen))
+
+        print(f"liste+pop(0) kapasite={capacity:<6} n={args.entries} süre={old_time:.3f}s "
+              f"kaçırılan={old_missed:<7} tekrar={old_dup}")
+        print(f"halka          kapasite={capacity:<6} n={args.entries} süre={ring_time:.3f}s "
+              f"kaçırılan={ring_missed:<7} tekrar={ring_dup}")
+
+
+def bench_journal(args):
+    """Per-event cost: print(flush=True) per call vs the buffered run journal; then a journaled server run."""
+    stats = {"total": args.events, "success": 0, "error": 0}
+    workdir = tempfile.mkdtemp(prefix="pdm_journal_")
+    try:
+        # Eski: update_stats her çağrıda iki DEBUG satırını flush ile basıyordu
+        sinks = [("update_stats eski/dosya", lambda: open(os.path.join(workdir, "stdout.txt"), "w", encoding="utf-8"))]
+        if sys.platform != "win32":
+            sinks.append(("update_stats eski/boru", lambda: subprocess.Popen(["cat"], stdin=subprocess.PIPE,
+                                                                        stdout=subprocess.DEVNULL, text=True)))
+        for name, open_sink in sinks:
+            sink = open_sink()
+            out = sink.stdin if hasattr(sink, "stdin") else sink
+            bus = EventBus()
+            start = time.perf_counter()
+            for i in range(args.events):
+                stats["success"] = i
+                print(f"DEBUG: update_stats called with total={stats['total']}, success={i}, error=None",
+                      file=out, flush=True)
+                print(f"DEBUG: Putting stats to queue: {stats}", file=out, flush=True)
+                bus.publish(EVENT_STATS, stats.copy())
+            elapsed = time.perf_counter() - start
+            out.close()
+            if hasattr(sink, "wait"):
+                sink.wait()
+            print(f"{name:<23} olay={args.events} süre={elapsed:.3f}s olay başına={elapsed / args.events * 1e6:.2f}µs "
+                  f"yazma={args.events * 2}")
+
+        # Yeni: işleyicinin sıcak yolunda yalnızca veri yolu yayını kalır
+        bus = EventBus()
+        start = time.perf_counter()
+        for i in range(args.events):
+            stats["success"] = i
+            bus.publish(EVENT_STATS, stats.copy())
+        elapsed = time.perf_counter() - start
+        print(f"{'update_stats yeni':<23} olay={args.events} süre={elapsed:.3f}s "
+              f"olay başına={elapsed / args.events * 1e6:.2f}µs yazma=0")
+
+        # Günlük, sunucunun olay işçisinde (işleyici iş parçacığının dışında) yazılır
+        for name, batch in (("günlük (tek tek)", 1), ("günlük (toplu 100)", 100)):
+            journal = RunJournal(directory=os.path.join(workdir, f"journal-{batch}"), keep=0)
+            records = [{"type": "stats", "t": time.time(), "stats": {"total": args.events, "success": i, "error": 0}}
+                       for i in range(args.events)]
+            start = time.perf_counter()
+            if batch == 1:
+                for record in records:
+                    journal.write(record)
+            else:
+                for i in range(0, len(records), batch):
+                    journal.write_many(records[i:i + batch])
+            journal.flush()
+            elapsed = time.perf_counter() - start
+            written = journal.get_stats()
+            path = journal.close()
+            print(f"{name:<23} olay={args.events} süre={elapsed:.3f}s olay başına={elapsed / args.events * 1e6:.2f}µs "
+                  f"yazma={written['flushes']} ham={written['bytes'] / 1024:.0f}KB "
+                  f"gzip={os.path.getsize(path) / 1024:.0f}KB")
+
+        # Uçtan uca: sunucu bir çalıştırmayı günlüğe yazar, /api/runs ile geri okunur
+        proc, base = start_server(workdir, args.codes)
+        try:
+            codes = [str(100000 + i) for i in range(args.codes)]
+            body = json.dumps({"codes": codes, "stopOnNotFound": False}).encode("utf-8")
+            urllib.request.urlopen(urllib.request.Request(f"{base}/start", data=body,
+                                                          headers={"Content-Type": "application/json"}), timeout=10)
+            started = time.time()
+            runs = []
+            while time.time() - started < args.timeout:
+                with urllib.request.urlopen(f"{base}/runs", timeout=5) as resp:
+                    listing = json.load(resp)
+                runs = listing["runs"]
+                if runs and listing["active"] is None and runs[0]["compressed"]:
+                    break
+                time.sleep(0.2)
+            if not runs:
+                print("günlük bulunamadı")
+                return
+            start = time.perf_counter()
+            counts = {}
+            with urllib.request.urlopen(f"{base}/runs/{runs[0]['id']}", timeout=30) as resp:
+                for line in resp:
+                    record_type = json.loads(line)["type"]
+                    counts[record_type] = counts.get(record_type, 0) + 1
+            read_seconds = time.perf_counter() - start
+            summary = " ".join(f"{k}={v}" for k, v in sorted(counts.items()))
+            print(f"sunucu çalıştırması kod={args.codes} dosya={runs[0]['file']} {runs[0]['bytes'] / 1024:.0f}KB "
+                  f"okuma={read_seconds * 1000:.0f}ms {summary}")
+        finally:
+            stop_server(proc)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def run_job_queue(server, codes_per_job, settings, timeout):
+    """Submit the jobs back to back through /api/jobs; returns their final dicts once all finished."""
+    client = server.app.test_client()
+    ids = []
+    for codes in codes_per_job:
+        resp = client.post("/api/jobs", json={"codes": codes, **settings})
+        ids.append(resp.get_json()["job"]["id"])
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        jobs = [client.get(f"/api/jobs/{job_id}").get_json() for job_id in ids]
+        if all(job["state"] in ("done", "failed", "cancelled") for job in jobs):
+            return jobs
+        time.sleep(0.05)
+    raise RuntimeError("jobs did not finish")
+
+
+def bench_jobs(args):
+    """Back-to-back jobs on one server: next job prepared during the CAD phase vs not."""
+    from backends import set_backend
+    workdir = tempfile.mkdtemp(prefix="pdm_jobs_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)
+        total = args.jobs * args.codes
+        vault, codes = pdm_sim.build_sap_vault(total * 2, search_latency=args.search, root=os.path.join(workdir, "vault"))
+        vault.download_latency = args.download
+        sw_app = pdm_sim.SimSldWorks(insert_latency=args.insert, component_latency=args.component)
+        set_backend(SimBackend(vault=vault, cad_app=sw_app))
+        with contextlib.redirect_stdout(io.StringIO()):
+            import server as server_module
+            server = server_module.AutomationServer()
+            while server.warmup["state"] not in ("ready", "failed"):
+                time.sleep(0.02)
+        settings = {"stopOnNotFound": args.mode == "batch"}
+        # Kodlar iki yarıya bölünür: önbellek / yerel dosyalar bir senaryodan diğerine taşmasın
+        for case, prepare in enumerate((False, True)):
+            server.job_settings["prepare_ahead"] = prepare
+            base = case * total
+            batches = [codes[base + i * args.codes: base + (i + 1) * args.codes] for i in range(args.jobs)]
+            with contextlib.redirect_stdout(io.StringIO()):
+                jobs = run_job_queue(server, batches, settings, args.timeout)
+            makespan = max(j["finished_at"] for j in jobs) - min(j["started_at"] for j in jobs)
+            gaps = [jobs[i + 1]["started_at"] - jobs[i]["finished_at"] for i in range(len(jobs) - 1)]
+            runs = " ".join(f"#{j['id']}={j['run_seconds']:.2f}s" for j in jobs)
+            prepared = sum(1 for j in jobs if j["prepare"] and j["prepare"].get("found"))
+            print(f"{'ön hazırlık' if prepare else 'sırayla':<12} mod={args.mode} iş={args.jobs}x{args.codes} "
+                  f"toplam={makespan:.2f}s işler: {runs} iş arası boşluk maks={max(gaps or [0]) * 1000:.0f}ms "
+                  f"hazırlanan={prepared} eklenen={sum(j['stats']['success'] for j in jobs)}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_events(args):
+    """Server CPU and log delivery latency: /api/status polling vs /api/events."""
+    import threading
+    for mode, client in (("yoklama (500 ms)", poll_client), ("SSE", sse_client)):
+        workdir = tempfile.mkdtemp(prefix="pdm_events_")
+        try:
+            proc, base = start_server(workdir, args.codes)
+            stop = threading.Event()
+            latencies, requests_made = [], []
+            threads = [threading.Thread(target=client, args=(base, stop, latencies, requests_made), daemon=True)
+                       for _ in range(args.clients)]
+            for t in threads:
+                t.start()
+            time.sleep(0.5)
+            idle_before = process_cpu_seconds(proc.pid)
+            time.sleep(args.idle)
+            idle_after = process_cpu_seconds(proc.pid)
+            codes = [str(100000 + i) for i in range(args.codes)]
+            body = json.dumps({"codes": codes, "stopOnNotFound": False}).encode("utf-8")
+            urllib.request.urlopen(urllib.request.Request(f"{base}/start", data=body,
+                                                          headers={"Content-Type": "application/json"}), timeout=10)
+            started = time.time()
+            while time.time() - started < args.timeout:
+                with urllib.request.urlopen(f"{base}/status?since=1000000", timeout=5) as resp:
+                    status = json.load(resp)
+                if not status["is_running"] and time.time() - started > 1:
+                    break
+                time.sleep(0.2)
+            run_seconds = time.time() - started
+            time.sleep(1.0)
+            run_after = process_cpu_seconds(proc.pid)
+            stop.set()
+            stop_server(proc)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0.0
+            p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+            print(f"{mode:<17} istemci={args.clients} boşta CPU={cpu_delta(idle_before, idle_after)}/{args.idle:.0f}s "
+                  f"çalıştırma CPU={cpu_delta(idle_after, run_after)}/{run_seconds:.1f}s istek={len(requests_made):<5} "
+                  f"log={len(latencies):<6} gecikme p50={p50:.0f}ms p95={p95:.0f}ms")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_startup(args):
+    workdir = tempfile.mkdtemp(prefix="pdm_startup_")
+    firsts, readies = [], []
+    try:
+        for i in range(args.runs):
+            first, ready = measure_startup(args, workdir)
+            if first is None:
+                print(f"çalıştırma {i + 1}: {args.timeout:.0f}s içinde yanıt yok")
+            elif ready is None:
+                print(f"çalıştırma {i + 1}: ilk yanıt={first:.3f}s ısınma bitmedi")
+            else:
+                print(f"çalıştırma {i + 1}: ilk yanıt={first:.3f}s ısınma bitti={ready:.3f}s")
+            if first is not None:
+                firsts.append(first)
+            if ready is not None:
+                readies.append(ready)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if firsts:
+        print(f"ilk /api/status yanıtı medyan={statistics.median(firsts):.3f}s maks={max(firsts):.3f}s")
+    if readies:
+        print(f"ısınma bitişi         medyan={statistics.median(readies):.3f}s maks={max(readies):.3f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDM otomasyon benchmarkları")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    search = sub.add_parser("search", help="SAP kodu arama aşaması")
+    search.add_argument("--codes", type=int, default=300)
+    search.add_argument("--misses", type=int, default=0)
+    search.add_argument("--latency", type=float, default=0.05)
+    search.add_argument("--workers", type=int, default=4)
+    search.set_defaults(func=bench_search)
+
+    strategy = sub.add_parser("strategy", help="CreateSearch sayısı: sabit sıra / öğrenen / OR sorgusu")
+    strategy.add_argument("--codes", type=int, default=300)
+    strategy.add_argument("--misses", type=int, default=0)
+    strategy.add_argument("--var", default="SAP No")
+    strategy.set_defaults(func=bench_strategy)
+
+    index = sub.add_parser("index", help="Kasa SAP indeksi: tam / artımlı tarama ve BOM çözümleme")
+    index.add_argument("--files", type=int, default=30000)
+    index.add_argument("--bom", type=int, default=800)
+    index.set_defaults(func=bench_index)
+
+    prefetch = sub.add_parser("prefetch", help="Arama + indirme + (sahte) CAD ekleme hattı")
+    prefetch.add_argument("--codes", type=int, default=100)
+    prefetch.add_argument("--latency", type=float, default=0.02)
+    prefetch.add_argument("--download", type=float, default=0.2)
+    prefetch.add_argument("--insert", type=float, default=0.1)
+    prefetch.add_argument("--workers", type=int, default=3)
+    prefetch.set_defaults(func=bench_prefetch)
+
+    open_doc = sub.add_parser("open", help="OpenDoc6 sonrası belge hazır bekleme (sahte SolidWorks)")
+    open_doc.add_argument("--files", type=int, default=50)
+    open_doc.add_argument("--open", type=float, default=0.05)
+    open_doc.add_argument("--register", type=float, default=0.1)
+    open_doc.set_defaults(func=bench_open)
+
+    components = sub.add_parser("components", help="Eklemede COM çağrı sayısı: GetComponents vs bileşen kaydı")
+    components.add_argument("--sizes", type=int, nargs="+", default=[50, 200, 1000])
+    components.set_defaults(func=bench_components)
+
+    session = sub.add_parser("session", help="AssemblySession ile ekleme başına COM çağrıları")
+    session.add_argument("--files", type=int, default=200)
+    session.set_defaults(func=bench_session)
+
+    insert_strategy = sub.add_parser("insert-strategy", help="Ekleme API kademesi: sabit vs öğrenen sıra")
+    insert_strategy.add_argument("--files", type=int, default=100)
+    insert_strategy.add_argument("--apis", nargs="+", default=["AddComponent4"], choices=pdm_sim.SIM_INSERT_APIS)
+    insert_strategy.set_defaults(func=bench_insert_strategy)
+
+    bulk = sub.add_parser("bulk", help="Toplu modda montaja ekleme: tek tek vs AddComponents3")
+    bulk.add_argument("--files", type=int, default=500)
+    bulk.add_argument("--open", type=float, default=0.0)
+    bulk.add_argument("--insert", type=float, default=0.02)
+    bulk.add_argument("--component", type=float, default=0.002)
+    bulk.add_argument("--reject", type=int, default=0)
+    bulk.add_argument("--repeat", type=int, default=1, help="Parça başına adet (aynı dosya art arda)")
+    bulk.set_defaults(func=bench_bulk)
+
+    fast = sub.add_parser("fast", help="Hızlı ekleme modu: görünüm/ağaç güncellemeleri kapalı, tek yeniden oluşturma")
+    fast.add_argument("--files", type=int, default=200)
+    fast.add_argument("--insert", type=float, default=0.0)
+    fast.add_argument("--redraw", type=float, default=0.01)
+    fast.add_argument("--rebuild", type=float, default=0.2)
+    fast.add_argument("--stop-at", type=int, default=-1, help="Bu eklemede hata fırlat (geri yükleme kontrolü)")
+    fast.set_defaults(func=bench_fast)
+
+    lightweight = sub.add_parser("lightweight", help="Hafif mod: bileşen açmadan yapılandırma okuma ve ekleme")
+    lightweight.add_argument("--files", type=int, default=200)
+    lightweight.add_argument("--open", type=float, default=0.02)
+    lightweight.add_argument("--metadata", type=float, default=0.001)
+    lightweight.add_argument("--apis", nargs="+", default=list(pdm_sim.SIM_INSERT_APIS), choices=pdm_sim.SIM_INSERT_APIS)
+    lightweight.add_argument("--require-open", nargs="*", default=[], choices=pdm_sim.SIM_INSERT_APIS,
+                             help="Bileşen belgesi açık değilken başarısız olan API'ler")
+    lightweight.set_defaults(func=bench_lightweight)
+
+    config_cache = sub.add_parser("config-cache", help="Yapılandırma adı önbelleği: tekrar eklemelerde belge açma")
+    config_cache.add_argument("--files", type=int, default=200)
+    config_cache.add_argument("--open", type=float, default=0.02)
+    config_cache.add_argument("--runs", type=int, default=3)
+    config_cache.add_argument("--changed", type=int, default=10)
+    config_cache.add_argument("--max-entries", type=int, default=50000)
+    config_cache.set_defaults(func=bench_config_cache)
+
+    layout = sub.add_parser("layout", help="Yerleşim: doğrusal Z yığını vs ızgara vs raf yerleşimi")
+    layout.add_argument("--files", type=int, default=1000)
+    layout.add_argument("--seed", type=int, default=1)
+    layout.set_defaults(func=bench_layout)
+
+    e2e = sub.add_parser("e2e", help="run_process uçtan uca (toplu / anında mod), faz başına süre ve COM çağrıları")
+    e2e.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    e2e.add_argument("--modes", nargs="+", default=["batch", "immediate"], choices=["batch", "immediate"])
+    e2e.add_argument("--search", type=float, default=0.005)
+    e2e.add_argument("--download", type=float, default=0.01)
+    e2e.add_argument("--open", type=float, default=0.005)
+    e2e.add_argument("--insert", type=float, default=0.005)
+    e2e.add_argument("--component", type=float, default=0.001)
+    e2e.add_argument("--redraw", type=float, default=0.002)
+    e2e.add_argument("--output", help="Sonuçları JSON olarak yaz")
+    e2e.add_argument("--baseline", help="Önceki --output dosyası; gerileme varsa çıkış kodu 1")
+    e2e.add_argument("--tolerance", type=float, default=0.25)
+    e2e.set_defaults(func=bench_e2e)
+
+    connections = sub.add_parser("connections", help="Ardışık çalıştırmalarda PDM/SolidWorks bağlanma süresi: havuzsuz vs havuz")
+    connections.add_argument("--runs", type=int, default=5)
+    connections.add_argument("--codes", type=int, default=20)
+    connections.add_argument("--connect", type=float, default=0.3, help="Dispatch + LoginAuto / GetActiveObject süresi (sn)")
+    connections.set_defaults(func=bench_connections)
+
+    events = sub.add_parser("events", help="UI güncellemeleri: /api/status yoklaması vs /api/events (SSE), sunucu CPU'su")
+    events.add_argument("--clients", type=int, default=3)
+    events.add_argument("--idle", type=float, default=10, help="Çalıştırma öncesi boşta bekleme (sn)")
+    events.add_argument("--codes", type=int, default=300)
+    events.add_argument("--timeout", type=float, default=120)
+    events.set_defaults(func=bench_events)
+
+    bus = sub.add_parser("bus", help="Sunucu olay işçisi: dört kuyruk + 100 ms yoklama vs olay veri yolu")
+    bus.add_argument("--rate", type=int, default=10000, help="Saniyede olay")
+    bus.add_argument("--seconds", type=float, default=3)
+    bus.set_defaults(func=bench_bus)
+
+    logstore = sub.add_parser("logstore", help="Sunucu log tamponu: liste+pop(0) vs halka tampon (ekleme, delta okuma, doğruluk)")
+    logstore.add_argument("--entries", type=int, default=200000)
+    logstore.add_argument("--capacity", type=int, nargs="+", default=[1000, 10000])
+    logstore.add_argument("--poll-every", type=int, default=50, help="Kaç satırda bir istemci okur")
+    logstore.set_defaults(func=bench_logstore)
+
+    journal = sub.add_parser("journal", help="Olay başına G/Ç: print(flush=True) vs tamponlu çalıştırma günlüğü; /api/runs")
+    journal.add_argument("--events", type=int, default=100000)
+    journal.add_argument("--codes", type=int, default=300)
+    journal.add_argument("--timeout", type=float, default=120)
+    journal.set_defaults(func=bench_journal)
+
+    jobs = sub.add_parser("jobs", help="İş kuyruğu: ardışık işler, sıradaki işin CAD fazında ön hazırlığı açık/kapalı")
+    jobs.add_argument("--jobs", type=int, default=3)
+    jobs.add_argument("--codes", type=int, default=40, help="İş başına kod")
+    jobs.add_argument("--mode", choices=("batch", "immediate"), default="batch")
+    jobs.add_argument("--search", type=float, default=0.02, help="CreateSearch sonucu başına gecikme (sn)")
+    jobs.add_argument("--download", type=float, default=0.05, help="GetFileCopy gecikmesi (sn)")
+    jobs.add_argument("--insert", type=float, default=0.05, help="Ekleme çağrısı başına gecikme (sn)")
+    jobs.add_argument("--component", type=float, default=0.05, help="Bileşen başına ek gecikme (sn)")
+    jobs.add_argument("--timeout", type=float, default=300)
+    jobs.set_defaults(func=bench_jobs)
+
+    startup = sub.add_parser("startup", help="server.py soğuk başlangıç: ilk /api/status yanıtı ve ısınma süresi")
+    startup.add_argument("--runs", type=int, default=5)
+    startup.add_argument("--parts", type=int, default=1000, help="Sahte kasadaki parça sayısı (ısınmada bağlanır)")
+    startup.add_argument("--timeout", type=float, default=30)
+    startup.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    # Süreç geneli önbellek/indeks (LogicHandler açılışı) çalışma ağacında dosya bırakmasın
+    pdm_cache.CACHE_PATH = pdm_index.INDEX_PATH = ":memory:"
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
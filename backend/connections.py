@@ -0,0 +1,332 @@
+"""
+Long-lived PDM vault and SolidWorks connections shared across runs.
+
+Every pooled connection lives on its own apartment thread, because a COM object
+created in a single-threaded apartment can only be called through that thread.
+lease() marshals the object to the calling thread and Lease.release() returns the
+slot. A connection is health-checked when it is leased and every
+CONNECTION_CHECK_INTERVAL seconds while idle, and it is reconnected when a check
+fails. Idle checks only re-attach to SolidWorks and never start it.
+"""
+import threading
+import time
+from queue import Queue, Empty
+
+from backends import get_backend
+
+# Çalıştırma iş parçacığı + ön-getirme hattı (besleyici + 4 arama işçisi + 3 indirici) aynı anda,
+# artı kuyruktaki sonraki işin ön hazırlığı (ana iş parçacığı + besleyici + indirici)
+VAULT_POOL_SIZE = 12
+CONNECTION_CHECK_INTERVAL = 30.0
+# SolidWorks'ün başlatılması dakikalar sürebilir
+CONNECTION_LEASE_TIMEOUT = 300.0
+# İş parçacığı bu aralıkla uyanıp boşta sağlık kontrolü gerekip gerekmediğine bakar
+SLOT_POLL_INTERVAL = 1.0
+# Tüm yuvalar kiralıyken (ör. önceki fazın işçileri kapanırken) boş yuva bekleme süresi
+SLOT_ACQUIRE_WAIT = 2.0
+
+
+class Lease:
+    """A pooled connection marshalled to the calling thread; release() when done."""
+
+    __slots__ = ("manager", "slot", "obj", "reused", "seconds")
+
+    def __init__(self, manager, slot, obj, reused, seconds):
+        self.manager = manager
+        self.slot = slot
+        self.obj = obj
+        self.reused = reused
+        self.seconds = seconds
+
+    def release(self):
+        if self.slot is not None:
+            self.obj = None
+            self.manager._release(self.slot)
+            self.slot = None
+
+    def __enter__(self):
+        return self.obj
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
+
+
+class _Slot:
+    def __init__(self, manager, kind, index):
+        self.manager = manager
+        self.kind = kind
+        self.index = index
+        self.obj = None
+        self.leased = False
+        self.stale = False
+        self.closed = False
+        self.requests = Queue()
+        self.event = None
+        self.thread = None
+        self.stats = {"leases": 0, "reused": 0, "connects": 0, "reconnects": 0, "failures": 0}
+        self.last_error = None
+        self.last_check = 0.0
+        self.connected_at = None
+        self.connect_seconds = None
+
+    def start(self):
+        if self.thread is None:
+            self.event = self.manager.backend.apartment_event()
+            self.thread = threading.Thread(target=self._run, daemon=True,
+                                           name=f"pdm-conn-{self.kind}-{self.index}")
+            self.thread.start()
+
+    def submit(self, request):
+        self.start()
+        self.requests.put(request)
+        self.manager.backend.signal_event(self.event)
+
+    def _run(self):
+        backend = self.manager.backend
+        co_initialized = backend.co_initialize()
+        try:
+            while not self.closed:
+                backend.wait_apartment(self.event, SLOT_POLL_INTERVAL)
+                while True:
+                    try:
+                        request = self.requests.get_nowait()
+                    except Empty:
+                        break
+                    self._handle(request)
+                if (not self.closed and not self.leased and self.obj is not None
+                        and time.time() - self.last_check >= self.manager.check_interval):
+                    try:
+                        self._ensure(start=False)
+                    except Exception:
+                        pass
+        finally:
+            self.obj = None
+            if co_initialized:
+                backend.co_uninitialize()
+
+    def _handle(self, request):
+        action, reply = request
+        if action == "lease":
+            try:
+                reused = self._ensure(start=True)
+                reply.put((self.manager.backend.marshal(self.obj), reused, None))
+            except Exception as e:
+                reply.put((None, False, e))
+        elif action == "warm":
+            try:
+                self._ensure(start=False)
+            except Exception:
+                pass
+            reply.put(self.obj is not None)
+        elif action == "reset":
+            self.obj = None
+            self.stale = False
+            if reply:
+                reply.put(True)
+        elif action == "close":
+            self.obj = None
+            self.closed = True
+
+    def _healthy(self):
+        try:
+            if self.kind == "vault":
+                ok = bool(self.obj.IsLoggedIn)
+            else:
+                ok = bool(self.obj.RevisionNumber())
+        except Exception as e:
+            self.last_error = str(e)
+            ok = False
+        self.last_check = time.time()
+        return ok
+
+    def _ensure(self, start):
+        """Connect if needed; True if an existing healthy connection was reused."""
+        if self.obj is not None:
+            if not self.stale and self._healthy():
+                return True
+            self.obj = None
+            self.stale = False
+            self.stats["reconnects"] += 1
+        backend = self.manager.backend
+        started = time.perf_counter()
+        try:
+            if self.kind == "vault":
+                obj = backend.connect_vault(self.manager.vault_name)
+            else:
+                try:
+                    obj = backend.get_active_cad_app()
+                except Exception:
+                    if not start:
+                        raise
+                    obj = backend.start_cad_app()
+                    obj.Visible = True
+        except Exception as e:
+            self.stats["failures"] += 1
+            self.last_error = str(e)
+            self.last_check = time.time()
+            raise
+        self.obj = obj
+        self.stats["connects"] += 1
+        self.connect_seconds = round(time.perf_counter() - started, 4)
+        self.connected_at = self.last_check = time.time()
+        self.last_error = None
+        return False
+
+    def status(self):
+        now = time.time()
+        return {
+            "kind": self.kind,
+            "index": self.index,
+            "state": "closed" if self.closed else "leased" if self.leased else
+                     "connected" if self.obj is not None else "idle" if self.thread else "not_started",
+            "connected": self.obj is not None,
+            **self.stats,
+            "connect_seconds": self.connect_seconds,
+            "connected_for": round(now - self.connected_at, 1) if self.connected_at and self.obj is not None else None,
+            "last_check_age": round(now - self.last_check, 1) if self.last_check else None,
+            "last_error": self.last_error,
+        }
+
+
+class ConnectionManager:
+    def __init__(self, vault_name, vault_slots=VAULT_POOL_SIZE, backend=None,
+                 check_interval=CONNECTION_CHECK_INTERVAL, lease_timeout=CONNECTION_LEASE_TIMEOUT):
+        self.vault_name = vault_name
+        self.backend = backend or get_backend()
+        self.check_interval = check_interval
+        self.lease_timeout = lease_timeout
+        self.lock = threading.Lock()
+        self.slot_freed = threading.Condition(self.lock)
+        self.slots = {
+            "vault": [_Slot(self, "vault", i) for i in range(max(1, int(vault_slots)))],
+            "cad": [_Slot(self, "cad", 0)],
+        }
+        self.exhausted = 0
+
+    def _acquire(self, kind):
+        deadline = time.time() + SLOT_ACQUIRE_WAIT
+        with self.lock:
+            while True:
+                free = [slot for slot in self.slots[kind] if not slot.leased and not slot.closed]
+                if free:
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0 or all(slot.closed for slot in self.slots[kind]):
+                    self.exhausted += 1
+                    return None
+                self.slot_freed.wait(remaining)
+            # Önce zaten bağlı olan yuva
+            slot = next((s for s in free if s.obj is not None), free[0])
+            slot.leased = True
+            return slot
+
+    def _release(self, slot):
+        with self.lock:
+            slot.leased = False
+            self.slot_freed.notify()
+
+    def lease(self, kind):
+        """
+        Lease the `kind` ("vault" or "cad") connection for the calling thread, which
+        must have called co_initialize. Returns None when every slot stays leased for
+        SLOT_ACQUIRE_WAIT seconds; raises when connecting fails.
+        """
+        slot = self._acquire(kind)
+        if slot is None:
+            return None
+        started = time.perf_counter()
+        reply = Queue()
+        slot.submit(("lease", reply))
+        try:
+            token, reused, error = reply.get(timeout=self.lease_timeout)
+        except Empty:
+            self._release(slot)
+            raise TimeoutError(f"{kind} connection not ready after {self.lease_timeout:.0f}s")
+        if error is not None:
+            self._release(slot)
+            raise error
+        try:
+            obj = self.backend.unmarshal(token)
+        except Exception:
+            self._release(slot)
+            raise
+        with self.lock:
+            slot.stats["leases"] += 1
+            if reused:
+                slot.stats["reused"] += 1
+        return Lease(self, slot, obj, reused, time.perf_counter() - started)
+
+    def warm(self, vault=True, cad=True, timeout=60.0):
+        """
+        Connect every vault slot and attach to an already running SolidWorks (it is
+        not started). Waits up to `timeout`; returns the number of live connections.
+        """
+        replies = []
+        kinds = [k for k, on in (("vault", vault), ("cad", cad)) if on]
+        for kind in kinds:
+            for slot in self.slots[kind]:
+                reply = Queue()
+                slot.submit(("warm", reply))
+                replies.append(reply)
+        deadline = time.time() + timeout
+        connected = 0
+        for reply in replies:
+            try:
+                connected += bool(reply.get(timeout=max(0.0, deadline - time.time())))
+            except Empty:
+                pass
+        return connected
+
+    def reset(self, kind=None):
+        """Drop connections so the next lease reconnects; leased ones are dropped on their next lease."""
+        for k, slots in self.slots.items():
+            if kind and k != kind:
+                continue
+            for slot in slots:
+                with self.lock:
+                    slot.stale = True
+                    busy = slot.leased
+                if not busy and slot.thread is not None:
+                    slot.submit(("reset", None))
+
+    def close(self):
+        for slots in self.slots.values():
+            for slot in slots:
+                if slot.thread is not None:
+                    slot.submit(("close", None))
+
+    def get_status(self):
+        with self.lock:
+            slots = [slot.status() for slots in self.slots.values() for slot in slots]
+            exhausted = self.exhausted
+        leases = sum(s["leases"] for s in slots)
+        reused = sum(s["reused"] for s in slots)
+        return {
+            "vault_name": self.vault_name,
+            "backend": self.backend.name,
+            "connected": sum(1 for s in slots if s["connected"]),
+            "leased": sum(1 for s in slots if s["state"] == "leased"),
+            "leases": leases,
+            "reuse_rate": round(reused / leases, 3) if leases else 0.0,
+            "exhausted": exhausted,
+            "slots": slots,
+        }
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_connection_manager():
+    """Process-wide connection pool for VAULT_NAME; pool size from config "vault_pool_size"."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            from pdm_logic import VAULT_NAME, load_config
+            try:
+                size = int(load_config().get("vault_pool_size", VAULT_POOL_SIZE))
+            except Exception:
+                size = VAULT_POOL_SIZE
+            _manager = ConnectionManager(VAULT_NAME, vault_slots=size)
+        return _manager
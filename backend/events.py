@@ -0,0 +1,229 @@
+"""
+Run events from LogicHandler to the server, and from the server to the UI.
+
+EventBus is the single ordered, sequence-numbered channel from the logic handler
+to AutomationServer. The handler writes to it through BusChannel adapters, which
+keep the old queue put() interface. The server's worker blocks in drain() and
+takes whole batches; superseded status / progress / stats updates in a batch are
+dropped.
+
+EventStream is the push channel for the UI (server-sent events on /api/events).
+It numbers events and keeps the last EVENT_REPLAY of them in memory. A
+reconnecting EventSource sends Last-Event-ID and receives what it missed;
+otherwise it starts from a snapshot.
+"""
+import json
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+
+EVENT_REPLAY = 1000
+# Bağlantıyı proxy/istemci zaman aşımına karşı canlı tutan yorum satırı aralığı
+HEARTBEAT_INTERVAL = 15.0
+# Yavaş istemci: kuyruğu dolarsa bağlantısı kapatılır, yeniden bağlanıp anlık görüntü alır
+SUBSCRIBER_QUEUE_MAX = 5000
+
+
+EVENT_LOG = "log"
+EVENT_STATUS = "status"
+EVENT_PROGRESS = "progress"
+EVENT_STATS = "stats"
+# LogicHandler kayıtları (faz süreleri, kod sonuçları); yalnızca çalıştırma günlüğüne yazılır
+EVENT_RECORD = "record"
+# Bir toplu okumada yalnızca sonuncusu geçerli olan türler
+COALESCED_EVENTS = frozenset((EVENT_STATUS, EVENT_PROGRESS, EVENT_STATS))
+DRAIN_BATCH_MAX = 1000
+
+BusEvent = namedtuple("BusEvent", "seq type data time")
+
+
+class EventBus:
+    def __init__(self, coalesce=COALESCED_EVENTS):
+        self.cond = threading.Condition(threading.Lock())
+        self.pending = deque()
+        self.seq = 0
+        self.coalesce = coalesce
+        self.stats = {"published": 0, "delivered": 0, "coalesced": 0, "batches": 0, "max_batch": 0, "cleared": 0}
+
+    def publish(self, event_type, data):
+        with self.cond:
+            self.seq += 1
+            self.pending.append(BusEvent(self.seq, event_type, data, time.time()))
+            self.stats["published"] += 1
+            # Yalnızca boştan doluya geçişte uyandır; tüketici zaten uyanıksa gereksiz
+            if len(self.pending) == 1:
+                self.cond.notify_all()
+        return self.seq
+
+    def drain(self, timeout=None, max_items=DRAIN_BATCH_MAX):
+        """
+        Block until events are pending (or `timeout`), then return up to `max_items` of
+        them in order. Of the coalesced types only the last event per type in the batch
+        is kept, at its own position.
+        """
+        with self.cond:
+            if not self.pending:
+                self.cond.wait(timeout)
+            count = min(len(self.pending), max_items)
+            batch = [self.pending.popleft() for _ in range(count)]
+        if not batch:
+            return batch
+        if self.coalesce:
+            seen = set()
+            kept = []
+            for event in reversed(batch):
+                if event.type in self.coalesce:
+                    if event.type in seen:
+                        continue
+                    seen.add(event.type)
+                kept.append(event)
+            kept.reverse()
+        else:
+            kept = batch
+        with self.cond:
+            self.stats["batches"] += 1
+            self.stats["delivered"] += len(kept)
+            self.stats["coalesced"] += len(batch) - len(kept)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+        return kept
+
+    def clear(self):
+        """Drop pending events (e.g. leftovers of a finished run); returns how many."""
+        with self.cond:
+            count = len(self.pending)
+            self.pending.clear()
+            self.stats["cleared"] += count
+        return count
+
+    def wake(self):
+        """Wake a blocked drain() without an event (it returns an empty batch)."""
+        with self.cond:
+            self.cond.notify_all()
+
+    def get_stats(self):
+        with self.cond:
+            return {**self.stats, "pending": len(self.pending), "seq": self.seq}
+
+
+class BusChannel:
+    """Queue-like adapter: put(item) publishes `item` as an `event_type` event on the bus."""
+
+    def __init__(self, bus, event_type):
+        self.bus = bus
+        self.event_type = event_type
+
+    def put(self, item, block=True, timeout=None):
+        self.bus.publish(self.event_type, item)
+
+    def put_nowait(self, item):
+        self.bus.publish(self.event_type, item)
+
+
+class NullChannel:
+    """Queue-like sink that drops everything (e.g. the logs of a job being prepared)."""
+
+    def put(self, item, block=True, timeout=None):
+        pass
+
+    def put_nowait(self, item):
+        pass
+
+
+class Subscription:
+    def __init__(self, stream):
+        self.stream = stream
+        self.queue = queue.Queue(SUBSCRIBER_QUEUE_MAX)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Next (id, type, data) event or None on timeout."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.stream.unsubscribe(self)
+
+
+class EventStream:
+    def __init__(self, replay=EVENT_REPLAY):
+        self.lock = threading.Lock()
+        self.next_id = 1
+        self.replay = deque(maxlen=replay)
+        self.subscribers = set()
+        self.published = 0
+
+    def publish(self, event_type, data):
+        with self.lock:
+            event = (self.next_id, event_type, data)
+            self.next_id += 1
+            self.replay.append(event)
+            self.published += 1
+            subscribers = list(self.subscribers)
+        for sub in subscribers:
+            try:
+                sub.queue.put_nowait(event)
+            except queue.Full:
+                sub.overflowed = True
+        return event[0]
+
+    def subscribe(self, last_id=None):
+        """
+        New subscription. With `last_id` the missed events are queued first; returns
+        (subscription, replayed) where replayed is False if they were no longer in
+        the replay buffer (the caller should then send a snapshot).
+        """
+        sub = Subscription(self)
+        with self.lock:
+            replayed = False
+            # Sunucu yeniden başladıysa numaralar baştan başlar; büyük last_id = anlık görüntü
+            if last_id is not None and last_id < self.next_id:
+                if not self.replay or self.replay[0][0] <= last_id + 1:
+                    for event in self.replay:
+                        if event[0] > last_id:
+                            sub.queue.put_nowait(event)
+                    replayed = True
+            self.subscribers.add(sub)
+        return sub, replayed
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subscribers.discard(sub)
+
+    def last_id(self):
+        with self.lock:
+            return self.next_id - 1
+
+    def get_stats(self):
+        with self.lock:
+            return {"subscribers": len(self.subscribers), "published": self.published,
+                    "last_id": self.next_id - 1, "replay": len(self.replay)}
+
+
+def format_sse(event_id, event_type, data):
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+def sse_stream(stream, snapshot, last_id=None, heartbeat=HEARTBEAT_INTERVAL):
+    """
+    Generator of SSE text for one client. `snapshot()` returns the full state; it is
+    sent first unless every missed event could be replayed.
+    """
+    sub, replayed = stream.subscribe(last_id)
+    try:
+        yield "retry: 2000\n\n"
+        if not replayed:
+            yield format_sse(stream.last_id(), "snapshot", snapshot())
+        while True:
+            event = sub.get(heartbeat)
+            if sub.overflowed:
+                return
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield format_sse(*event)
+    finally:
+        sub.close()
@@ -0,0 +1,191 @@
+"""
+"Wait for file ready" facility used after PDM GetFileCopy.
+
+A file is ready once it exists, is non-empty and its size has stopped changing.
+Instead of sleeping in fixed steps the waiter blocks on directory change
+notifications (inotify on Linux, FindFirstChangeNotification on Windows) and
+falls back to short polling elsewhere. The timeout scales with the expected
+file size and is extended while the file keeps growing.
+"""
+import os
+import select
+import sys
+import time
+
+DOWNLOAD_TIMEOUT_MIN = 7.5
+DOWNLOAD_TIMEOUT_MAX = 300.0
+# Beklenen boyuttan zaman aşımı hesabı için kabul edilen en düşük indirme hızı (bayt/sn)
+DOWNLOAD_MIN_BPS = 1024 * 1024
+# Dosya büyümeye devam ettiği sürece zaman aşımı bu kadar uzatılır
+GROWTH_GRACE = 5.0
+STABLE_FOR = 0.05
+POLL_INTERVAL = 0.05
+
+
+def adaptive_timeout(expected_size=None, base=DOWNLOAD_TIMEOUT_MIN):
+    """Timeout in seconds for a download of `expected_size` bytes."""
+    if not expected_size or expected_size <= 0:
+        return base
+    return min(base + expected_size / DOWNLOAD_MIN_BPS, DOWNLOAD_TIMEOUT_MAX)
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError:
+        return None, None
+
+
+class PollingWatcher:
+    """Fallback backend: sleeps in short steps."""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def wait(self, timeout):
+        time.sleep(max(0.0, min(timeout, POLL_INTERVAL)))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux backend (ctypes inotify); wakes on create/modify/close-write in the directory."""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    _libc = None
+
+    def __init__(self, directory):
+        import ctypes
+        import ctypes.util
+        if InotifyWatcher._libc is None:
+            InotifyWatcher._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc = InotifyWatcher._libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = self.IN_MODIFY | self.IN_ATTRIB | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            err = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(err, f"inotify_add_watch failed: {directory}")
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class Win32Watcher:
+    """Windows backend (FindFirstChangeNotification on the target directory)."""
+
+    def __init__(self, directory):
+        import win32con
+        import win32event
+        import win32file
+        self._win32event = win32event
+        self._win32file = win32file
+        flags = (win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+                 | win32con.FILE_NOTIFY_CHANGE_SIZE
+                 | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+        self.handle = win32file.FindFirstChangeNotification(directory, False, flags)
+
+    def wait(self, timeout):
+        result = self._win32event.WaitForSingleObject(self.handle, int(max(0.0, timeout) * 1000))
+        if result == self._win32event.WAIT_OBJECT_0:
+            self._win32file.FindNextChangeNotification(self.handle)
+
+    def close(self):
+        try:
+            self._win32file.FindCloseChangeNotification(self.handle)
+        except Exception:
+            pass
+
+
+WAIT_BACKENDS = {
+    "inotify": InotifyWatcher,
+    "win32": Win32Watcher,
+    "poll": PollingWatcher,
+}
+
+
+def register_wait_backend(name, watcher_cls):
+    """Register a watcher class: watcher_cls(directory) with wait(timeout) and close()."""
+    WAIT_BACKENDS[name] = watcher_cls
+
+
+def default_wait_backend():
+    if sys.platform == "win32":
+        return "win32"
+    if sys.platform.startswith("linux"):
+        return "inotify"
+    return "poll"
+
+
+def open_watcher(directory, backend=None):
+    """Create a watcher for `directory`, degrading to polling if the backend is unavailable."""
+    name = backend or default_wait_backend()
+    watcher_cls = WAIT_BACKENDS.get(name, PollingWatcher)
+    if watcher_cls is not PollingWatcher and os.path.isdir(directory):
+        try:
+            return watcher_cls(directory)
+        except Exception:
+            pass
+    return PollingWatcher(directory)
+
+
+def wait_for_file_ready(path, timeout=None, expected_size=None, stable_for=STABLE_FOR, backend=None):
+    """
+    Block until `path` exists, is non-empty and its size is stable for `stable_for`
+    seconds. Returns (ready, waited_seconds).
+    """
+    start = time.monotonic()
+    deadline = start + (timeout if timeout is not None else adaptive_timeout(expected_size))
+
+    # Hızlı yol: dosya zaten tamamlanmış (boyut > 0 ve son yazımdan beri stable_for geçmiş)
+    size, mtime = _stat(path)
+    if size and mtime is not None and time.time() - mtime >= stable_for:
+        return True, 0.0
+
+    watcher = open_watcher(os.path.dirname(path) or ".", backend)
+    try:
+        last_size = None
+        stable_since = None
+        while True:
+            now = time.monotonic()
+            size, _ = _stat(path)
+            if size:
+                if size == last_size:
+                    if now - stable_since >= stable_for:
+                        return True, now - start
+                else:
+                    last_size = size
+                    stable_since = now
+                    # Hâlâ büyüyen dosya için süreyi uzat (üst sınır DOWNLOAD_TIMEOUT_MAX)
+                    deadline = max(deadline, min(now + GROWTH_GRACE, start + DOWNLOAD_TIMEOUT_MAX))
+            if now >= deadline:
+                return False, now - start
+            remaining = deadline - now
+            if size:
+                remaining = min(remaining, stable_for - (now - stable_since))
+            watcher.wait(remaining)
+    finally:
+        watcher.close()
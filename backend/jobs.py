@@ -0,0 +1,192 @@
+"""
+Job queue for AutomationServer.
+
+Every /api/start or /api/jobs submission becomes a Job. Jobs run one at a time
+against the shared SolidWorks session, highest priority first and FIFO within a
+priority. The server pops the next job when the current run ends. While a job is
+in its SolidWorks phase, the next queued job can be prepared: its SAP codes are
+resolved and its files downloaded ahead of time (LogicHandler.prepare_files).
+"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = frozenset((JOB_DONE, JOB_FAILED, JOB_CANCELLED))
+# Bellekte tutulan bitmiş iş sayısı (ayrıntı için çalıştırma günlüğü, bkz. journal.py)
+JOB_HISTORY = 200
+
+
+class Job:
+    def __init__(self, job_id, codes, settings, priority=0, name=None):
+        self.id = job_id
+        self.codes = list(codes)
+        self.settings = dict(settings)
+        self.priority = int(priority)
+        self.name = name or ""
+        self.state = JOB_QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        # Son durum metni ve sayaçlar (run_end ile aynı)
+        self.status = None
+        self.stats = None
+        self.run_id = None
+        # Ön hazırlık (arama + indirme) sonucu; None = hazırlanmadı
+        self.prepare = None
+
+    def to_dict(self, codes=False):
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "state": self.state,
+            "priority": self.priority,
+            "code_count": len(self.codes),
+            "settings": self.settings,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "wait_seconds": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "run_seconds": round((self.finished_at or time.time()) - self.started_at, 3) if self.started_at else None,
+            "status": self.status,
+            "stats": self.stats,
+            "run_id": self.run_id,
+            "prepare": self.prepare,
+        }
+        if codes:
+            data["codes"] = self.codes
+        return data
+
+
+class JobQueue:
+    def __init__(self, history=JOB_HISTORY):
+        self.lock = threading.Lock()
+        # (-öncelik, gönderim sırası, iş); iptal edilenler pop/peek sırasında atlanır
+        self.heap = []
+        self.order = itertools.count()
+        self.jobs = {}
+        self.finished = deque(maxlen=history)
+        self.current = None
+        self.next_id = 1
+        self.stats = {"submitted": 0, "completed": 0, "cancelled": 0}
+
+    def submit(self, codes, settings, priority=0, name=None):
+        with self.lock:
+            job = Job(self.next_id, codes, settings, priority, name)
+            self.next_id += 1
+            self.jobs[job.id] = job
+            heapq.heappush(self.heap, (-job.priority, next(self.order), job))
+            self.stats["submitted"] += 1
+            return job
+
+    def _discard_stale(self):
+        while self.heap and self.heap[0][2].state != JOB_QUEUED:
+            heapq.heappop(self.heap)
+
+    def peek(self):
+        """Next job to run, without removing it."""
+        with self.lock:
+            self._discard_stale()
+            return self.heap[0][2] if self.heap else None
+
+    def pop(self):
+        """Remove the next job and make it the current one (state running)."""
+        with self.lock:
+            self._discard_stale()
+            if not self.heap:
+                return None
+            job = heapq.heappop(self.heap)[2]
+            job.state = JOB_RUNNING
+            job.started_at = time.time()
+            self.current = job
+            return job
+
+    def finish(self, job, status=None, stats=None):
+        """Close the current job; its state follows the final status text and cancel requests."""
+        with self.lock:
+            job.finished_at = time.time()
+            job.status = status
+            job.stats = stats
+            if job.cancel_requested:
+                job.state = JOB_CANCELLED
+                self.stats["cancelled"] += 1
+            else:
+                job.state = JOB_FAILED if status in ("Hata", "İptal") else JOB_DONE
+                self.stats["completed"] += 1
+            if self.current is job:
+                self.current = None
+            self._retire(job)
+
+    def _retire(self, job):
+        if len(self.finished) == self.finished.maxlen:
+            self.jobs.pop(self.finished[0].id, None)
+        self.finished.append(job)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A queued job is dropped right away; the running one is only
+        flagged (the caller stops its handler). Returns the job or None if unknown.
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job.state in FINISHED_STATES:
+                return job
+            job.cancel_requested = True
+            if job.state == JOB_QUEUED:
+                job.state = JOB_CANCELLED
+                job.finished_at = time.time()
+                self.stats["cancelled"] += 1
+                self._retire(job)
+            return job
+
+    def cancel_queued(self):
+        """Cancel every queued job; returns how many."""
+        with self.lock:
+            queued = [job for _, _, job in self.heap if job.state == JOB_QUEUED]
+        for job in queued:
+            self.cancel(job.id)
+        return len(queued)
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def queued(self):
+        """Queued jobs in the order they will run."""
+        with self.lock:
+            return [job for _, _, job in sorted(self.heap, key=lambda item: item[:2]) if job.state == JOB_QUEUED]
+
+    def position(self, job):
+        """1-based place of a queued job in the run order, or None."""
+        for i, queued in enumerate(self.queued(), start=1):
+            if queued is job:
+                return i
+        return None
+
+    def summary(self):
+        """Small view for /api/status and the "jobs" stream event."""
+        queued = self.queued()
+        with self.lock:
+            current = self.current
+        return {"current": current.id if current else None,
+                "queued": [job.id for job in queued]}
+
+    def to_dict(self):
+        queued = self.queued()
+        with self.lock:
+            current = self.current
+            finished = list(self.finished)
+            stats = dict(self.stats)
+        return {
+            "current": current.to_dict() if current else None,
+            "queued": [job.to_dict() for job in queued],
+            "finished": [job.to_dict() for job in reversed(finished)],
+            "stats": stats,
+        }
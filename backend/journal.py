@@ -0,0 +1,215 @@
+"""
+On-disk journal of every run, for post-mortem analysis.
+
+Each run gets one JSON-lines file under JOURNAL_DIR: run start, every bus event
+(log, status, progress, stats) and the handler's records (phase spans with their
+timings and per-code results), then the run end. Records are buffered and written
+in batches: once JOURNAL_FLUSH_RECORDS of them are pending or once
+JOURNAL_FLUSH_INTERVAL seconds have passed. A crash therefore loses at most that
+much. A finished run is gzipped and only the newest JOURNAL_KEEP runs are kept.
+read_run() streams a run back, compressed or not.
+"""
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+
+JOURNAL_DIR = "journal"
+JOURNAL_KEEP = 100
+JOURNAL_FLUSH_RECORDS = 500
+JOURNAL_FLUSH_INTERVAL = 1.0
+JOURNAL_SCHEMA = 1
+RUN_ID_PATTERN = re.compile(r"^run-\d{8}-\d{6}-\d{3}$")
+
+
+# json.dumps() seçenekli çağrıda her seferinde yeni kodlayıcı kurar
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def encode_record(record):
+    return _encoder.encode(record) + "\n"
+
+
+class RunJournal:
+    """Buffered JSON-lines writer for one run; close() compresses the file."""
+
+    def __init__(self, directory=JOURNAL_DIR, flush_records=JOURNAL_FLUSH_RECORDS,
+                 flush_interval=JOURNAL_FLUSH_INTERVAL, keep=JOURNAL_KEEP):
+        self.directory = directory
+        self.flush_records = max(1, int(flush_records))
+        self.flush_interval = flush_interval
+        self.keep = keep
+        self.started_at = time.time()
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        self.run_id = f"run-{stamp}-{int(self.started_at * 1000) % 1000:03d}"
+        self.path = os.path.join(directory, self.run_id + ".jsonl")
+        self.lock = threading.Lock()
+        self.pending = []
+        self.last_flush = time.perf_counter()
+        self.file = None
+        self.closed = False
+        self.stats = {"records": 0, "flushes": 0, "bytes": 0}
+
+    def start(self, **meta):
+        self.write({"type": "run_start", "t": self.started_at, "schema": JOURNAL_SCHEMA,
+                    "run_id": self.run_id, **meta})
+        self.flush()
+
+    def finish(self, **meta):
+        """Write the run_end record and close(); returns the final path."""
+        self.write({"type": "run_end", "t": time.time(),
+                    "seconds": round(time.time() - self.started_at, 3), **meta})
+        return self.close()
+
+    def write(self, record):
+        """Queue one record (a dict with a "type"); written on the next batch flush."""
+        with self.lock:
+            if self.closed:
+                return
+            self.pending.append(encode_record(record))
+            self.stats["records"] += 1
+            if (len(self.pending) >= self.flush_records
+                    or time.perf_counter() - self.last_flush >= self.flush_interval):
+                self._flush()
+
+    def write_many(self, records):
+        with self.lock:
+            if self.closed:
+                return
+            self.pending.extend(encode_record(record) for record in records)
+            self.stats["records"] += len(records)
+            if (len(self.pending) >= self.flush_records
+                    or time.perf_counter() - self.last_flush >= self.flush_interval):
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            if not self.closed:
+                self._flush()
+
+    def _flush(self):
+        self.last_flush = time.perf_counter()
+        if not self.pending:
+            return
+        if self.file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        data = "".join(self.pending)
+        self.pending = []
+        self.file.write(data)
+        self.file.flush()
+        self.stats["flushes"] += 1
+        self.stats["bytes"] += len(data)
+
+    def close(self):
+        """Flush, gzip the run file and drop runs beyond `keep`. Returns the final path."""
+        with self.lock:
+            if self.closed:
+                return self.path
+            self._flush()
+            self.closed = True
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+        if os.path.exists(self.path):
+            try:
+                self.path = compress_file(self.path)
+            except OSError as e:
+                print(f"Journal compression failed: {e}", flush=True)
+        prune_runs(self.directory, self.keep)
+        return self.path
+
+    def get_stats(self):
+        with self.lock:
+            return {"run_id": self.run_id, "path": self.path, "pending": len(self.pending),
+                    "closed": self.closed, **self.stats}
+
+
+def compress_file(path):
+    """Gzip `path` to `path`.gz and remove the original; returns the new path."""
+    target = path + ".gz"
+    with open(path, "rb") as src, gzip.open(target, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(path)
+    return target
+
+
+def run_files(directory=JOURNAL_DIR):
+    """{run_id: file name}, oldest first; a run has either a .jsonl or a .jsonl.gz file."""
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return {}
+    runs = {}
+    for name in names:
+        for suffix in (".jsonl.gz", ".jsonl"):
+            if name.endswith(suffix) and RUN_ID_PATTERN.match(name[:-len(suffix)]):
+                runs.setdefault(name[:-len(suffix)], name)
+                break
+    return runs
+
+
+def prune_runs(directory=JOURNAL_DIR, keep=JOURNAL_KEEP):
+    if not keep:
+        return
+    runs = run_files(directory)
+    for run_id in list(runs)[:-keep]:
+        try:
+            os.remove(os.path.join(directory, runs[run_id]))
+        except OSError:
+            pass
+
+
+def recover_runs(directory=JOURNAL_DIR, active=None):
+    """Compress .jsonl files left open by a crashed server (except `active`); returns how many."""
+    recovered = 0
+    for run_id, name in run_files(directory).items():
+        if name.endswith(".jsonl") and run_id != active:
+            try:
+                compress_file(os.path.join(directory, name))
+                recovered += 1
+            except OSError:
+                pass
+    return recovered
+
+
+def list_runs(directory=JOURNAL_DIR):
+    """Journal files, newest first."""
+    result = []
+    for run_id, name in reversed(list(run_files(directory).items())):
+        path = os.path.join(directory, name)
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        result.append({"id": run_id, "file": name, "bytes": info.st_size,
+                       "compressed": name.endswith(".gz"), "modified": info.st_mtime})
+    return result
+
+
+def read_run(run_id, directory=JOURNAL_DIR, types=None):
+    """
+    Yield the raw JSON lines of one run, optionally only records whose "type" is in
+    `types`. Raises KeyError for an unknown (or malformed) run id.
+    """
+    if not RUN_ID_PATTERN.match(run_id or ""):
+        raise KeyError(run_id)
+    name = run_files(directory).get(run_id)
+    if name is None:
+        raise KeyError(run_id)
+    path = os.path.join(directory, name)
+    opener = gzip.open if name.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            if types:
+                try:
+                    if json.loads(line).get("type") not in types:
+                        continue
+                except ValueError:
+                    continue
+            yield line if line.endswith("\n") else line + "\n"
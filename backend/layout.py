@@ -0,0 +1,45 @@
+"""
+Component placement for inserted parts.
+
+GridLayout replaces the old single Z stack (0.3 m per part, 300 m for 1000 parts)
+with a fixed-pitch 3D grid: slots fill a row along X, then rows along -Y, then
+layers along -Z. A slot's position depends only on its index, so an assembly that
+is extended in a later run continues the same grid from its component count.
+Everything here is plain Python and deterministic.
+"""
+import math
+
+LAYOUT_PITCH = 0.3
+LAYOUT_COLUMNS = 10
+LAYOUT_ROWS = 10
+
+
+class GridLayout:
+    def __init__(self, columns=LAYOUT_COLUMNS, rows=LAYOUT_ROWS, pitch=LAYOUT_PITCH, origin=(0.0, 0.0, 0.0)):
+        self.columns = max(1, int(columns))
+        self.rows = max(1, int(rows))
+        self.pitch = float(pitch)
+        self.origin = tuple(float(v) for v in origin)
+
+    def position(self, index):
+        """(x, y, z) in metres of slot `index`."""
+        per_layer = self.columns * self.rows
+        layer, rest = divmod(index, per_layer)
+        row, col = divmod(rest, self.columns)
+        ox, oy, oz = self.origin
+        return (ox + col * self.pitch, oy - row * self.pitch, oz - layer * self.pitch)
+
+    def positions(self, start, count):
+        """Positions of slots start .. start + count - 1, in one pass."""
+        return [self.position(i) for i in range(start, start + count)]
+
+    def extent(self, count):
+        """Bounding size (dx, dy, dz) of the first `count` slots' origins."""
+        if count <= 0:
+            return (0.0, 0.0, 0.0)
+        per_layer = self.columns * self.rows
+        layers = math.ceil(count / per_layer)
+        rows = self.rows if layers > 1 else math.ceil(count / self.columns)
+        cols = self.columns if count > self.columns else count
+        return ((cols - 1) * self.pitch, (rows - 1) * self.pitch, (layers - 1) * self.pitch)
+
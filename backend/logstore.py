@@ -0,0 +1,160 @@
+"""
+Fixed-capacity run log for the server.
+
+Every entry gets a sequence number that only ever increases, even across clear(),
+so a client's `since` stays valid however long the run gets and however often the
+buffer wraps. append() is O(1) and since(seq) is O(k) in the entries returned.
+Entries pushed out of the ring can optionally be spilled to a rotating JSON-lines
+file.
+"""
+import json
+import os
+import threading
+
+LOG_CAPACITY = 1000
+LOG_SPILL_PATH = os.path.join("logs", "overflow.jsonl")
+LOG_SPILL_MAX_BYTES = 5 * 1024 * 1024
+LOG_SPILL_BACKUPS = 3
+
+
+class SpillFile:
+    """Append-only JSON-lines file rotated to .1 .. .N at max_bytes."""
+
+    def __init__(self, path=LOG_SPILL_PATH, max_bytes=LOG_SPILL_MAX_BYTES, backups=LOG_SPILL_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.file = None
+        self.size = 0
+        self.written = 0
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.size = self.file.tell()
+
+    def _rotate(self):
+        self.file.close()
+        self.file = None
+        for i in range(self.backups - 1, 0, -1):
+            src = f"{self.path}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+    def write(self, seq, entry):
+        if self.file is None:
+            self._open()
+        line = json.dumps({"seq": seq, **entry}, ensure_ascii=False) + "\n"
+        self.file.write(line)
+        self.size += len(line.encode("utf-8"))
+        self.written += 1
+        if self.size >= self.max_bytes:
+            self._rotate()
+
+    def flush(self):
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class LogStore:
+    def __init__(self, capacity=LOG_CAPACITY, spill=None):
+        self.capacity = max(1, int(capacity))
+        self.buffer = [None] * self.capacity
+        # first_seq: en eski tutulan kayıt, next_seq: sıradaki kaydın numarası,
+        # clear_seq: son clear() anındaki next_seq (öncesi silindi, taşma sayılmaz)
+        self.first_seq = 0
+        self.next_seq = 0
+        self.clear_seq = 0
+        self.spill = spill
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def append(self, entry):
+        """Store `entry` (a log dict); returns its sequence number."""
+        with self.lock:
+            seq = self.next_seq
+            slot = seq % self.capacity
+            if seq - self.first_seq == self.capacity:
+                old = self.buffer[slot]
+                self.first_seq += 1
+                self.evicted += 1
+                if self.spill is not None:
+                    try:
+                        self.spill.write(seq - self.capacity, old)
+                    except Exception as e:
+                        print(f"Log spill disabled: {e}", flush=True)
+                        self.spill = None
+            self.buffer[slot] = entry
+            self.next_seq = seq + 1
+            return seq
+
+    def since(self, seq):
+        """
+        Entries with sequence number >= seq, oldest first. Returns (entries, first_seq,
+        next_seq, truncated); truncated is True when some of them were already evicted.
+        """
+        with self.lock:
+            return self._since(seq)
+
+    def _since(self, seq):
+        seq = max(0, seq)
+        first = max(seq, self.first_seq)
+        end = self.next_seq
+        truncated = max(seq, self.clear_seq) < self.first_seq
+        if first >= end:
+            return [], min(first, end), end, truncated
+        start = first % self.capacity
+        stop = start + (end - first)
+        if stop <= self.capacity:
+            entries = self.buffer[start:stop]
+        else:
+            entries = self.buffer[start:] + self.buffer[:stop - self.capacity]
+        return entries, first, end, truncated
+
+    def resize(self, capacity):
+        """Change the capacity, keeping the newest entries and their numbers."""
+        capacity = max(1, int(capacity))
+        with self.lock:
+            if capacity == self.capacity:
+                return
+            entries, _, end, _ = self._since(0)
+            keep = entries[-capacity:]
+            self.capacity = capacity
+            self.buffer = [None] * capacity
+            self.first_seq = end - len(keep)
+            for seq, entry in enumerate(keep, start=self.first_seq):
+                self.buffer[seq % capacity] = entry
+
+    def clear(self):
+        """Drop all entries; numbering continues from next_seq."""
+        with self.lock:
+            self.buffer = [None] * self.capacity
+            self.first_seq = self.clear_seq = self.next_seq
+            if self.spill is not None:
+                self.spill.flush()
+
+    def __len__(self):
+        with self.lock:
+            return self.next_seq - self.first_seq
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "capacity": self.capacity,
+                "size": self.next_seq - self.first_seq,
+                "first_seq": self.first_seq,
+                "next_seq": self.next_seq,
+                "evicted": self.evicted,
+                "spilled": self.spill.written if self.spill is not None else None,
+            }
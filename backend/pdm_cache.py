@@ -0,0 +1,284 @@
+"""
+Persistent SAP code -> vault path resolution cache (SQLite, in the directory of
+config.json; see get_resolution_cache).
+
+Entries are evicted LRU once the table exceeds CACHE_MAX_ENTRIES and expire
+after CACHE_TTL_SECONDS. A hit is revalidated with a single GetFileFromPath
+call instead of a full PDM search; when the file has a newer version than the
+cached one, its SAP variable is read again to make sure the code still matches.
+
+The same database also holds the configuration-name cache: (normalized path,
+version) -> SolidWorks configuration names, so a part is not opened again just
+to read its configurations.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from pdm_index import read_file_variable
+
+CACHE_PATH = "sap_cache.db"
+CACHE_TTL_SECONDS = 30 * 24 * 3600
+CACHE_MAX_ENTRIES = 20000
+CONFIG_CACHE_MAX_ENTRIES = 50000
+
+
+class ResolutionCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            pass
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS sap_cache (
+                code TEXT PRIMARY KEY,
+                path TEXT NOT NULL,
+                ext TEXT,
+                version INTEGER,
+                created REAL,
+                last_used REAL
+            )"""
+        )
+        self.conn.commit()
+
+    def _count(self, key, n=1):
+        self.stats[key] = self.stats.get(key, 0) + n
+
+    def lookup(self, code):
+        """Return the raw cached entry for `code` (dict) or None; applies TTL."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT path, ext, version, created FROM sap_cache WHERE code = ?", (code,)
+            ).fetchone()
+            if not row:
+                return None
+            path, ext, version, created = row
+            if self.ttl and created and now - created > self.ttl:
+                self.conn.execute("DELETE FROM sap_cache WHERE code = ?", (code,))
+                self.conn.commit()
+                self._count("expired")
+                return None
+            return {"path": path, "ext": ext, "version": version}
+
+    def get(self, code, vault, var_names=None):
+        """
+        Return the cached path for `code` if PDM still knows the file with that code,
+        else None. Revalidation is one GetFileFromPath call; if the version changed,
+        the SAP variable (`var_names`) is re-read. Without `var_names` a changed
+        version counts as stale.
+        """
+        entry = self.lookup(code)
+        if not entry:
+            with self.lock:
+                self._count("misses")
+            return None
+        file_obj = None
+        try:
+            res = vault.GetFileFromPath(entry["path"], None)
+            file_obj = res[0] if isinstance(res, tuple) else res
+        except Exception:
+            file_obj = None
+        version = getattr(file_obj, "CurrentVersion", None) if file_obj else None
+        if file_obj and version is not None and entry["version"] is not None and version != entry["version"]:
+            # Yeni sürümde SAP kodu değişmiş olabilir (yeniden kodlanan dosya)
+            if not var_names or read_file_variable(file_obj, var_names) != code:
+                file_obj = None
+        if not file_obj:
+            self.invalidate(code)
+            with self.lock:
+                self._count("stale")
+                self._count("misses")
+            return None
+        with self.lock:
+            self.conn.execute(
+                "UPDATE sap_cache SET version = COALESCE(?, version), last_used = ? WHERE code = ?",
+                (version, time.time(), code),
+            )
+            self.conn.commit()
+            self._count("hits")
+        return entry["path"]
+
+    def put(self, code, path, version=None):
+        now = time.time()
+        ext = os.path.splitext(path)[1].lower()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sap_cache (code, path, ext, version, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (code, path, ext, version, now, now),
+            )
+            self._evict_locked()
+            self.conn.commit()
+
+    def _evict_locked(self):
+        if not self.max_entries:
+            return
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM sap_cache").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM sap_cache WHERE code IN "
+                "(SELECT code FROM sap_cache ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._count("evicted", excess)
+
+    def invalidate(self, code):
+        with self.lock:
+            self.conn.execute("DELETE FROM sap_cache WHERE code = ?", (code,))
+            self.conn.commit()
+
+    def purge(self):
+        """Drop every entry and reset counters; returns the number of removed rows."""
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM sap_cache").fetchone()
+            self.conn.execute("DELETE FROM sap_cache")
+            self.conn.commit()
+            for key in self.stats:
+                self.stats[key] = 0
+        return count
+
+    def get_stats(self):
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM sap_cache").fetchone()
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = count
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        stats["path"] = os.path.abspath(self.path) if self.path != ":memory:" else self.path
+        return stats
+
+
+class ConfigNameCache:
+    """
+    Configuration names per file. One row per normalized path; a row only matches
+    while its stored version equals the file's current version. LRU-bounded.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CONFIG_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            pass
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS config_names (
+                path TEXT PRIMARY KEY,
+                version TEXT,
+                names TEXT NOT NULL,
+                last_used REAL
+            )"""
+        )
+        self.conn.commit()
+
+    def _count(self, key, n=1):
+        self.stats[key] = self.stats.get(key, 0) + n
+
+    def get(self, path, version):
+        """Cached configuration names (list) for `path` at `version`, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT version, names FROM config_names WHERE path = ?", (path,)
+            ).fetchone()
+            if not row or row[0] != str(version):
+                if row:
+                    self._count("stale")
+                self._count("misses")
+                return None
+            try:
+                names = json.loads(row[1])
+            except ValueError:
+                self._count("misses")
+                return None
+            self.conn.execute("UPDATE config_names SET last_used = ? WHERE path = ?", (time.time(), path))
+            self.conn.commit()
+            self._count("hits")
+            return list(names)
+
+    def put(self, path, version, names):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO config_names (path, version, names, last_used) VALUES (?, ?, ?, ?)",
+                (path, str(version), json.dumps(list(names or [])), time.time()),
+            )
+            self._evict_locked()
+            self.conn.commit()
+
+    def _evict_locked(self):
+        if not self.max_entries:
+            return
+        (count,) = self.conn.execute("SELECT COUNT(*) FROM config_names").fetchone()
+        excess = count - self.max_entries
+        if excess > 0:
+            self.conn.execute(
+                "DELETE FROM config_names WHERE path IN "
+                "(SELECT path FROM config_names ORDER BY last_used ASC LIMIT ?)",
+                (excess,),
+            )
+            self._count("evicted", excess)
+
+    def purge(self):
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM config_names").fetchone()
+            self.conn.execute("DELETE FROM config_names")
+            self.conn.commit()
+            for key in self.stats:
+                self.stats[key] = 0
+        return count
+
+    def get_stats(self):
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM config_names").fetchone()
+            stats = dict(self.stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["entries"] = count
+        stats["hit_rate"] = round(stats["hits"] / lookups, 3) if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+_config_cache = None
+
+
+def get_resolution_cache():
+    """Process-wide cache instance; None if the database cannot be opened."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            try:
+                from pdm_logic import config_dir_path
+                _cache = ResolutionCache(config_dir_path(CACHE_PATH))
+            except Exception as e:
+                print(f"Resolution cache unavailable: {e}", flush=True)
+                return None
+        return _cache
+
+
+def get_config_name_cache():
+    """Process-wide configuration-name cache; None if the database cannot be opened."""
+    global _config_cache
+    with _cache_lock:
+        if _config_cache is None:
+            try:
+                from pdm_logic import config_dir_path
+                _config_cache = ConfigNameCache(config_dir_path(CACHE_PATH))
+            except Exception as e:
+                print(f"Configuration cache unavailable: {e}", flush=True)
+                return None
+        return _config_cache
@@ -0,0 +1,312 @@
+"""
+Vault-wide SAP index: walks the vault once from RootFolderPath, records the SAP
+variable of every .sldprt/.sldasm file and keeps code -> path in memory so a
+lookup is a dictionary hit plus one GetFileFromPath revalidation. Re-runs are incremental: files whose CurrentVersion
+did not change are not re-read.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from backends import get_backend
+
+INDEX_PATH = "sap_index.db"
+INDEX_EXTS = (".sldprt", ".sldasm")
+INDEX_COMMIT_BATCH = 1000
+# Dosya seviyesindeki kart değişkeni "@" yapılandırmasında, yoksa varsayılanda durur
+INDEX_VAR_CONFIGS = ("@", "")
+
+
+def iter_folder_items(first_pos, next_item):
+    """Iterate a PDM position-based enumeration (GetFirst*Position / GetNext*)."""
+    pos = first_pos
+    while pos is not None and not getattr(pos, "IsNull", True):
+        item = next_item(pos)
+        if item is None:
+            break
+        yield item
+
+
+def read_file_variable(file_obj, var_names):
+    """Return the first non-empty value of `var_names` on a PDM file, or ""."""
+    try:
+        enum = file_obj.GetEnumeratorVariable()
+    except Exception:
+        return ""
+    for var_name in var_names:
+        for cfg in INDEX_VAR_CONFIGS:
+            try:
+                res = enum.GetVar(var_name, cfg)
+            except Exception:
+                continue
+            value = res[1] if isinstance(res, tuple) and len(res) >= 2 else res
+            if value not in (None, "", True, False):
+                return str(value).strip()
+    return ""
+
+
+class VaultIndex:
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._thread = None
+        self.by_code = {}
+        # SAP kodu -> o kodu taşıyan yollar; tek kayıt değişince by_code yeniden kurulmaz
+        self.code_paths = {}
+        self.by_path = {}
+        self.status = {
+            "state": "idle",
+            "folders": 0,
+            "files": 0,
+            "updated": 0,
+            "removed": 0,
+            "progress": None,
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "stale": 0,
+        }
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.DatabaseError:
+            pass
+        self.conn.execute(
+            """CREATE TABLE IF NOT EXISTS sap_index (
+                path TEXT PRIMARY KEY,
+                code TEXT,
+                version INTEGER
+            )"""
+        )
+        self.conn.commit()
+        self._load()
+
+    def _load(self):
+        rows = self.conn.execute("SELECT path, code, version FROM sap_index").fetchall()
+        with self.lock:
+            self.by_path = {path: (version, code) for path, code, version in rows}
+            self._rebuild_codes_locked()
+
+    def _rebuild_codes_locked(self):
+        by_code = {}
+        code_paths = {}
+        for path in sorted(self.by_path):
+            code = self.by_path[path][1]
+            if code:
+                code_paths.setdefault(code, set()).add(path)
+                by_code.setdefault(code, path)
+        self.by_code = by_code
+        self.code_paths = code_paths
+
+    def _link_code_locked(self, code, path):
+        if not code:
+            return
+        self.code_paths.setdefault(code, set()).add(path)
+        current = self.by_code.get(code)
+        if current is None or path < current:
+            self.by_code[code] = path
+
+    def _unlink_code_locked(self, code, path):
+        paths = self.code_paths.get(code)
+        if paths is None:
+            return
+        paths.discard(path)
+        if not paths:
+            del self.code_paths[code]
+        if self.by_code.get(code) == path:
+            # Aynı kodu taşıyan sıradaki dosya (tam yeniden kurulumla aynı seçim)
+            if paths:
+                self.by_code[code] = min(paths)
+            else:
+                self.by_code.pop(code, None)
+
+    def _replace_entry(self, path, code=None, version=None, remove=False):
+        """Update or drop one row and move its code mapping, without rebuilding by_code."""
+        with self.lock:
+            if remove:
+                self.conn.execute("DELETE FROM sap_index WHERE path = ?", (path,))
+            else:
+                self.conn.execute("INSERT OR REPLACE INTO sap_index (path, code, version) VALUES (?, ?, ?)",
+                                  (path, code, version))
+            self.conn.commit()
+            previous = self.by_path.pop(path, None)
+            if previous is not None:
+                self._unlink_code_locked(previous[1], path)
+            if not remove:
+                self.by_path[path] = (version, code)
+                self._link_code_locked(code, path)
+
+    def get(self, code, vault, var_names):
+        """
+        Indexed path for `code` if PDM still has that file with that SAP code, else None.
+        Revalidation is one GetFileFromPath call; the variable is re-read only when the
+        file's version changed since it was indexed. Stale entries are corrected or dropped.
+        """
+        with self.lock:
+            path = self.by_code.get(code)
+            entry = self.by_path.get(path) if path else None
+        if not path:
+            return None
+        try:
+            res = vault.GetFileFromPath(path, None)
+            file_obj = res[0] if isinstance(res, tuple) else res
+        except Exception:
+            file_obj = None
+        if file_obj:
+            version = getattr(file_obj, "CurrentVersion", None)
+            if version is None or entry is None or version == entry[0]:
+                return path
+            value = read_file_variable(file_obj, var_names)
+            self._replace_entry(path, value, version)
+            if value == code:
+                return path
+        else:
+            self._replace_entry(path, remove=True)
+        with self.lock:
+            self.status["stale"] += 1
+        return None
+
+    def is_running(self):
+        return bool(self._thread and self._thread.is_alive())
+
+    def get_status(self):
+        with self.lock:
+            status = dict(self.status)
+            status["indexed_files"] = len(self.by_path)
+            status["indexed_codes"] = len(self.by_code)
+        if status["started_at"]:
+            end = status["finished_at"] or time.time()
+            status["elapsed"] = round(end - status["started_at"], 3)
+        return status
+
+    def start(self, vault_factory, var_names):
+        """Build/refresh in a background thread. Returns False if already running."""
+        if self.is_running():
+            return False
+        self.stop_event.clear()
+        self._thread = threading.Thread(target=self._run, args=(vault_factory, var_names), daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _run(self, vault_factory, var_names):
+        backend = get_backend()
+        co_initialized = backend.co_initialize()
+        try:
+            vault = vault_factory()
+            if not vault:
+                with self.lock:
+                    self.status.update(state="error", error="PDM bağlantısı kurulamadı", finished_at=time.time())
+                return
+            self.build(vault, var_names)
+        except Exception as e:
+            with self.lock:
+                self.status.update(state="error", error=str(e), finished_at=time.time())
+        finally:
+            if co_initialized:
+                backend.co_uninitialize()
+
+    def build(self, vault, var_names):
+        """Walk the vault synchronously and update the index incrementally."""
+        with self.lock:
+            previous = dict(self.by_path)
+            self.status.update(state="running", folders=0, files=0, updated=0, removed=0,
+                               progress=0.0 if previous else None, error=None,
+                               started_at=time.time(), finished_at=None)
+        expected = len(previous)
+        seen = set()
+        pending = []
+        folders = files = updated = 0
+
+        root = vault.GetFolderFromPath(vault.RootFolderPath)
+        stack = [root] if root else []
+        while stack:
+            if self.stop_event.is_set():
+                break
+            folder = stack.pop()
+            folders += 1
+            folder_path = getattr(folder, "LocalPath", "")
+            try:
+                for file_obj in iter_folder_items(folder.GetFirstFilePosition(), folder.GetNextFile):
+                    name = getattr(file_obj, "Name", "")
+                    if os.path.splitext(name)[1].lower() not in INDEX_EXTS:
+                        continue
+                    files += 1
+                    path = os.path.join(folder_path, name)
+                    seen.add(path)
+                    version = getattr(file_obj, "CurrentVersion", None)
+                    known = previous.get(path)
+                    if known and version is not None and known[0] == version:
+                        continue
+                    code = read_file_variable(file_obj, var_names)
+                    pending.append((path, code, version))
+                    updated += 1
+            except Exception:
+                pass
+            try:
+                stack.extend(iter_folder_items(folder.GetFirstSubFolderPosition(), folder.GetNextSubFolder))
+            except Exception:
+                pass
+            if len(pending) >= INDEX_COMMIT_BATCH:
+                self._apply(pending, [], rebuild=False)
+                pending = []
+            with self.lock:
+                self.status.update(folders=folders, files=files, updated=updated)
+                if expected:
+                    self.status["progress"] = round(min(files / expected, 0.99), 3)
+
+        stopped = self.stop_event.is_set()
+        # Yarım kalan taramada görülmeyen dosyaları silme
+        removed = [] if stopped else [p for p in previous if p not in seen]
+        self._apply(pending, removed)
+        with self.lock:
+            self.status.update(state="stopped" if stopped else "done", removed=len(removed),
+                               progress=None if stopped else 1.0, finished_at=time.time())
+        return self.get_status()
+
+    def _apply(self, updates, removed, rebuild=True):
+        with self.lock:
+            if updates:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO sap_index (path, code, version) VALUES (?, ?, ?)", updates
+                )
+                for path, code, version in updates:
+                    self.by_path[path] = (version, code)
+            if removed:
+                self.conn.executemany("DELETE FROM sap_index WHERE path = ?", [(p,) for p in removed])
+                for path in removed:
+                    self.by_path.pop(path, None)
+            self.conn.commit()
+            if rebuild:
+                self._rebuild_codes_locked()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM sap_index")
+            self.conn.commit()
+            self.by_path = {}
+            self.by_code = {}
+            self.code_paths = {}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vault_index():
+    """Process-wide index instance; None if the database cannot be opened."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                from pdm_logic import config_dir_path
+                _index = VaultIndex(config_dir_path(INDEX_PATH))
+            except Exception as e:
+                print(f"Vault index unavailable: {e}", flush=True)
+                return None
+        return _index
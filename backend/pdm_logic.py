@@ -1,14 +1,16 @@
+import inspect
 import json
 import os
 import sys
 import time
-import subprocess
-import ctypes
 import threading
-import win32com.client
-import pythoncom
-import winreg
-from queue import Queue
+from queue import Queue, Empty
+from backends import get_backend
+from pdm_cache import get_resolution_cache, get_config_name_cache
+from pdm_index import get_vault_index
+from file_wait import wait_for_file_ready, adaptive_timeout, DOWNLOAD_TIMEOUT_MIN
+from layout import GridLayout, LAYOUT_COLUMNS, LAYOUT_ROWS, LAYOUT_PITCH
+from profiler import Profiler, profiled, PROFILE_DIR
 
 # --- Konfigürasyon ve Sabitler ---
 VAULT_NAME = "PGR2024"
@@ -28,30 +30,97 @@ PDM_VAR_NAMES = [
 
 PREFERRED_EXTS = {".sldprt", ".sldasm"}
 
+# Paralel PDM araması - her işçi kendi COM apartmanında kendi kasa nesnesini kullanır
+SEARCH_WORKERS = 4
+# Ön-getirme hattı: eşzamanlı GetFileCopy sayısı ve CAD döngüsünün önünde tutulabilecek dosya sayısı
+DOWNLOAD_WORKERS = 3
+PREFETCH_AHEAD = 8
+# Kuyruktaki bir sonraki işin ön hazırlığı: arama ve indirme işçisi sayısı (çalışan işin önünde, hafif tutulur)
+PREPARE_WORKERS = 1
+# Hat kapanırken işçilerin elindeki aramayı/indirmeyi bitirip bağlantıyı havuza bırakması için beklenen süre
+PIPELINE_JOIN_TIMEOUT = 10.0
+
+# OpenDoc6 sonrası belgenin kullanılabilir olmasını bekleme (eskiden sabit 1.5 sn uyku)
+DOC_READY_MAX_WAIT = 1.5
+DOC_READY_POLL = 0.05
+
+# Bileşen kaydı kaç eklemede bir GetComponents ile SolidWorks'le uzlaştırılır
+COMPONENT_RECONCILE_EVERY = 50
+
+# Toplu modda AddComponents3 ile tek çağrıda eklenen parça sayısı (0 = tek tek ekle)
+BULK_INSERT_CHUNK = 50
+
 # SolidWorks Sabitleri
 SW_DEFAULT_TEMPLATE_KEYS = (8, 1)
 SW_DOC_PART = 1
 SW_DOC_ASSEMBLY = 2
 SW_OPEN_SILENT = 64
+# swOpenDocOptions_OverrideDefaultLoadLightweight (64) ile birlikte alt montajları hafif yükler
+SW_OPEN_LOAD_LIGHTWEIGHT = 128
 SW_MATE_COINCIDENT = 0
 TEMPLATE_OVERRIDE = ""
 
 # --- Yardımcı Fonksiyonlar ---
 
-def load_config():
+def join_threads(threads, timeout):
+    """Join `threads` within `timeout` seconds in total; returns True if all have exited."""
+    deadline = time.time() + timeout
+    for t in threads:
+        t.join(max(0.0, deadline - time.time()))
+    return not any(t.is_alive() for t in threads)
+
+# config.json okuma-değiştirme-yazma işlemleri (sunucu, çalıştırma ve işçi iş parçacıkları) bu kilitle sıralanır
+_config_lock = threading.RLock()
+
+def _read_config():
+    """Parsed config.json; {} if it does not exist. Raises on an unreadable / malformed file."""
     try:
         with open(CONFIG_PATH, "r", encoding="utf-8") as f:
             data = json.load(f)
-            return data if isinstance(data, dict) else {}
-    except Exception:
+    except FileNotFoundError:
         return {}
+    return data if isinstance(data, dict) else {}
+
+def config_dir_path(name):
+    """`name` in the directory of config.json (SQLite databases live next to it); ":memory:" is kept."""
+    if name == ":memory:":
+        return name
+    return os.path.join(os.path.dirname(os.path.abspath(CONFIG_PATH)), name)
+
+def load_config():
+    with _config_lock:
+        try:
+            return _read_config()
+        except Exception:
+            return {}
 
 def save_config(cfg):
-    try:
-        with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-            json.dump(cfg, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    """Write config.json atomically (temp file + os.replace), so a reader never sees it half written."""
+    with _config_lock:
+        tmp_path = f"{CONFIG_PATH}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cfg, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, CONFIG_PATH)
+        except Exception:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def update_config(key, value):
+    """
+    Set one key in config.json under the config lock, keeping every other setting.
+    Skipped (returns False) if the current file cannot be read, instead of overwriting it.
+    """
+    with _config_lock:
+        try:
+            cfg = _read_config()
+        except Exception:
+            return False
+        cfg[key] = value
+        save_config(cfg)
+        return True
 
 def resource_path(relative_path: str) -> str:
     try:
@@ -61,25 +130,15 @@ def resource_path(relative_path: str) -> str:
     return os.path.join(base_path, relative_path)
 
 def read_vault_path_registry():
-    try:
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, REG_PATH) as key:
-            val, _ = winreg.QueryValueEx(key, REG_VALUE_NAME)
-            return val or ""
-    except FileNotFoundError:
-        return ""
-    except Exception:
-        return ""
+    return get_backend().read_registry_value(REG_PATH, REG_VALUE_NAME)
 
 def write_vault_path_registry(path):
-    try:
-        key = winreg.CreateKey(winreg.HKEY_CURRENT_USER, REG_PATH)
-        winreg.SetValueEx(key, REG_VALUE_NAME, 0, winreg.REG_SZ, path or "")
-    except Exception:
-        pass
+    get_backend().write_registry_value(REG_PATH, REG_VALUE_NAME, path)
 
 def to_short_path(path):
     """Return Windows short (8.3) path if available; helps with long/unicode paths in COM."""
     try:
+        import ctypes
         buf = ctypes.create_unicode_buffer(1024)
         res = ctypes.windll.kernel32.GetShortPathNameW(path, buf, len(buf))
         if res:
@@ -119,27 +178,475 @@ def normalize_path_for_compare(path):
     except Exception:
         return path or ""
 
+def connect_vault(vault_name=VAULT_NAME):
+    """Connect and log in to the PDM vault through the active backend; raises on failure."""
+    return get_backend().connect_vault(vault_name)
+
+def try_connect_vault(vault_name=VAULT_NAME):
+    try:
+        return connect_vault(vault_name)
+    except Exception:
+        return None
+
 def get_last_version(file_path, vault_name=VAULT_NAME):
     """Return latest version number of a PDM file; None if unavailable."""
+    lease = None
     try:
-        try:
-            vault = win32com.client.Dispatch("ConisioLib.EdmVault5")
-        except Exception:
-            vault = win32com.client.Dispatch("ConisioLib.EdmVault")
-        if not vault.IsLoggedIn:
-            vault.LoginAuto(vault_name, 0)
+        if vault_name == VAULT_NAME:
+            from connections import get_connection_manager
+            lease = get_connection_manager().lease("vault")
+        vault = lease.obj if lease else connect_vault(vault_name)
 
         res = vault.GetFileFromPath(file_path)
         file_obj = res[0] if isinstance(res, tuple) else res
         return getattr(file_obj, "LatestVersion", None)
     except Exception:
         return None
+    finally:
+        vault = None
+        if lease:
+            lease.release()
 
 
 # --- Ana Uygulama Mantığı (SolidWorks & PDM) ---
 
+class SapSearchStrategy:
+    """
+    Learns which PDM variable holds SAP numbers in this vault and tries it first.
+    The ranking lives in memory during a run; save() persists it in config.json
+    ("sap_var_ranking") next to vault_name once the run finishes.
+    When the search object supports it, all variants are OR'ed into one query.
+    """
+
+    CONFIG_KEY = "sap_var_ranking"
+
+    def __init__(self, var_names=None, learn=True, persist=True):
+        self.var_names = list(var_names or PDM_VAR_NAMES)
+        self.learn = learn
+        self.persist = persist
+        self.lock = threading.Lock()
+        # Sıralama son save()'den beri değişti mi
+        self.dirty = False
+        # None: henüz denenmedi, True/False: çoklu değişken sorgusu destekleniyor mu
+        self.multi_supported = None if learn else False
+        saved = load_config().get(self.CONFIG_KEY) if persist else None
+        saved = [n for n in (saved or []) if n in self.var_names]
+        self.order = saved + [n for n in self.var_names if n not in saved]
+
+    def ordered(self):
+        with self.lock:
+            return list(self.order)
+
+    def use_multi(self):
+        with self.lock:
+            return self.multi_supported is not False
+
+    def set_multi(self, supported):
+        with self.lock:
+            self.multi_supported = bool(supported)
+
+    def record_hit(self, var_name):
+        """Move the variable that produced a hit to the front of the ranking."""
+        if not self.learn:
+            return
+        with self.lock:
+            if not self.order or self.order[0] == var_name or var_name not in self.order:
+                return
+            self.order.remove(var_name)
+            self.order.insert(0, var_name)
+            self.dirty = True
+
+    def save(self):
+        """Persist the ranking if it changed (called once per run, not from the search workers)."""
+        if not self.persist:
+            return
+        with self.lock:
+            if not self.dirty:
+                return
+            order = list(self.order)
+            self.dirty = False
+        if not update_config(self.CONFIG_KEY, order):
+            with self.lock:
+                self.dirty = True
+
+
+def component_path(comp):
+    """Path of a SolidWorks component (GetPathName, falling back to GetPathName2)."""
+    try:
+        return comp.GetPathName() or ""
+    except Exception:
+        try:
+            return comp.GetPathName2() or ""
+        except Exception:
+            return ""
+
+
+def component_key(comp):
+    """
+    Identity of a component across COM calls: its instance name (Name2), else its
+    normalized path. win32com returns a new wrapper per call, so id() never matches.
+    """
+    return getattr(comp, "Name2", "") or normalize_path_for_compare(component_path(comp))
+
+
+class ComponentRegistry:
+    """
+    In-memory view of the assembly's top-level components (names and normalized
+    paths). Seeded once from GetComponents(True), updated from each insert's return
+    value and reconciled with SolidWorks every `reconcile_every` inserts.
+    """
+
+    def __init__(self, reconcile_every=COMPONENT_RECONCILE_EVERY):
+        self.reconcile_every = reconcile_every
+        self.names = set()
+        self.paths = set()
+        self.count = 0
+        self.inserts_since_reconcile = 0
+
+    def __len__(self):
+        return self.count
+
+    def seed(self, assembly_doc):
+        """Rebuild from the assembly; returns the component count."""
+        names = set()
+        paths = set()
+        count = 0
+        try:
+            comps = assembly_doc.GetComponents(True) or []
+        except Exception:
+            comps = []
+        for comp in comps:
+            if not comp:
+                continue
+            count += 1
+            name = getattr(comp, "Name2", "")
+            if name:
+                names.add(name)
+            path = component_path(comp)
+            if path:
+                paths.add(normalize_path_for_compare(path))
+        self.names, self.paths, self.count = names, paths, count
+        self.inserts_since_reconcile = 0
+        return count
+
+    def add(self, comp, file_path=None):
+        """Record a freshly inserted component."""
+        self.count += 1
+        self.inserts_since_reconcile += 1
+        name = getattr(comp, "Name2", "") if comp else ""
+        if name:
+            self.names.add(name)
+        path = component_path(comp) if comp else ""
+        if path or file_path:
+            self.paths.add(normalize_path_for_compare(path or file_path))
+
+    def reconcile(self, assembly_doc):
+        """
+        Periodic check against SolidWorks: a GetComponentCount call, and a full reseed
+        only if the counts disagree (e.g. the user deleted a component mid-run).
+        """
+        if not self.reconcile_every or self.inserts_since_reconcile < self.reconcile_every:
+            return False
+        self.inserts_since_reconcile = 0
+        try:
+            if int(assembly_doc.GetComponentCount(True)) == self.count:
+                return False
+        except Exception:
+            pass
+        self.seed(assembly_doc)
+        return True
+
+    def collect_new_components(self, assembly_doc):
+        """
+        Components present in the assembly but not yet recorded (an insert call that
+        added components without returning them). Does not update the registry.
+        """
+        try:
+            current = assembly_doc.GetComponentCount(True)
+            if current is not None and int(current) <= self.count:
+                return []
+        except Exception:
+            pass
+        try:
+            comps = assembly_doc.GetComponents(True) or []
+        except Exception:
+            return []
+        return [c for c in comps if c and getattr(c, "Name2", "") not in self.names]
+
+    def find_new_component(self, assembly_doc, target_paths):
+        """
+        Locate a component an insert API added without returning it. A single
+        GetComponentCount call skips the walk when nothing was added.
+        """
+        try:
+            current = assembly_doc.GetComponentCount(True)
+            if current is not None and int(current) <= self.count:
+                return None
+        except Exception:
+            pass
+        try:
+            comps = assembly_doc.GetComponents(True) or []
+        except Exception:
+            return None
+        for comp in comps:
+            name = getattr(comp, "Name2", "")
+            if name and name not in self.names:
+                return comp
+            comp_path = component_path(comp)
+            if comp_path and normalize_path_for_compare(comp_path) in target_paths and not name:
+                return comp
+        return None
+
+
+class InsertStrategyMemo:
+    """
+    Remembers which insert API / path variant combination works for a SolidWorks
+    revision and file type, so the cascade in add_component_to_assembly starts with
+    it. A learned entry that fails is demoted. Changes stay in memory; save()
+    persists them in config.json ("insert_strategies") once per session.
+    """
+
+    CONFIG_KEY = "insert_strategies"
+
+    def __init__(self, learn=True, persist=True):
+        self.learn = learn
+        self.persist = persist
+        self.lock = threading.Lock()
+        self.dirty = False
+        saved = load_config().get(self.CONFIG_KEY) if persist else None
+        self.learned = {k: list(v) for k, v in (saved or {}).items() if isinstance(v, list)}
+
+    @staticmethod
+    def make_key(sw_revision, ext):
+        return f"{sw_revision or '?'}|{ext}"
+
+    def order(self, key, attempts):
+        """Sort attempts (dicts with 'id') so learned ids come first, rest in default order."""
+        if not self.learn:
+            return list(attempts)
+        with self.lock:
+            learned = self.learned.get(key, [])
+        rank = {attempt_id: i for i, attempt_id in enumerate(learned)}
+        return sorted(attempts, key=lambda a: rank.get(a["id"], len(rank)))
+
+    def record_success(self, key, attempt_id):
+        if not self.learn:
+            return
+        with self.lock:
+            learned = self.learned.setdefault(key, [])
+            if learned and learned[0] == attempt_id:
+                return
+            if attempt_id in learned:
+                learned.remove(attempt_id)
+            learned.insert(0, attempt_id)
+            self.dirty = True
+
+    def record_failure(self, key, attempt_id):
+        if not self.learn:
+            return
+        with self.lock:
+            learned = self.learned.get(key, [])
+            if attempt_id not in learned:
+                return
+            learned.remove(attempt_id)
+            self.dirty = True
+
+    def save(self):
+        """Persist learned orders if they changed since the last save."""
+        if not self.persist:
+            return
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = {k: list(v) for k, v in self.learned.items()}
+            self.dirty = False
+        if not update_config(self.CONFIG_KEY, snapshot):
+            with self.lock:
+                self.dirty = True
+
+
+def is_com_method(obj, name, value):
+    """
+    True if `value` (obj.name) is a method to call, not a property value. COM objects
+    read from properties are callable too (CDispatch.__call__), so callable() is not enough.
+    """
+    # makepy sınıflarında özellikler _prop_map_get_ içinde
+    prop_map = getattr(type(obj), "_prop_map_get_", None)
+    if prop_map and name in prop_map:
+        return False
+    return inspect.ismethod(value) or inspect.isbuiltin(value) or inspect.isfunction(value)
+
+
+class CountingProxy:
+    """Wraps a COM object and counts every method call / property read by name."""
+
+    __slots__ = ("_obj", "_counts", "_prefix")
+
+    def __init__(self, obj, counts, prefix):
+        object.__setattr__(self, "_obj", obj)
+        object.__setattr__(self, "_counts", counts)
+        object.__setattr__(self, "_prefix", prefix)
+
+    def _hit(self, name):
+        key = f"{self._prefix}.{name}"
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+    def __getattr__(self, name):
+        value = getattr(self._obj, name)
+        if is_com_method(self._obj, name, value):
+            def call(*args, **kwargs):
+                self._hit(name)
+                return value(*args, **kwargs)
+            return call
+        self._hit(name)
+        return value
+
+    def __setattr__(self, name, value):
+        self._hit(name)
+        setattr(self._obj, name, value)
+
+    def __bool__(self):
+        return bool(self._obj)
+
+
+def unwrap_proxy(obj):
+    """The COM object behind a CountingProxy (or `obj` itself)."""
+    return obj._obj if isinstance(obj, CountingProxy) else obj
+
+
+class AssemblySession:
+    """
+    SolidWorks handles and per-run insert state for one target assembly: cached math
+    utility and vault, the open-document set, a reusable transform array, the component
+    registry and the running Z offset. All COM access through sw_app / assembly_doc is
+    counted so per-insert call counts can be inspected.
+    """
+
+    def __init__(self, sw_app, assembly_doc, locked_title, asm_title, pre_open_docs, layout, next_slot, registry):
+        self.com_calls = {}
+        self.sw_app = CountingProxy(sw_app, self.com_calls, "sw")
+        self._assembly_doc = None
+        self.assembly_doc = assembly_doc
+        self.locked_title = locked_title
+        self.asm_title = asm_title
+        self.pre_open_docs = set(pre_open_docs or [])
+        self.open_docs = set(self.pre_open_docs)
+        self.layout = layout
+        # Bir sonraki parçanın yerleşim hücresi
+        self.next_slot = next_slot
+        self.registry = registry
+        self.math_util = None
+        self._math_util_loaded = False
+        self.vault = None
+        # Dönüşüm dizisi bir kez kurulur, her eklemede yalnızca öteleme değişir
+        self.transform_data = [1.0, 0.0, 0.0,
+                               0.0, 1.0, 0.0,
+                               0.0, 0.0, 1.0,
+                               0.0, 0.0, 0.0]
+        self.inserts = 0
+        self.last_insert_calls = {}
+        self._insert_start = None
+        self._insert_clock = 0.0
+        self.failed_insert_calls = 0
+        self.insert_seconds = 0.0
+        # Hızlı ekleme modunda değiştirilen (nesne, özellik, önceki değer) kayıtları
+        self.suspended_state = None
+        self.fast_insert_used = False
+        self.rebuild_seconds = 0.0
+        # AddComponents3 bir kez reddedilirse bu oturumda tekrar denenmez
+        self.bulk_insert = True
+        self.bulk_inserted = 0
+        # Hafif modda model açılmadan hiçbir ekleme API'si çalışmayan anahtarlar
+        self.closed_insert_unsupported = set()
+        self._sw_revision = None
+
+    @property
+    def sw_revision(self):
+        """Major SolidWorks revision (e.g. "31"), read once per session."""
+        if self._sw_revision is None:
+            try:
+                self._sw_revision = str(self.sw_app.RevisionNumber() or "").split(".")[0]
+            except Exception:
+                self._sw_revision = ""
+        return self._sw_revision
+
+    @property
+    def assembly_doc(self):
+        return self._assembly_doc
+
+    @assembly_doc.setter
+    def assembly_doc(self, doc):
+        if doc is not None and not isinstance(doc, CountingProxy):
+            doc = CountingProxy(doc, self.com_calls, "asm")
+        self._assembly_doc = doc
+
+    def get_math_util(self):
+        if not self._math_util_loaded:
+            self._math_util_loaded = True
+            try:
+                math_util = self.sw_app.GetMathUtility()
+                self.math_util = CountingProxy(math_util, self.com_calls, "math") if math_util else None
+            except Exception:
+                self.math_util = None
+        return self.math_util
+
+    def get_vault(self, handler):
+        if self.vault is None:
+            self.vault = handler.get_pdm_vault()
+        return self.vault
+
+    def make_transform(self, position):
+        math_util = self.get_math_util()
+        if not math_util:
+            return None
+        self.transform_data[9:12] = position
+        return math_util.CreateTransform(tuple(self.transform_data))
+
+    def make_bulk_transforms(self, positions):
+        """
+        AddComponents3 transform array: 16 doubles per component (rotation matrix,
+        translation, scale, three unused), only the translation differs.
+        """
+        data = []
+        for position in positions:
+            data.extend(self.transform_data[:9])
+            data.extend(position)
+            data.extend((1.0, 0.0, 0.0, 0.0))
+        return data
+
+    def begin_insert(self):
+        self._insert_start = dict(self.com_calls)
+        self._insert_clock = time.perf_counter()
+
+    def end_insert(self, count=1):
+        before = self._insert_start or {}
+        self.last_insert_calls = {k: v - before.get(k, 0) for k, v in self.com_calls.items() if v != before.get(k, 0)}
+        self.inserts += count
+        self.insert_seconds += time.perf_counter() - self._insert_clock
+        self._insert_start = None
+
+    def get_stats(self):
+        calls = dict(self.com_calls)
+        total = sum(calls.values())
+        return {
+            "assembly": self.asm_title,
+            "inserts": self.inserts,
+            "com_calls_total": total,
+            "com_calls_per_insert": round(total / self.inserts, 2) if self.inserts else 0.0,
+            "com_calls": calls,
+            "last_insert": dict(self.last_insert_calls),
+            "failed_insert_calls": self.failed_insert_calls,
+            "bulk_inserted": self.bulk_inserted,
+            "insert_seconds": round(self.insert_seconds, 3),
+            "fast_insert": self.fast_insert_used,
+            "rebuild_seconds": round(self.rebuild_seconds, 3),
+            "registry_components": len(self.registry) if self.registry is not None else None,
+            "next_slot": self.next_slot,
+        }
+
+
 class LogicHandler:
-    def __init__(self, log_queue, status_queue, progress_queue, add_to_existing_callback, stop_on_not_found_callback, stats_queue=None):
+    def __init__(self, log_queue, status_queue, progress_queue, add_to_existing_callback, stop_on_not_found_callback, stats_queue=None, vault_path=None):
         self.log_queue = log_queue
         self.status_queue = status_queue
         self.progress_queue = progress_queue
@@ -147,9 +654,58 @@ class LogicHandler:
         self.get_add_to_existing = add_to_existing_callback
         self.get_stop_on_not_found = stop_on_not_found_callback
         self.config = {}
-        self.vault_path = read_vault_path_registry()
+        # Sunucu kasa yolunu zaten biliyorsa kayıt defteri tekrar okunmaz
+        self.vault_path = vault_path if vault_path is not None else read_vault_path_registry()
         self.is_running = False
         self.is_paused = False
+        self.stats = {"total": 0, "success": 0, "error": 0}
+        # PDM/SolidWorks erişimi (win32com veya simülatör, bkz. backends.py)
+        self.backend = get_backend()
+        # Sunucunun kalıcı bağlantı havuzu (connections.ConnectionManager); yoksa her çalıştırma bağlanır
+        self.connections = None
+        self._lease_local = threading.local()
+        self.search_strategy = SapSearchStrategy()
+        self.resolution_cache = get_resolution_cache()
+        self.config_cache = get_config_name_cache()
+        # Bu çalıştırmadaki yapılandırma önbelleği isabetleri (özet için)
+        self.config_cache_stats = {"hits": 0, "misses": 0}
+        # normalize edilmiş yol -> PDM sürümü (indirme/sürüm kontrolünde öğrenilir)
+        self.file_versions = {}
+        # Faz süreleri (arama, indirme, açma, ekleme, kapatma); /api/metrics ve çalıştırma profili
+        self.profiler = Profiler()
+        self.profile_dir = PROFILE_DIR
+        # Sunucunun çalıştırma günlüğü kanalı (journal.py); None ise kayıt tutulmaz
+        self.record_queue = None
+        self.profiler.listener = self.record_span
+        # normalize edilmiş yol -> SAP kodu, faz sürelerini koda bağlamak için
+        self.path_codes = {}
+        # normalize edilmiş yol -> arama sonucundaki PDM sürümü, çözümleme önbelleğine yazılır
+        self.search_versions = {}
+        # Ön hazırlıktan devralınan SAP kodu -> (yol, yerelde mi); bkz. adopt_preparation
+        self.prepared = {}
+        self.prepared_local = set()
+        self.sap_index = get_vault_index()
+        try:
+            self.download_timeout = float(load_config().get("download_timeout", DOWNLOAD_TIMEOUT_MIN))
+        except Exception:
+            self.download_timeout = DOWNLOAD_TIMEOUT_MIN
+        try:
+            self.doc_ready_max_wait = float(load_config().get("doc_ready_max_wait", DOC_READY_MAX_WAIT))
+        except Exception:
+            self.doc_ready_max_wait = DOC_READY_MAX_WAIT
+        # Dosya başına gözlenen belge hazır olma bekleme süreleri (sn)
+        self.doc_wait_times = {}
+        # init_assembly_doc tarafından oluşturulur
+        self.assembly_session = None
+        self.insert_memo = InsertStrategyMemo()
+        # Hızlı ekleme: görünüm/özellik ağacı güncellemeleri kapalı, yeniden oluşturma sonda
+        self.fast_insert = False
+        # Hafif mod: bileşenler açılmadan (meta veriden yapılandırma adı) eklenir
+        self.lightweight = False
+        # Paralel arama işçilerinin logları burada tamponlanır, sırayla yayınlanır
+        self._log_local = threading.local()
+        # Çalışan ön-getirme hattının iş parçacıkları (bkz. is_prefetching)
+        self.prefetch_threads = []
         if self.stats_queue is None:
             self.log("CRITICAL: Stats Queue is None!", "#ef4444")
         else:
@@ -157,7 +713,6 @@ class LogicHandler:
             pass
 
     def update_stats(self, total=None, success=None, error=None):
-        print(f"DEBUG: update_stats called with total={total}, success={success}, error={error}", flush=True)
         if total is not None: self.stats["total"] = total
         if success is not None: self.stats["success"] = success
         if error is not None: self.stats["error"] = error
@@ -169,17 +724,37 @@ class LogicHandler:
 
         if self.stats_queue:
             try:
-                print(f"DEBUG: Putting stats to queue: {self.stats}", flush=True)
                 self.stats_queue.put(self.stats.copy())
             except Exception as e:
                 self.log(f"Stats Queue Error: {e}", "#ef4444")
-                print(f"DEBUG: Stats Queue Error: {e}", flush=True)
         else:
             self.log("Stats Queue is disconnected (None)", "#ef4444")
-            print("DEBUG: Stats Queue is disconnected (None)", flush=True)
 
     def log(self, message, color=None):
-        self.log_queue.put({"message": message, "color": color, "timestamp": time.time()})
+        entry = {"message": message, "color": color, "timestamp": time.time()}
+        buffer = getattr(self._log_local, "buffer", None)
+        if buffer is not None:
+            buffer.append(entry)
+            return
+        self.log_queue.put(entry)
+
+    def flush_log_buffer(self, entries):
+        """Publish log entries captured on a worker thread, preserving their order."""
+        buffer = getattr(self._log_local, "buffer", None)
+        if buffer is not None:
+            buffer.extend(entries or [])
+            return
+        for entry in entries or []:
+            self.log_queue.put(entry)
+
+    def record(self, kind, **fields):
+        """Send a `kind` record (span, result) to the run journal, if the server keeps one."""
+        if self.record_queue is not None:
+            self.record_queue.put({"type": kind, "t": time.time(), **fields})
+
+    def record_span(self, phase, seconds, key, error):
+        if self.record_queue is not None:
+            self.record("span", phase=phase, key=key, seconds=round(seconds, 6), error=error)
 
     def set_status(self, status):
         self.status_queue.put(status)
@@ -271,15 +846,35 @@ class LogicHandler:
             pass
         return doc
 
+    def lease_connection(self, kind):
+        """Pooled vault / SolidWorks object for the calling thread; None if no slot is free."""
+        lease = self.connections.lease(kind)
+        if lease is None:
+            return None
+        leases = getattr(self._lease_local, "leases", None)
+        if leases is None:
+            leases = self._lease_local.leases = []
+        leases.append(lease)
+        return lease.obj
+
+    def release_connections(self):
+        """Return the calling thread's leases to the pool; call before co_uninitialize."""
+        leases = getattr(self._lease_local, "leases", None) or []
+        self._lease_local.leases = []
+        for lease in leases:
+            lease.release()
+
+    @profiled("connect")
     def get_pdm_vault(self):
-        try:
+        if self.connections:
             try:
-                vault = win32com.client.Dispatch("ConisioLib.EdmVault5")
-            except Exception:
-                vault = win32com.client.Dispatch("ConisioLib.EdmVault")
-            if not vault.IsLoggedIn:
-                vault.LoginAuto(VAULT_NAME, 0)
-            return vault
+                vault = self.lease_connection("vault")
+                if vault is not None:
+                    return vault
+            except Exception as e:
+                self.log(f"Bağlantı havuzu: kasa alınamadı ({e}), doğrudan bağlanılıyor...", "#6b7280")
+        try:
+            return self.backend.connect_vault(VAULT_NAME)
         except Exception as e:
             err_str = str(e)
             if "Geçersiz sınıf dizesi" in err_str or "-2147221005" in err_str:
@@ -288,16 +883,25 @@ class LogicHandler:
                 self.log(f"PDM Bağlantı Hatası: {err_str}", "#ef4444")
             return None
 
+    @profiled("connect")
     def get_sw_app(self):
+        if self.connections:
+            try:
+                sw_app = self.lease_connection("cad")
+                if sw_app is not None:
+                    self.log("SolidWorks oturumu hazır (bağlantı havuzu).", "#2cc985")
+                    return sw_app
+            except Exception as e:
+                self.log(f"Bağlantı havuzu: SolidWorks alınamadı ({e}), doğrudan bağlanılıyor...", "#6b7280")
         try:
-            sw_app = win32com.client.GetActiveObject("SldWorks.Application")
+            sw_app = self.backend.get_active_cad_app()
             self.log("Mevcut SolidWorks oturumu bulundu.", "#2cc985")
             return sw_app
         except Exception:
             self.log("Açık SolidWorks oturumu bulunamadı, başlatılıyor...", "#f59e0b")
         
         try:
-            sw_app = win32com.client.Dispatch("SldWorks.Application")
+            sw_app = self.backend.start_cad_app()
             sw_app.Visible = True
             return sw_app
         except Exception as e:
@@ -358,51 +962,87 @@ class LogicHandler:
             return pdm_path
         return pdm_path
 
+    def build_path_variants(self, path):
+        """Return unique (variant, path) pairs in try order: long, short, original."""
+        variants = []
+        seen = set()
+        for variant, p in (("long", to_long_path(path)), ("short", to_short_path(path)), ("original", path)):
+            if p and p not in seen:
+                seen.add(p)
+                variants.append((variant, p))
+        return variants
+
     def build_path_candidates(self, path):
         """Return unique path variants (long/short/original) plus normalized compare set."""
-        short_path = to_short_path(path)
-        long_path = to_long_path(path)
-        candidates = []
-        for p in (long_path, short_path, path):
-            if p and p not in candidates:
-                candidates.append(p)
+        candidates = [p for _, p in self.build_path_variants(path)]
         compare_set = {normalize_path_for_compare(p) for p in candidates if p}
         return candidates, compare_set
 
+    def collect_search_result(self, vault, search, label):
+        """Walk search results; return mapped path of the first preferred-extension hit."""
+        result = search.GetFirstResult()
+        found_files = []
+        while result:
+            found_files.append(result.Name)
+            ext = os.path.splitext(result.Name)[1].lower()
+            if ext in PREFERRED_EXTS:
+                self.log(f"  → PDM'de bulundu ({label}): {result.Name}", "#6b7280")
+                path = self.map_vault_path(vault, result.Path)
+                # IEdmSearchResult5.Version; sonuç bir dosya nesnesiyse CurrentVersion
+                version = getattr(result, "Version", None) or getattr(result, "CurrentVersion", None)
+                if version is not None:
+                    self.search_versions[normalize_path_for_compare(path)] = version
+                return path, found_files
+            result = search.GetNextResult()
+        return None, found_files
+
+    @profiled("search", key=lambda self, vault, sap_code: sap_code)
     def search_file_in_pdm(self, vault, sap_code):
-        # Try searching by PDM variables first
-        for var_name in PDM_VAR_NAMES:
+        strategy = self.search_strategy
+        variables_searched = False
+
+        # Tek sorguda tüm değişken adları (OR) - IEdmSearch9 destekliyorsa
+        if strategy.use_multi():
             try:
                 search = vault.CreateSearch()
-                search.AddVariable(var_name, sap_code)
-                result = search.GetFirstResult()
-                found_files = []
-                while result:
-                    found_files.append(result.Name)
-                    ext = os.path.splitext(result.Name)[1].lower()
-                    if ext in PREFERRED_EXTS:
-                        self.log(f"  → PDM'de bulundu (değişken: {var_name}): {result.Name}", "#6b7280")
-                        return self.map_vault_path(vault, result.Path)
-                    result = search.GetNextResult()
-                # Log if found files but wrong extension
-                if found_files:
-                    self.log(f"  → Dosya bulundu ancak desteklenmeyen uzantı: {', '.join(found_files)}", "#6b7280")
-            except Exception as e:
-                continue
+                search.AddMultiVariableCondition(strategy.ordered(), sap_code)
+            except Exception:
+                strategy.set_multi(False)
+            else:
+                strategy.set_multi(True)
+                try:
+                    path, found_files = self.collect_search_result(vault, search, "değişkenler")
+                    variables_searched = True
+                    if path:
+                        return path
+                    if found_files:
+                        self.log(f"  → Dosya bulundu ancak desteklenmeyen uzantı: {', '.join(found_files)}", "#6b7280")
+                except Exception:
+                    pass
+
+        # Try searching by PDM variables, most successful name first
+        if not variables_searched:
+            for var_name in strategy.ordered():
+                try:
+                    search = vault.CreateSearch()
+                    search.AddVariable(var_name, sap_code)
+                    path, found_files = self.collect_search_result(vault, search, f"değişken: {var_name}")
+                    if path:
+                        strategy.record_hit(var_name)
+                        return path
+                    # Log if found files but wrong extension
+                    if found_files:
+                        self.log(f"  → Dosya bulundu ancak desteklenmeyen uzantı: {', '.join(found_files)}", "#6b7280")
+                except Exception as e:
+                    continue
         
         # Try filename search as fallback
         try:
             search = vault.CreateSearch()
             search.FileName = f"*{sap_code}*"
-            result = search.GetFirstResult()
-            found_files = []
-            while result:
-                found_files.append(result.Name)
-                ext = os.path.splitext(result.Name)[1].lower()
-                if ext in PREFERRED_EXTS:
-                    self.log(f"  → PDM'de bulundu (dosya adı araması): {result.Name}", "#6b7280")
-                    return self.map_vault_path(vault, result.Path)
-                result = search.GetNextResult()
+            path, found_files = self.collect_search_result(vault, search, "dosya adı araması")
+            if path:
+                return path
             # Log if found files but wrong extension
             if found_files:
                 self.log(f"  → Dosya adıyla bulundu ancak desteklenmeyen uzantı: {', '.join(found_files)}", "#6b7280")
@@ -411,6 +1051,141 @@ class LogicHandler:
         
         return None
 
+    @profiled("resolve", key=lambda self, vault, sap_code: sap_code)
+    def resolve_sap_code(self, vault, sap_code):
+        """Resolve a SAP code via the vault index or persistent cache, falling back to a PDM search."""
+        path = self._resolve_sap_code(vault, sap_code)
+        if path:
+            # Sonraki fazların süreleri (indirme, açma, ekleme) bu koda yazılır
+            self.path_codes[normalize_path_for_compare(path)] = sap_code
+        return path
+
+    def _resolve_sap_code(self, vault, sap_code):
+        prepared = self.prepared.get(sap_code)
+        if prepared:
+            self.log(f"  → Ön hazırlıkta bulundu: {os.path.basename(prepared[0])}", "#6b7280")
+            return prepared[0]
+        index = self.sap_index
+        if index:
+            # Silinmiş/taşınmış/kodu değişmiş dosyanın kaydı düşer, önbellek ve canlı aramaya geçilir
+            indexed = index.get(sap_code, vault, self.search_strategy.ordered())
+            if indexed:
+                self.log(f"  → İndeksten bulundu: {os.path.basename(indexed)}", "#6b7280")
+                return self.map_vault_path(vault, indexed)
+        cache = self.resolution_cache
+        if cache:
+            path = cache.get(sap_code, vault, self.search_strategy.ordered())
+            if path:
+                self.log(f"  → Önbellekten bulundu: {os.path.basename(path)}", "#6b7280")
+                return path
+        path = self.search_file_in_pdm(vault, sap_code)
+        if path and cache:
+            try:
+                cache.put(sap_code, path, self.search_versions.pop(normalize_path_for_compare(path), None))
+            except Exception:
+                pass
+        return path
+
+    def get_config_int(self, key, default):
+        try:
+            value = int(load_config().get(key, default))
+        except Exception:
+            value = default
+        return max(1, value)
+
+    def get_search_workers(self):
+        return self.get_config_int("search_workers", SEARCH_WORKERS)
+
+    def resolve_codes(self, codes, vault, workers=None):
+        """
+        Resolve SAP codes concurrently; yields (index, code, path) in input order.
+        Each worker runs in its own COM apartment with its own vault handle. Logs written
+        during a lookup are buffered per code and flushed when that code is yielded, so
+        the log stream reads exactly like the serial loop.
+        """
+        codes = list(codes)
+        workers = min(workers or self.get_search_workers(), len(codes))
+        if workers <= 1:
+            for i, code in enumerate(codes):
+                if not self.is_running:
+                    return
+                while self.is_paused and self.is_running:
+                    time.sleep(0.5)
+                yield i, code, self.resolve_sap_code(vault, code)
+            return
+
+        tasks = Queue()
+        for item in enumerate(codes):
+            tasks.put(item)
+        results = {}
+        results_ready = threading.Condition()
+        stop_event = threading.Event()
+        # Kasa alamayan işçinin kodları ana iş parçacığında aranır
+        needs_main = object()
+
+        def worker():
+            co_initialized = self.backend.co_initialize()
+            try:
+                # Bağlantı hataları her işçide tekrarlanmasın; ana iş parçacığı zaten bağlı
+                self._log_local.buffer = []
+                worker_vault = self.get_pdm_vault()
+                self._log_local.buffer = None
+                while not stop_event.is_set():
+                    try:
+                        index, code = tasks.get_nowait()
+                    except Empty:
+                        break
+                    while self.is_paused and self.is_running and not stop_event.is_set():
+                        time.sleep(0.5)
+                    buffer = []
+                    self._log_local.buffer = buffer
+                    try:
+                        if worker_vault is None:
+                            path = needs_main
+                        else:
+                            path = self.resolve_sap_code(worker_vault, code)
+                    except Exception as e:
+                        self.log(f"  → Arama hatası ({code}): {e}", "#6b7280")
+                        path = None
+                    finally:
+                        self._log_local.buffer = None
+                    with results_ready:
+                        results[index] = (path, buffer)
+                        results_ready.notify_all()
+                worker_vault = None
+            finally:
+                self._log_local.buffer = None
+                self.release_connections()
+                if co_initialized:
+                    self.backend.co_uninitialize()
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+        for t in threads:
+            t.start()
+
+        try:
+            for i, code in enumerate(codes):
+                with results_ready:
+                    while i not in results:
+                        if not self.is_running:
+                            return
+                        if not any(t.is_alive() for t in threads):
+                            break
+                        results_ready.wait(0.1)
+                    path, buffer = results.pop(i, (needs_main, []))
+                self.flush_log_buffer(buffer)
+                if not self.is_running:
+                    return
+                while self.is_paused and self.is_running:
+                    time.sleep(0.5)
+                if path is needs_main:
+                    path = self.resolve_sap_code(vault, code)
+                yield i, code, path
+        finally:
+            stop_event.set()
+            join_threads(threads, PIPELINE_JOIN_TIMEOUT)
+
+    @profiled("download", key=lambda self, vault, file_path: self.profile_key(file_path))
     def fetch_latest_revision(self, vault, file_path):
         """
         fetch_pdm_latest.py mantığını kullanarak dosyanın son revizyonunu çeker.
@@ -451,12 +1226,19 @@ class LogicHandler:
                 
                 if os.path.exists(file_path) and local_version >= latest_version:
                     self.log(f"  ✓ Dosya güncel (v{local_version}): {file_name}", "#6b7280")
+                    self.remember_file_version(file_path, local_version)
                     return True
                 
                 self.log(f"  → Sürüm güncelleniyor (v{local_version} → v{latest_version}): {file_name}", "#3B82F6")
             except Exception as ver_err:
                 self.log(f"  → Sürüm bilgisi alınamadı, son sürüm çekiliyor: {file_name}", "#f59e0b")
             
+            # Önceki yerel kopyanın boyutu, indirme zaman aşımı için tahmin olarak kullanılır
+            try:
+                expected_size = os.path.getsize(file_path)
+            except OSError:
+                expected_size = None
+
             # GetFileCopy ile son revizyonu çek (fetch_pdm_latest.py mantığı)
             try:
                 file_obj.GetFileCopy(
@@ -474,38 +1256,61 @@ class LogicHandler:
                     self.log(f"  ✗ Dosya kopyalama hatası: {alt_err}", "#ef4444")
                     return False
             
-            # Dosyanın indirilmesini bekle
-            for attempt in range(30):  # 7.5 saniye maksimum
-                if os.path.exists(file_path):
-                    # Dosya boyutunu kontrol et (indirme tamamlandı mı?)
-                    try:
-                        size = os.path.getsize(file_path)
-                        if size > 0:
-                            self.log(f"  ✓ Son sürüm indirildi: {file_name}", "#2cc985")
-                            return True
-                    except Exception:
-                        pass
-                time.sleep(0.25)
+            # Dosyanın indirilmesini bekle (dizin bildirimi + boyut kararlılığı, uyarlanır zaman aşımı)
+            ready, waited = wait_for_file_ready(file_path, timeout=adaptive_timeout(expected_size, self.download_timeout))
+            if ready:
+                self.log(f"  ✓ Son sürüm indirildi: {file_name}", "#2cc985")
+                self.remember_file_version(file_path, getattr(file_obj, "CurrentVersion", None))
+                return True
             
             # Son kontrol
             if os.path.exists(file_path):
                 self.log(f"  ✓ Dosya indirildi: {file_name}", "#2cc985")
                 return True
             
-            self.log(f"  ✗ Dosya indirme zaman aşımına uğradı: {file_name}", "#ef4444")
+            self.log(f"  ✗ Dosya indirme zaman aşımına uğradı ({waited:.1f}s): {file_name}", "#ef4444")
             return False
             
         except Exception as e:
             self.log(f"  ✗ Son sürüm çekilirken hata oluştu: {e}", "#ef4444")
             return False
 
+    def profile_key(self, file_path):
+        """SAP code a file was resolved from (profiler key), else its file name."""
+        return self.path_codes.get(normalize_path_for_compare(file_path)) or os.path.basename(file_path or "")
+
+    def remember_file_version(self, file_path, version):
+        if version is not None:
+            self.file_versions[normalize_path_for_compare(file_path)] = version
+
+    def get_file_version(self, file_path):
+        """
+        Version key for the configuration cache: the PDM version seen during download or
+        version check, else the local file's size and modification time.
+        """
+        version = self.file_versions.get(normalize_path_for_compare(file_path))
+        if version is not None:
+            return f"v{version}"
+        try:
+            st = os.stat(file_path)
+            return f"{st.st_size}:{int(st.st_mtime)}"
+        except OSError:
+            return None
+
+    @profiled("ensure_local", key=lambda self, vault, file_path: self.profile_key(file_path))
     def ensure_local_file(self, vault, file_path):
         """
         Dosyanın yerelde olduğundan ve güncel olduğundan emin ol.
         Yoksa veya eskiyse PDM'den son sürümü çek.
         """
         file_name = os.path.basename(file_path)
-        
+
+        # Ön hazırlık bu dosyayı az önce indirdi/denetledi
+        if self.prepared_local and normalize_path_for_compare(file_path) in self.prepared_local:
+            if os.path.exists(file_path):
+                self.log(f"  ✓ Ön hazırlıkta indirildi: {file_name}", "#6b7280")
+                return True
+
         # Önce dosyanın durumunu kontrol et
         file_exists = os.path.exists(file_path)
         
@@ -532,6 +1337,7 @@ class LogicHandler:
                     
                     if local_version >= latest_version:
                         self.log(f"  ✓ Dosya güncel (v{local_version}): {file_name}", "#6b7280")
+                        self.remember_file_version(file_path, local_version)
                         return True
                     else:
                         self.log(f"  → Güncelleme gerekli (v{local_version} → v{latest_version}): {file_name}", "#f59e0b")
@@ -544,6 +1350,152 @@ class LogicHandler:
         # fetch_pdm_latest.py mantığını kullanarak son sürümü çek
         return self.fetch_latest_revision(vault, file_path)
 
+    def prefetch_files(self, codes, vault, workers=None, ahead=None, search_workers=None):
+        """
+        Resolve and download files ahead of the consumer; yields (index, code, path, is_local)
+        in input order. resolve_codes feeds a pool of download threads (each with its own COM
+        apartment and vault) through a bounded queue; at most `ahead` files are resolved or
+        downloaded but not yet consumed, so the pipeline never runs far ahead of SolidWorks.
+        """
+        codes = list(codes)
+        if not codes:
+            return
+        workers = min(workers or self.get_config_int("download_workers", DOWNLOAD_WORKERS), len(codes))
+        ahead = max(ahead or self.get_config_int("prefetch_ahead", PREFETCH_AHEAD), workers)
+
+        downloads = Queue()
+        slots = threading.BoundedSemaphore(ahead)
+        results = {}
+        results_ready = threading.Condition()
+        stop_event = threading.Event()
+        timings = {"resolve": 0.0, "download": 0.0, "wait": 0.0, "files": 0}
+        timings_lock = threading.Lock()
+
+        def acquire_slot():
+            while not stop_event.is_set():
+                if slots.acquire(timeout=0.1):
+                    return True
+            return False
+
+        def publish(index, item):
+            with results_ready:
+                results[index] = item
+                results_ready.notify_all()
+
+        def feeder():
+            co_initialized = self.backend.co_initialize()
+            try:
+                self._log_local.buffer = []
+                feeder_vault = self.get_pdm_vault()
+                self._log_local.buffer = []
+                resolver = self.resolve_codes(codes, feeder_vault or vault, workers=search_workers)
+                while not stop_event.is_set():
+                    if not acquire_slot():
+                        break
+                    started = time.perf_counter()
+                    try:
+                        index, code, path = next(resolver)
+                    except StopIteration:
+                        slots.release()
+                        break
+                    with timings_lock:
+                        timings["resolve"] += time.perf_counter() - started
+                    logs = self._log_local.buffer
+                    self._log_local.buffer = []
+                    if path:
+                        downloads.put((index, code, path, logs))
+                    else:
+                        publish(index, (code, None, False, logs))
+                resolver.close()
+            except Exception as e:
+                self._log_local.buffer = None
+                self.log(f"Ön-getirme hatası: {e}", "#ef4444")
+            finally:
+                self._log_local.buffer = None
+                for _ in range(workers):
+                    downloads.put(None)
+                feeder_vault = resolver = None
+                self.release_connections()
+                if co_initialized:
+                    self.backend.co_uninitialize()
+
+        def downloader():
+            co_initialized = self.backend.co_initialize()
+            try:
+                self._log_local.buffer = []
+                worker_vault = self.get_pdm_vault()
+                self._log_local.buffer = None
+                while True:
+                    task = downloads.get()
+                    if task is None or stop_event.is_set():
+                        break
+                    index, code, path, logs = task
+                    self._log_local.buffer = logs
+                    started = time.perf_counter()
+                    try:
+                        is_local = self.ensure_local_file(worker_vault or vault, path)
+                    except Exception as e:
+                        self.log(f"  ✗ İndirme hatası: {e}", "#ef4444")
+                        is_local = False
+                    finally:
+                        self._log_local.buffer = None
+                    elapsed = time.perf_counter() - started
+                    with timings_lock:
+                        timings["download"] += elapsed
+                        timings["files"] += 1
+                    logs.append({"message": f"  ⏱ İndirme/sürüm kontrolü: {elapsed:.2f}s", "color": "#94a3b8",
+                                 "timestamp": time.time()})
+                    publish(index, (code, path, is_local, logs))
+            finally:
+                self._log_local.buffer = None
+                worker_vault = None
+                self.release_connections()
+                if co_initialized:
+                    self.backend.co_uninitialize()
+
+        threads = [threading.Thread(target=feeder, daemon=True)]
+        threads += [threading.Thread(target=downloader, daemon=True) for _ in range(workers)]
+        self.prefetch_threads = threads
+        for t in threads:
+            t.start()
+
+        try:
+            for i in range(len(codes)):
+                started = time.perf_counter()
+                with results_ready:
+                    while i not in results:
+                        if not self.is_running or not any(t.is_alive() for t in threads):
+                            break
+                        results_ready.wait(0.1)
+                    item = results.pop(i, None)
+                with timings_lock:
+                    timings["wait"] += time.perf_counter() - started
+                if item is None or not self.is_running:
+                    return
+                code, path, is_local, logs = item
+                self.flush_log_buffer(logs)
+                slots.release()
+                while self.is_paused and self.is_running:
+                    time.sleep(0.5)
+                if not self.is_running:
+                    return
+                yield i, code, path, is_local
+        finally:
+            stop_event.set()
+            # Sıradaki iş başlamadan kasa bağlantıları havuza dönsün
+            join_threads(threads, PIPELINE_JOIN_TIMEOUT)
+            with timings_lock:
+                summary = dict(timings)
+            self.log(
+                f"⏱ Ön-getirme: arama {summary['resolve']:.1f}s, indirme {summary['download']:.1f}s "
+                f"({summary['files']} dosya, {workers} işçi), tüketici bekleme {summary['wait']:.1f}s",
+                "#94a3b8",
+            )
+
+    def is_prefetching(self):
+        """True while searches or downloads of this run are still in flight (and hold vault connections)."""
+        return any(t.is_alive() for t in self.prefetch_threads)
+
     def get_assembly_template(self, sw_app):
         # Eğer özel bir yol belirtilmemişse SolidWorks ayarlarına bak
         if not TEMPLATE_OVERRIDE:
@@ -557,7 +1509,8 @@ class LogicHandler:
 
     def init_assembly_doc(self, sw_app):
         """
-        Initialize assembly document. Returns (assembly_doc, locked_title, asm_title, pre_open_docs, z_offset).
+        Initialize assembly document. Returns an AssemblySession (None on failure) that
+        owns the SolidWorks handles and per-run insert state.
         Extracted common assembly initialization code to follow DRY principle.
         """
         add_to_existing = self.get_add_to_existing()
@@ -581,7 +1534,7 @@ class LogicHandler:
             new_doc = sw_app.NewDocument(template, SW_DOC_ASSEMBLY, 0, 0)
             if not new_doc:
                 self.log("Montaj oluşturulamadı.", "#ef4444")
-                return None, None, None, None, 0.0
+                return None
             assembly_doc = new_doc
             try:
                 locked_title = assembly_doc.GetTitle() or ""
@@ -592,7 +1545,7 @@ class LogicHandler:
         assembly_doc = self.ensure_assembly_doc(sw_app, assembly_doc)
         if not assembly_doc or self.doc_type_safe(assembly_doc) != SW_DOC_ASSEMBLY:
             self.log("Aktif montaj alınamadı.", "#ef4444")
-            return None, None, None, None, 0.0
+            return None
 
         try:
             asm_title = assembly_doc.GetTitle()
@@ -606,113 +1559,179 @@ class LogicHandler:
         except Exception:
             pre_open_docs = set()
 
-        # Calculate initial z_offset
-        offset_step = -0.3
-        z_offset = 0.0
+        # Bileşen kaydını tek bir GetComponents çağrısıyla doldur
+        registry = ComponentRegistry()
+        existing_count = registry.seed(assembly_doc)
+
+        # Mevcut montajda yerleşim ızgarası parça sayısından devam eder
+        layout = self.get_layout()
+        next_slot = 0
         if self.get_add_to_existing():
-            existing_count = 0
-            try:
-                comps_before = assembly_doc.GetComponents(True) or []
-                existing_count = len(comps_before)
-            except Exception:
-                pass
-            z_offset = existing_count * offset_step
+            next_slot = existing_count
             if existing_count == 0:
-                self.log(f"Montaj boş, yeni parçalar Z=0m'den başlayacak", "#3B82F6")
+                self.log(f"Montaj boş, yeni parçalar başlangıç noktasından yerleşecek", "#3B82F6")
             else:
-                self.log(f"Montajda {existing_count} parça var, yeni parçalar Z={z_offset:.3f}m'den başlayacak", "#3B82F6")
+                x, y, z = layout.position(next_slot)
+                self.log(f"Montajda {existing_count} parça var, yeni parçalar ({x:.2f}, {y:.2f}, {z:.2f})m'den başlayacak", "#3B82F6")
+
+        session = AssemblySession(sw_app, assembly_doc, locked_title, asm_title, pre_open_docs, layout, next_slot, registry)
+        self.assembly_session = session
+        return session
 
-        return assembly_doc, locked_title, asm_title, pre_open_docs, z_offset
+    def activate_assembly(self, session):
+        """Re-activate the locked assembly before an insert; returns the assembly doc or None."""
+        if session.locked_title:
+            try:
+                doc = session.sw_app.ActivateDoc3(session.locked_title, False, 0, None)
+                if doc:
+                    session.assembly_doc = doc
+                    return doc
+            except Exception:
+                pass
+        session.assembly_doc = self.ensure_assembly_doc(session.sw_app, session.assembly_doc)
+        return session.assembly_doc
 
-    def add_component_to_assembly(self, sw_app, assembly_doc, file_path, z_offset, asm_title, pre_open_docs):
+    def get_layout(self):
+        """Placement grid from config.json (layout_columns / layout_rows / layout_pitch)."""
+        cfg = load_config()
+        try:
+            return GridLayout(
+                columns=int(cfg.get("layout_columns", LAYOUT_COLUMNS)),
+                rows=int(cfg.get("layout_rows", LAYOUT_ROWS)),
+                pitch=float(cfg.get("layout_pitch", LAYOUT_PITCH)),
+            )
+        except (TypeError, ValueError):
+            return GridLayout()
+
+    @profiled("insert", key=lambda self, session, file_path, *args: self.profile_key(file_path))
+    def add_component_to_assembly(self, session, file_path, slot=None):
         """
-        Adds a component to the assembly. Returns (success, new_z_offset).
+        Adds a component to the session's assembly at layout slot `slot` (default: the
+        session's next slot, which advances on success). Returns success.
         Extracted common code from batch and immediate modes to follow DRY principle.
         """
+        sw_app = session.sw_app
+        assembly_doc = session.assembly_doc
+        next_slot = slot is None
+        if next_slot:
+            slot = session.next_slot
+        session.begin_insert()
+        try:
+            success = self._add_component(session, sw_app, assembly_doc, file_path, session.layout.position(slot))
+        finally:
+            session.end_insert()
+        if success and next_slot:
+            session.next_slot = slot + 1
+        return success
+
+    def _add_component(self, session, sw_app, assembly_doc, file_path, position):
         if not os.path.exists(file_path):
-            if not self.ensure_local_file(self.get_pdm_vault(), file_path) or not os.path.exists(file_path):
+            if not self.ensure_local_file(session.get_vault(self), file_path) or not os.path.exists(file_path):
                 self.log(f"Yerel kopya eksik: {file_path}", "#ef4444")
-                return False, z_offset
+                return False
 
-        path_candidates, target_paths = self.build_path_candidates(file_path)
+        path_variants = self.build_path_variants(file_path)
+        path_candidates = [p for _, p in path_variants]
+        target_paths = {normalize_path_for_compare(p) for p in path_candidates if p}
 
         comp = None
         errors = []
         comp_doc = None
-        try:
-            existing_names = {getattr(c, "Name2", "") for c in (assembly_doc.GetComponents(True) or []) if c}
-        except Exception:
-            existing_names = set()
+        registry = session.registry
+        existing_names = set()
+        if registry is None:
+            try:
+                existing_names = {getattr(c, "Name2", "") for c in (assembly_doc.GetComponents(True) or []) if c}
+            except Exception:
+                existing_names = set()
 
         ext = os.path.splitext(file_path)[1].lower()
         doc_type = SW_DOC_PART if ext == ".sldprt" else SW_DOC_ASSEMBLY if ext == ".sldasm" else 0
 
         config_name = ""
         if doc_type:
-            for candidate in path_candidates:
-                comp_doc, _ = self.open_component_doc(sw_app, candidate, doc_type)
+            # Önce önbellek; hafif modda dosya meta verisi; en son belgeyi açıp okuma
+            cfg_version = self.get_file_version(file_path)
+            cfgs = self.get_cached_configurations(file_path, cfg_version)
+            if cfgs is None and self.lightweight:
+                cfgs = self.read_configuration_names(sw_app, path_candidates)
+                self.store_configurations(file_path, cfg_version, cfgs)
+            if cfgs is None:
+                comp_doc = self.open_component_candidates(sw_app, path_candidates, doc_type, session)
+                cfgs = self.doc_configuration_names(comp_doc)
                 if comp_doc:
-                    break
-            try:
-                cfgs = comp_doc.GetConfigurationNames() if comp_doc else None
-                if cfgs:
-                    config_name = list(cfgs)[0]
-            except Exception:
-                config_name = ""
-
-        math_util = None
-        try:
-            math_util = sw_app.GetMathUtility()
-        except Exception:
-            math_util = None
+                    self.store_configurations(file_path, cfg_version, cfgs)
+            config_name = cfgs[0] if cfgs else ""
+        # Belge açılmadıysa ekleme kapalı dosyaya yapılır
+        insert_closed = bool(doc_type) and comp_doc is None
 
+        x, y, z = position
         transform = None
-        if math_util:
-            try:
-                t = (1.0, 0.0, 0.0,
-                     0.0, 1.0, 0.0,
-                     0.0, 0.0, 1.0,
-                     0.0, 0.0, z_offset)
-                transform = math_util.CreateTransform(t)
-            except Exception as ex:
-                errors.append(f"Transform: {ex}")
-
-        def attempt(label, fn):
-            nonlocal comp
-            if comp:
-                return
-            for candidate in path_candidates:
-                if comp:
-                    return
+        try:
+            transform = session.make_transform(position)
+        except Exception as ex:
+            errors.append(f"Transform: {ex}")
+
+        # (etiket, çağrı, dönüşüm gerekli mi) - varsayılan deneme sırası
+        insert_apis = [
+            ("InsertExistingComponent3", lambda p: assembly_doc.InsertExistingComponent3(p, transform, False), True),
+            ("AddComponent6", lambda p: assembly_doc.AddComponent6(p, 1, config_name or "", transform, False, 0), True),
+            ("AddComponent5-0", lambda p: assembly_doc.AddComponent5(p, 0, config_name or "", x, y, z), False),
+            ("AddComponent5-1", lambda p: assembly_doc.AddComponent5(p, 1, config_name or "", x, y, z), False),
+            ("AddComponent5-2", lambda p: assembly_doc.AddComponent5(p, 2, config_name or "", x, y, z), False),
+            ("InsertExistingComponent2", lambda p: assembly_doc.InsertExistingComponent2(p, x, y, z), False),
+            ("AddComponent4", lambda p: assembly_doc.AddComponent4(p, x, y, z), False),
+            ("AddComponent", lambda p: assembly_doc.AddComponent(p, x, y, z), False),
+        ]
+        attempts = [
+            {"id": f"{label}|{variant}", "label": label, "fn": fn, "path": candidate}
+            for label, fn, needs_transform in insert_apis
+            if transform or not needs_transform
+            for variant, candidate in path_variants
+        ]
+
+        # Bu SolidWorks sürümü ve dosya türü için daha önce işe yarayan yol önce denenir
+        memo = self.insert_memo
+
+        def run_attempts(memo_key):
+            for attempt in memo.order(memo_key, attempts):
                 try:
-                    comp = fn(candidate)
-                    if comp:
-                        return
+                    found = attempt["fn"](attempt["path"])
                 except Exception as ex:
-                    errors.append(f"{label} ({candidate}): {ex}")
-
-        attempt("InsertExistingComponent3", lambda p: assembly_doc.InsertExistingComponent3(p, transform, False) if transform else None)
-        attempt("AddComponent6", lambda p: assembly_doc.AddComponent6(p, 1, config_name or "", transform, False, 0) if transform else None)
-        attempt("AddComponent5-0", lambda p: assembly_doc.AddComponent5(p, 0, config_name or "", 0, 0, z_offset))
-        attempt("AddComponent5-1", lambda p: assembly_doc.AddComponent5(p, 1, config_name or "", 0, 0, z_offset))
-        attempt("AddComponent5-2", lambda p: assembly_doc.AddComponent5(p, 2, config_name or "", 0, 0, z_offset))
-        attempt("InsertExistingComponent2", lambda p: assembly_doc.InsertExistingComponent2(p, 0, 0, z_offset))
-        attempt("AddComponent4", lambda p: assembly_doc.AddComponent4(p, 0, 0, z_offset))
-        attempt("AddComponent", lambda p: assembly_doc.AddComponent(p, 0, 0, z_offset))
+                    errors.append(f"{attempt['label']} ({attempt['path']}): {ex}")
+                    found = None
+                if found:
+                    memo.record_success(memo_key, attempt["id"])
+                    return found
+                session.failed_insert_calls += 1
+                memo.record_failure(memo_key, attempt["id"])
+            return None
 
+        if insert_closed:
+            # Model açılmadan çalışan API'ler ayrı öğrenilir; hiçbiri çalışmadıysa oturumda tekrar denenmez
+            closed_key = memo.make_key(session.sw_revision, f"{ext}:closed")
+            if closed_key not in session.closed_insert_unsupported:
+                comp = run_attempts(closed_key)
+                if not comp and registry is not None:
+                    comp = registry.find_new_component(assembly_doc, target_paths)
+                if not comp:
+                    session.closed_insert_unsupported.add(closed_key)
+            if not comp:
+                # Açık belge gerektiren API'ler için hafif açıp bir kez daha dene
+                options = SW_OPEN_SILENT | SW_OPEN_LOAD_LIGHTWEIGHT if doc_type == SW_DOC_ASSEMBLY else 0
+                comp_doc = self.open_component_candidates(sw_app, path_candidates, doc_type, session, options)
+                config_name = (self.doc_configuration_names(comp_doc) or [config_name])[0]
         if not comp:
+            comp = run_attempts(memo.make_key(session.sw_revision, ext))
+
+        if not comp and registry is not None:
+            comp = registry.find_new_component(assembly_doc, target_paths)
+        elif not comp:
             try:
                 comps_after = assembly_doc.GetComponents(True) or []
                 for c in comps_after:
                     name = getattr(c, "Name2", "")
-                    comp_path = ""
-                    try:
-                        comp_path = c.GetPathName() or ""
-                    except Exception:
-                        try:
-                            comp_path = c.GetPathName2() or ""
-                        except Exception:
-                            comp_path = ""
+                    comp_path = component_path(c)
                     if comp_path and normalize_path_for_compare(comp_path) in target_paths:
                         comp = c
                         break
@@ -723,17 +1742,200 @@ class LogicHandler:
                 pass
 
         success = False
-        new_z_offset = z_offset
         if comp:
-            self.log(f"✓ Eklendi: {os.path.basename(file_path)} (Z={z_offset:.3f}m)", "#2cc985")
-            new_z_offset = z_offset - 0.3  # offset_step
+            self.log(f"✓ Eklendi: {os.path.basename(file_path)} ({x:.2f}, {y:.2f}, {z:.2f})m", "#2cc985")
             success = True
+            if registry is not None:
+                registry.add(comp, file_path)
+                registry.reconcile(assembly_doc)
         else:
             self.log(f"Eklenemedi: {os.path.basename(file_path)} -> {' | '.join(errors) if errors else 'bilinmeyen'}", "#f59e0b")
 
-        # Close component document
+        # Belge açılmadan eklendiyse kapatılacak bir şey yok
+        if comp_doc or not insert_closed:
+            self.close_component_docs(session, comp_doc, file_path, doc_type)
+        return success
+
+    def insert_components_bulk(self, session, file_paths, on_progress=None):
+        """
+        Batch-mode insert: every layout slot is reserved up front and the files are added
+        in chunks with AddComponents3 (one activation per chunk). Files the bulk call
+        does not return go through the per-file cascade at their reserved slot.
+        Returns the number of inserted components, None if the assembly was lost.
+        """
+        chunk_size = self.get_config_int("bulk_insert_chunk", BULK_INSERT_CHUNK)
+        start_slot = session.next_slot
+        positions = session.layout.positions(start_slot, len(file_paths))
+        step = max(chunk_size, 1)
+        added = 0
+        done = 0
+
+        for start in range(0, len(file_paths), step):
+            if not self.is_running:
+                break
+            while self.is_paused and self.is_running:
+                time.sleep(0.5)
+
+            if not self.activate_assembly(session):
+                self.log("Montaj oturumu kaybedildi.", "#ef4444")
+                return None
+
+            chunk = [(file_paths[i], start_slot + i, positions[i])
+                     for i in range(start, min(start + step, len(file_paths)))]
+            comps = {}
+            if chunk_size > 0 and session.bulk_insert:
+                # Yerelde olmayan dosyalar tek tek eklemede indirilmeyi dener
+                bulk = [(j, p, pos) for j, (p, _, pos) in enumerate(chunk) if os.path.exists(p)]
+                if bulk:
+                    # Aynı parça parçada birden çok kez olabilir; eşleşme yola değil sıraya göre
+                    comps = {j: comp for j, _, comp in self._insert_chunk_bulk(session, bulk)}
+
+            for j, (file_path, slot, (x, y, z)) in enumerate(chunk):
+                if not self.is_running:
+                    break
+                comp = comps.get(j)
+                if comp:
+                    self.log(f"✓ Eklendi: {os.path.basename(file_path)} ({x:.2f}, {y:.2f}, {z:.2f})m", "#2cc985")
+                    self.record("result", code=self.profile_key(file_path), result="inserted", path=file_path)
+                    added += 1
+                else:
+                    if not self.activate_assembly(session):
+                        self.log("Montaj oturumu kaybedildi.", "#ef4444")
+                        return None
+                    success = self.add_component_to_assembly(session, file_path, slot=slot)
+                    self.record("result", code=self.profile_key(file_path),
+                                result="inserted" if success else "insert_failed", path=file_path)
+                    if success:
+                        added += 1
+                done += 1
+                if on_progress:
+                    on_progress(done, len(file_paths))
+
+            if session.registry is not None:
+                session.registry.reconcile(session.assembly_doc)
+
+        session.next_slot = start_slot + done
+        return added
+
+    @profiled("bulk_insert")
+    def _insert_chunk_bulk(self, session, chunk):
+        """
+        Insert (index, file_path, position) entries with a single AddComponents3 call.
+        Returns [(index, file_path, component)] for the entries that were added; a file
+        listed twice matches two components.
+        """
+        assembly_doc = session.assembly_doc
+        registry = session.registry
+        names = [p for _, p, _ in chunk]
+        # AddComponents3'ün üçüncü argümanı koordinat sistemi adlarıdır; boş = koordinat sistemi yok
+        coord_sys_names = [""] * len(names)
+        session.begin_insert()
+        found = []
         try:
-            assembly_title = asm_title or ""
+            try:
+                result = assembly_doc.AddComponents3(
+                    self.backend.array(names, "VT_BSTR"),
+                    self.backend.array(session.make_bulk_transforms([pos for _, _, pos in chunk]), "VT_R8"),
+                    self.backend.array(coord_sys_names, "VT_BSTR"),
+                )
+            except Exception as ex:
+                session.bulk_insert = False
+                self.log(f"Toplu ekleme (AddComponents3) kullanılamıyor, parçalar tek tek eklenecek: {ex}", "#6b7280")
+                return found
+            comps = [c for c in (result or []) if c]
+            if len(comps) < len(chunk) and registry is not None:
+                # Eklenip dönmeyen bileşenler tekrar eklenmesin
+                known = {component_key(c) for c in comps}
+                comps += [c for c in registry.collect_new_components(assembly_doc) if component_key(c) not in known]
+
+            pending = {}
+            for entry in chunk:
+                pending.setdefault(normalize_path_for_compare(entry[1]), []).append(entry)
+            unmatched = []
+            for comp in comps:
+                targets = pending.get(normalize_path_for_compare(component_path(comp)))
+                if targets:
+                    index, file_path, _ = targets.pop(0)
+                    found.append((index, file_path, comp))
+                else:
+                    unmatched.append(comp)
+            # Yol okunamazsa sıra eşleşmesi (AddComponents3 girişle aynı sırada döner)
+            if unmatched and len(comps) == len(chunk):
+                found = [(index, file_path, comp) for (index, file_path, _), comp in zip(chunk, comps)]
+
+            for _, file_path, comp in found:
+                if registry is not None:
+                    registry.add(comp, file_path)
+            session.failed_insert_calls += len(names) - len(found)
+            session.bulk_inserted += len(found)
+            return found
+        finally:
+            session.end_insert(count=len(found))
+
+    def read_configuration_names(self, sw_app, path_candidates):
+        """Configuration names read from file metadata (ISldWorks.GetConfigurationNames), no open; None on failure."""
+        for candidate in path_candidates:
+            try:
+                cfgs = sw_app.GetConfigurationNames(candidate)
+            except Exception:
+                continue
+            if cfgs:
+                return list(cfgs)
+        return None
+
+    def doc_configuration_names(self, comp_doc):
+        try:
+            cfgs = comp_doc.GetConfigurationNames() if comp_doc else None
+            return list(cfgs) if cfgs else []
+        except Exception:
+            return []
+
+    def get_cached_configurations(self, file_path, version):
+        if not self.config_cache or version is None:
+            return None
+        try:
+            cfgs = self.config_cache.get(normalize_path_for_compare(file_path), version)
+        except Exception:
+            return None
+        self.config_cache_stats["hits" if cfgs is not None else "misses"] += 1
+        return cfgs
+
+    def store_configurations(self, file_path, version, cfgs):
+        if not self.config_cache or version is None or cfgs is None:
+            return
+        try:
+            self.config_cache.put(normalize_path_for_compare(file_path), version, cfgs)
+        except Exception:
+            pass
+
+    def log_config_cache_summary(self):
+        hits, misses = self.config_cache_stats["hits"], self.config_cache_stats["misses"]
+        if not hits + misses:
+            return
+        self.log(
+            f"Yapılandırma önbelleği: {hits}/{hits + misses} isabet (%{hits / (hits + misses) * 100:.0f})",
+            "#94a3b8",
+        )
+
+    def open_component_candidates(self, sw_app, path_candidates, doc_type, session, options=0):
+        """Open the first path variant that SolidWorks accepts; returns the doc or None."""
+        for candidate in path_candidates:
+            comp_doc, _ = self.open_component_doc(sw_app, candidate, doc_type, session, options)
+            if comp_doc:
+                return comp_doc
+        return None
+
+    @profiled("close", key=lambda self, session, comp_doc, file_path, doc_type: self.profile_key(file_path))
+    def close_component_docs(self, session, comp_doc, file_path, doc_type):
+        """
+        Close documents opened for an insert. Parts only open themselves, so the session's
+        open-document set is enough; sub-assemblies may pull in references, so for those
+        GetOpenDocumentNames is consulted once.
+        """
+        sw_app = session.sw_app
+        assembly_title = session.asm_title or ""
+        try:
+            close_candidates = set()
             if comp_doc:
                 comp_title = ""
                 try:
@@ -745,18 +1947,19 @@ class LogicHandler:
                         sw_app.CloseDoc(comp_title)
                     except Exception:
                         pass
+                    session.open_docs.discard(comp_title)
 
-            close_candidates = set()
             base_title = os.path.basename(file_path)
-            if base_title:
+            if base_title and not comp_doc:
                 close_candidates.add(base_title)
-            try:
-                current_docs = set(sw_app.GetOpenDocumentNames() or [])
-                for name in current_docs:
-                    if name and name not in pre_open_docs and name != assembly_title:
-                        close_candidates.add(name)
-            except Exception:
-                pass
+            if doc_type != SW_DOC_PART or not comp_doc:
+                try:
+                    current_docs = set(sw_app.GetOpenDocumentNames() or [])
+                    for name in current_docs:
+                        if name and name not in session.pre_open_docs and name != assembly_title:
+                            close_candidates.add(name)
+                except Exception:
+                    pass
 
             for name in close_candidates:
                 if name and name != assembly_title:
@@ -764,47 +1967,90 @@ class LogicHandler:
                         sw_app.CloseDoc(name)
                     except Exception:
                         pass
+                    session.open_docs.discard(name)
         except Exception:
             pass
 
-        return success, new_z_offset
+    def is_doc_open(self, sw_app, doc, file_path):
+        """True if SolidWorks lists the document (by path or title) among open documents."""
+        try:
+            names = sw_app.GetOpenDocumentNames() or []
+        except Exception:
+            return False
+        target = normalize_path_for_compare(file_path)
+        try:
+            title = (doc.GetTitle() or "").lower() if doc else ""
+        except Exception:
+            title = ""
+        base = os.path.basename(file_path).lower()
+        for name in names:
+            if not name:
+                continue
+            if normalize_path_for_compare(name) == target:
+                return True
+            name_base = os.path.basename(name).lower()
+            if name_base == base or (title and (name_base == title or os.path.splitext(name_base)[0] == title)):
+                return True
+        return False
 
-    def open_component_doc(self, sw_app, file_path, doc_type):
+    def wait_for_doc_ready(self, sw_app, doc, file_path, max_wait=None):
+        """
+        Return as soon as the opened document is usable: listed in GetOpenDocumentNames
+        and present on local disk. Gives up after `max_wait`. Returns (ready, waited).
+        """
+        max_wait = self.doc_ready_max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        while True:
+            if self.is_doc_open(sw_app, doc, file_path) and os.path.exists(file_path):
+                ready = True
+                break
+            if time.monotonic() - start >= max_wait:
+                ready = False
+                break
+            time.sleep(DOC_READY_POLL)
+        waited = time.monotonic() - start
+        self.doc_wait_times[file_path] = waited
+        return ready, waited
+
+    @profiled("open", key=lambda self, sw_app, file_path, *args: self.profile_key(file_path))
+    def open_component_doc(self, sw_app, file_path, doc_type, session=None, options=0):
         """Open component and let PDM add-in retrieve it if needed"""
         if doc_type == 0:
             return None, False
         try:
-            try:
-                before = set(sw_app.GetOpenDocumentNames() or [])
-            except Exception:
-                before = set()
-            try:
-                status = win32com.client.VARIANT(pythoncom.VT_I4, 0)
-                warnings = win32com.client.VARIANT(pythoncom.VT_I4, 0)
-            except Exception:
-                status = 0
-                warnings = 0
+            if session is not None:
+                before = set(session.open_docs)
+            else:
+                try:
+                    before = set(sw_app.GetOpenDocumentNames() or [])
+                except Exception:
+                    before = set()
+            status = self.backend.variant("VT_I4", 0)
+            warnings = self.backend.variant("VT_I4", 0)
             try:
                 # Use 0 instead of SW_OPEN_SILENT - PDM add-in needs to retrieve file
-                doc = sw_app.OpenDoc6(file_path, doc_type, 0, "", status, warnings)
+                doc = sw_app.OpenDoc6(file_path, doc_type, options, "", status, warnings)
                 
-                # Wait for PDM to retrieve file
+                # Wait for PDM to retrieve file - only as long as the document actually needs
                 if doc:
-                    time.sleep(1.5)  # Give PDM time to check out/get file
+                    ready, waited = self.wait_for_doc_ready(sw_app, doc, file_path)
                     
                     # Verify file is now local
                     if not os.path.exists(file_path):
                         self.log(f"  ⚠ Dosya açıldı ancak yerel diskte bulunamadı: {os.path.basename(file_path)}", "#f59e0b")
                     else:
-                        self.log(f"  ✔ Dosya başarıyla yerel diske çekildi: {os.path.basename(file_path)}", "#6b7280")
+                        self.log(f"  ✔ Dosya başarıyla yerel diske çekildi: {os.path.basename(file_path)} ({waited:.2f}s)", "#6b7280")
             except Exception:
                 doc = sw_app.OpenDoc(file_path, doc_type)
-                time.sleep(1.5)
+                if doc:
+                    self.wait_for_doc_ready(sw_app, doc, file_path)
             
             opened_now = False
             try:
                 title = doc.GetTitle() if doc else ""
                 opened_now = bool(title and title not in before)
+                if opened_now and session is not None:
+                    session.open_docs.add(title)
             except Exception:
                 opened_now = False
             return doc, opened_now
@@ -813,8 +2059,171 @@ class LogicHandler:
             return None, False
 
 
+    def get_debug_stats(self):
+        """Per-insert COM call statistics of the current assembly session."""
+        session = self.assembly_session
+        return session.get_stats() if session else {}
+
+    def suspend_assembly_updates(self, session):
+        """
+        Fast insert mode: turn off graphics and feature-tree updates of the assembly
+        and mark a command in progress so SolidWorks does not redraw after every
+        insert. The previous values are kept on the session for restore_assembly_updates.
+        """
+        if session.suspended_state is not None:
+            return
+        # Ayar nesneleri sayaç vekili olmadan, doğrudan COM nesnesinden okunur
+        doc = unwrap_proxy(session.assembly_doc)
+        sw_app = unwrap_proxy(session.sw_app)
+        targets = (
+            (lambda: doc.FeatureManager, "FeatureManager", "EnableFeatureTree", False),
+            (lambda: doc.FeatureManager, "FeatureManager", "EnableFeatureTreeWindow", False),
+            (lambda: doc.ActiveView, "ActiveView", "EnableGraphicsUpdate", False),
+            (lambda: sw_app, "SldWorks", "CommandInProgress", True),
+        )
+        saved = []
+        for get_obj, owner, prop, value in targets:
+            try:
+                obj = get_obj()
+                if obj is None:
+                    self.log(f"  Hızlı ekleme: {owner} alınamadı, {prop} değiştirilmedi.", "#f59e0b")
+                    continue
+                previous = getattr(obj, prop)
+                setattr(obj, prop, value)
+                saved.append((obj, prop, previous))
+            except Exception as e:
+                self.log(f"  Hızlı ekleme: {owner}.{prop} ayarlanamadı: {e}", "#f59e0b")
+        session.suspended_state = saved
+        session.fast_insert_used = True
+        if len(saved) < len(targets):
+            self.log(f"Hızlı ekleme modu kısmen açık: {len(saved)}/{len(targets)} ayar kapatılabildi, "
+                     f"SolidWorks güncellemeleri sürebilir.", "#f59e0b")
+        else:
+            self.log(f"Hızlı ekleme modu açık ({len(saved)}/{len(targets)} ayar kapatıldı).", "#3B82F6")
+
+    def restore_assembly_updates(self, session):
+        """Undo suspend_assembly_updates and run the deferred rebuild once. Safe to call twice."""
+        saved = session.suspended_state
+        if saved is None:
+            return
+        for obj, prop, previous in reversed(saved):
+            try:
+                setattr(obj, prop, previous)
+            except Exception:
+                pass
+        session.suspended_state = None
+        start = time.perf_counter()
+        doc = session.assembly_doc
+        with self.profiler.span("rebuild"):
+            try:
+                doc.EditRebuild3()
+            except Exception:
+                pass
+            try:
+                doc.GraphicsRedraw2()
+            except Exception:
+                pass
+        session.rebuild_seconds = time.perf_counter() - start
+
+    def log_insert_summary(self):
+        session = self.assembly_session
+        if not session or not session.inserts:
+            return
+        mode = "açık" if session.fast_insert_used else "kapalı"
+        self.log(
+            f"⏱ Montaja ekleme (hızlı mod {mode}): {session.inserts} parça, toplam {session.insert_seconds:.1f}s, "
+            f"parça başı {session.insert_seconds / session.inserts * 1000:.0f}ms, "
+            f"AddComponents3 ile {session.bulk_inserted}, son yeniden oluşturma {session.rebuild_seconds:.2f}s",
+            "#94a3b8",
+        )
+
+    def get_metrics(self, top=20):
+        """Phase histograms of this run plus the slowest SAP codes (for /api/metrics)."""
+        return {
+            "started_at": self.profiler.started_at,
+            "is_running": self.is_running,
+            "phases": self.profiler.summary(),
+            "slowest_codes": self.profiler.per_key_summary(limit=top),
+        }
+
+    def write_run_profile(self, codes):
+        """Log a per-phase summary and write the run's JSON profile."""
+        phases = self.profiler.summary()
+        if not phases:
+            return
+        parts = [f"{name} {p['total']:.1f}s (p50 {p['p50'] * 1000:.0f}ms, p95 {p['p95'] * 1000:.0f}ms)"
+                 for name, p in sorted(phases.items(), key=lambda item: -item[1]["total"])]
+        self.log("⏱ Fazlar: " + ", ".join(parts), "#94a3b8")
+        try:
+            path = self.profiler.write(
+                directory=self.profile_dir,
+                codes=len(codes),
+                mode="batch" if self.get_stop_on_not_found() else "immediate",
+                settings={"fast_insert": self.fast_insert, "lightweight": self.lightweight},
+                session=self.get_debug_stats(),
+            )
+            self.log(f"Çalıştırma profili kaydedildi: {path}", "#6b7280")
+        except Exception as e:
+            self.log(f"Çalıştırma profili yazılamadı: {e}", "#6b7280")
+
+    def log_doc_wait_summary(self):
+        waits = list(self.doc_wait_times.values())
+        if not waits:
+            return
+        total = sum(waits)
+        self.log(
+            f"⏱ Belge hazır bekleme: {len(waits)} dosya, toplam {total:.1f}s, "
+            f"ort. {total / len(waits) * 1000:.0f}ms, en fazla {max(waits):.2f}s",
+            "#94a3b8",
+        )
+
+    def prepare_files(self, codes):
+        """
+        Resolve and download `codes` without SolidWorks, for a queued job while another
+        one is assembling. Paths go to the resolution cache and files to the local vault
+        view; the job's handler takes the finished codes over (adopt_preparation) when it
+        starts. stop_process() ends it.
+        """
+        co_initialized = self.backend.co_initialize()
+        self.is_running = True
+        started = time.perf_counter()
+        result = {"state": "running", "codes": len(codes), "found": 0, "local": 0}
+        try:
+            vault = self.get_pdm_vault()
+            if vault:
+                workers = self.get_config_int("prepare_workers", PREPARE_WORKERS)
+                for _, code, path, is_local in self.prefetch_files(codes, vault, workers=workers,
+                                                                    search_workers=workers):
+                    result["found"] += bool(path)
+                    result["local"] += bool(is_local)
+                    if path:
+                        self.prepared[code] = (path, bool(is_local))
+        except Exception as e:
+            self.log(f"Ön hazırlık hatası: {e}", "#ef4444")
+        finally:
+            self.search_strategy.save()
+            result["state"] = "done" if self.is_running else "stopped"
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            self.is_running = False
+            vault = None
+            self.release_connections()
+            if co_initialized:
+                self.backend.co_uninitialize()
+        return result
+
+    def adopt_preparation(self, prep):
+        """
+        Take over what a (finished or stopped) prepare_files handler resolved and
+        downloaded, so this run neither searches nor version-checks those codes again.
+        """
+        self.prepared.update(prep.prepared)
+        self.prepared_local.update(normalize_path_for_compare(path)
+                                   for path, is_local in prep.prepared.values() if is_local)
+        self.file_versions.update(prep.file_versions)
+        return len(prep.prepared)
+
     def run_process(self, codes):
-        pythoncom.CoInitialize()
+        co_initialized = self.backend.co_initialize()
         self.is_running = True
         try:
             self.set_progress(0.1)
@@ -837,13 +2246,24 @@ class LogicHandler:
             self.log(f"Beklenmedik Hata: {e}", "#ef4444")
             self.set_status("Hata")
         finally:
+            # Durdurma veya hata olsa da SolidWorks görünüm ayarları geri yüklenir
+            if self.assembly_session:
+                try:
+                    self.restore_assembly_updates(self.assembly_session)
+                except Exception as e:
+                    self.log(f"Görünüm ayarları geri yüklenemedi: {e}", "#f59e0b")
+                self.log_insert_summary()
+            self.log_config_cache_summary()
+            self.log_doc_wait_summary()
+            self.search_strategy.save()
+            self.insert_memo.save()
+            self.write_run_profile(codes)
             self.log("İşlem sonlandırılıyor...", "#94a3b8")
             self.is_running = False
             vault = None
-            try:
-                pythoncom.CoUninitialize()
-            except Exception:
-                pass
+            self.release_connections()
+            if co_initialized:
+                self.backend.co_uninitialize()
     
     def run_process_batch_mode(self, codes, vault):
         """ESKİ AKIŞ: Önce tüm parçaları ara, sonra montaja ekle (checkbox işaretli)"""
@@ -856,28 +2276,28 @@ class LogicHandler:
         # Initialize stats
         self.update_stats(total=total_codes, success=0, error=0)
         
-        for i, code in enumerate(codes):
-            if not self.is_running:
-                return
-            
-            while self.is_paused and self.is_running:
-                time.sleep(0.5)
-            path = self.search_file_in_pdm(vault, code)
+        for i, code, path, is_local in self.prefetch_files(codes, vault):
             if path:
-                if self.ensure_local_file(vault, path):
+                if is_local:
                     found_files.append(path)
                     self.log(f"Bulundu: {code}", "#2cc985")
+                    self.record("result", code=code, result="found", path=path)
                     self.update_stats(success=len(found_files))
                 else:
                     not_found_codes.append(code)
                     self.log(f"Yerelde bulunamadı: {code},", "#ef4444")
+                    self.record("result", code=code, result="not_local", path=path)
                     self.update_stats(error=len(not_found_codes))
             else:
                 not_found_codes.append(code)
                 self.log(f"Bulunamadı: {code},", "#ef4444")
+                self.record("result", code=code, result="not_found")
                 self.update_stats(error=len(not_found_codes))
             self.set_progress(0.1 + (0.4 * (i + 1) / total_codes))
 
+        if not self.is_running:
+            return
+
         if not_found_codes:
             not_found_str = ",".join(not_found_codes)
             self.log(f"Bulunamayan SAP kodları: {not_found_str} PDM'de yok,", "#f59e0b")
@@ -901,33 +2321,23 @@ class LogicHandler:
         if not sw_app:
             return
 
-        assembly_doc, locked_title, asm_title, pre_open_docs, z_offset = self.init_assembly_doc(sw_app)
-        if not assembly_doc:
+        session = self.init_assembly_doc(sw_app)
+        if not session:
             return
+        if self.fast_insert:
+            self.suspend_assembly_updates(session)
 
         self.set_status("Parçalar ekleniyor...")
 
-        total_files = len(found_files)
-        for i, file_path in enumerate(found_files):
-            if not self.is_running:
-                return
-
-            while self.is_paused and self.is_running:
-                time.sleep(0.5)
-
-            if locked_title:
-                try:
-                    sw_app.ActivateDoc3(locked_title, False, 0, None)
-                except Exception:
-                    pass
-
-            assembly_doc = self.ensure_assembly_doc(sw_app, assembly_doc)
-            if not assembly_doc:
-                self.log("Montaj oturumu kaybedildi.", "#ef4444")
-                return
-
-            success, z_offset = self.add_component_to_assembly(sw_app, assembly_doc, file_path, z_offset, asm_title, pre_open_docs)
-            self.set_progress(0.5 + (0.5 * (i + 1) / total_files))
+        added = self.insert_components_bulk(
+            session, found_files,
+            on_progress=lambda done, total: self.set_progress(0.5 + (0.5 * done / total)),
+        )
+        if added is None or not self.is_running:
+            return
+        if session.suspended_state is not None:
+            self.set_status("Montaj yeniden oluşturuluyor...")
+            self.restore_assembly_updates(session)
 
         self.set_status("Tamamlandı")
         self.set_progress(1.0)
@@ -941,9 +2351,11 @@ class LogicHandler:
         if not sw_app:
             return
 
-        assembly_doc, locked_title, asm_title, pre_open_docs, z_offset = self.init_assembly_doc(sw_app)
-        if not assembly_doc:
+        session = self.init_assembly_doc(sw_app)
+        if not session:
             return
+        if self.fast_insert:
+            self.suspend_assembly_updates(session)
 
         self.set_status("Parçalar aranıyor ve ekleniyor...")
         total_codes = len(codes)
@@ -954,27 +2366,21 @@ class LogicHandler:
         # Initial stats
         self.update_stats(total=total_codes, success=0, error=0)
 
-        for i, code in enumerate(codes):
-            if not self.is_running:
-                return
-
-            while self.is_paused and self.is_running:
-                time.sleep(0.5)
-            
-            # PDM'de ara
-            path = self.search_file_in_pdm(vault, code)
-            
+        # PDM aramaları ve indirmeler arka planda yürür, dosyalar sırayla ve yerelde hazır gelir
+        for i, code, path, is_local in self.prefetch_files(codes, vault):
             if not path:
                 not_found_codes.append(code)
                 self.log(f"Bulunamadı: {code},", "#ef4444")
+                self.record("result", code=code, result="not_found")
                 error_count += 1
                 self.update_stats(error=error_count)
                 self.set_progress(0.1 + (0.9 * (i + 1) / total_codes))
                 continue
             
             # Dosya bulundu, yerelde olduğundan emin ol
-            if not self.ensure_local_file(vault, path):
+            if not is_local:
                 self.log(f"Yerelde bulunamadı: {code},", "#ef4444")
+                self.record("result", code=code, result="not_local", path=path)
                 not_found_codes.append(code)
                 error_count += 1
                 self.update_stats(error=error_count)
@@ -985,18 +2391,12 @@ class LogicHandler:
             self.log(f"Bulundu: {code}", "#2cc985")
 
             # HEMEN MONTAJA EKLE
-            if locked_title:
-                try:
-                    sw_app.ActivateDoc3(locked_title, False, 0, None)
-                except Exception:
-                    pass
-
-            assembly_doc = self.ensure_assembly_doc(sw_app, assembly_doc)
-            if not assembly_doc:
+            if not self.activate_assembly(session):
                 self.log("Montaj oturumu kaybedildi.", "#ef4444")
                 return
 
-            success, z_offset = self.add_component_to_assembly(sw_app, assembly_doc, path, z_offset, asm_title, pre_open_docs)
+            success = self.add_component_to_assembly(session, path)
+            self.record("result", code=code, result="inserted" if success else "insert_failed", path=path)
             if success:
                 added_count += 1
                 self.update_stats(success=added_count)
@@ -1006,6 +2406,12 @@ class LogicHandler:
 
             self.set_progress(0.1 + (0.9 * (i + 1) / total_codes))
 
+        if not self.is_running:
+            return
+        if session.suspended_state is not None:
+            self.set_status("Montaj yeniden oluşturuluyor...")
+            self.restore_assembly_updates(session)
+
         # Özet bilgi
         if not_found_codes:
             not_found_str = ",".join(not_found_codes)
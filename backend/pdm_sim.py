@@ -0,0 +1,628 @@
+"""
+In-process PDM / SolidWorks simulator used for benchmarks and offline development.
+
+Mimics the small subset of the ConisioLib.EdmVault5 and SldWorks.Application
+COM surface that pdm_logic.LogicHandler relies on, with configurable per-call
+latency and call counters so serial and parallel code paths can be compared
+without a real vault or CAD session.
+"""
+import fnmatch
+import os
+import threading
+import time
+
+
+class CallCounter:
+    """
+    Thread-safe COM call counter keyed by method name. If `phase_source` is set
+    (e.g. Profiler.current_phase) calls are also counted per phase.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+        self.by_phase = {}
+        self.phase_source = None
+
+    def hit(self, name):
+        phase = (self.phase_source() if self.phase_source else None) or "other"
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            phase_counts = self.by_phase.setdefault(phase, {})
+            phase_counts[name] = phase_counts.get(name, 0) + 1
+
+    def phase_totals(self):
+        with self._lock:
+            return {phase: sum(counts.values()) for phase, counts in self.by_phase.items()}
+
+    def get(self, name):
+        with self._lock:
+            return self.counts.get(name, 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.by_phase.clear()
+
+
+class SimPosition:
+    def __init__(self, items):
+        self._items = items
+        self._index = 0
+
+    @property
+    def IsNull(self):
+        return self._index >= len(self._items)
+
+    def take(self):
+        item = self._items[self._index]
+        self._index += 1
+        return item
+
+
+class SimFolder:
+    def __init__(self, vault, folder_id, path):
+        self._vault = vault
+        self.ID = folder_id
+        self.LocalPath = path
+        self.Name = os.path.basename(path)
+        self.files = []
+        self.subfolders = []
+
+    def GetFirstFilePosition(self):
+        self._vault.calls.hit("GetFirstFilePosition")
+        return SimPosition(list(self.files))
+
+    def GetNextFile(self, pos):
+        self._vault.calls.hit("GetNextFile")
+        return pos.take()
+
+    def GetFirstSubFolderPosition(self):
+        self._vault.calls.hit("GetFirstSubFolderPosition")
+        return SimPosition(list(self.subfolders))
+
+    def GetNextSubFolder(self, pos):
+        self._vault.calls.hit("GetNextSubFolder")
+        return pos.take()
+
+
+class SimEnumeratorVariable:
+    def __init__(self, sim_file):
+        self._file = sim_file
+
+    def GetVar(self, name, config):
+        vault = self._file._vault
+        vault.calls.hit("GetVar")
+        vault.wait(vault.var_latency)
+        value = self._file.variables.get(name)
+        return value is not None, value
+
+
+class SimFile:
+    def __init__(self, vault, file_id, path, variables=None, version=1):
+        self._vault = vault
+        self.ID = file_id
+        self.Path = path
+        self.Name = os.path.basename(path)
+        self.CurrentVersion = version
+        self.LatestVersion = version
+        self.variables = dict(variables or {})
+        self.local_version = 0
+
+    def GetLocalVersionNo(self, folder_id):
+        self._vault.calls.hit("GetLocalVersionNo")
+        return self.local_version
+
+    def GetParentFolder(self):
+        self._vault.calls.hit("GetParentFolder")
+        return self._vault.folder_for(self.Path)
+
+    def GetFileCopy(self, hwnd, version, folder_id, flags, destination=""):
+        """Write the file to its local path after `download_latency` seconds."""
+        vault = self._vault
+        vault.calls.hit("GetFileCopy")
+        vault.wait(vault.download_latency)
+        try:
+            os.makedirs(os.path.dirname(self.Path), exist_ok=True)
+            with open(self.Path, "wb") as f:
+                f.write(b"\0" * vault.file_size)
+        except OSError:
+            return
+        self.local_version = self.CurrentVersion
+
+    def GetEnumeratorVariable(self):
+        self._vault.calls.hit("GetEnumeratorVariable")
+        return SimEnumeratorVariable(self)
+
+
+class SimSearch:
+    def __init__(self, vault):
+        self._vault = vault
+        self._conditions = []
+        self._any_conditions = []
+        self.FileName = ""
+        self._results = None
+        self._pos = 0
+
+    def AddVariable(self, name, value):
+        self._vault.calls.hit("AddVariable")
+        self._conditions.append((name, str(value)))
+
+    def AddMultiVariableCondition(self, names, value):
+        """OR condition over several variable names (only if the vault supports it)."""
+        if not self._vault.supports_multi_variable:
+            raise AttributeError("AddMultiVariableCondition")
+        self._vault.calls.hit("AddMultiVariableCondition")
+        self._any_conditions.append((list(names), str(value)))
+
+    def _run(self):
+        pattern = (self.FileName or "").lower()
+        matches = []
+        for f in self._vault.files.values():
+            if pattern and not fnmatch.fnmatch(f.Name.lower(), pattern):
+                continue
+            if any(f.variables.get(name) != value for name, value in self._conditions):
+                continue
+            if any(all(f.variables.get(n) != value for n in names) for names, value in self._any_conditions):
+                continue
+            matches.append(f)
+        return matches
+
+    def GetFirstResult(self):
+        self._vault.calls.hit("GetFirstResult")
+        self._vault.wait(self._vault.search_latency)
+        self._results = self._run()
+        self._pos = 0
+        return self.GetNextResult(count=False)
+
+    def GetNextResult(self, count=True):
+        if count:
+            self._vault.calls.hit("GetNextResult")
+        if self._results is None or self._pos >= len(self._results):
+            return None
+        result = self._results[self._pos]
+        self._pos += 1
+        return result
+
+
+class SimVault:
+    """
+    Fake EdmVault5. `files` maps vault paths to SimFile objects; every
+    CreateSearch result costs `search_latency` seconds.
+    """
+
+    def __init__(self, root="C:\\PDM\\PGR2024", search_latency=0.0, supports_multi_variable=False, var_latency=0.0):
+        self.RootFolderPath = root
+        self.IsLoggedIn = True
+        self.search_latency = search_latency
+        self.var_latency = var_latency
+        self.download_latency = 0.0
+        self.file_size = 1024
+        self.supports_multi_variable = supports_multi_variable
+        self.calls = CallCounter()
+        self.files = {}
+        self.folders = {}
+        self._next_id = 1
+
+    def wait(self, seconds):
+        if seconds and seconds > 0:
+            time.sleep(seconds)
+
+    def LoginAuto(self, vault_name, hwnd):
+        self.calls.hit("LoginAuto")
+        self.IsLoggedIn = True
+
+    def add_file(self, rel_path, variables=None, version=1):
+        path = os.path.join(self.RootFolderPath, rel_path)
+        sim_file = SimFile(self, self._next_id, path, variables, version)
+        self._next_id += 1
+        self.files[path] = sim_file
+        self.folder_for(path).files.append(sim_file)
+        return sim_file
+
+    def remove_file(self, path):
+        sim_file = self.files.pop(path, None)
+        if sim_file:
+            self.folder_for(path).files.remove(sim_file)
+        return sim_file
+
+    def folder_for(self, path):
+        return self._get_folder(os.path.dirname(path))
+
+    def _get_folder(self, folder_path):
+        folder = self.folders.get(folder_path)
+        if folder is None:
+            folder = SimFolder(self, len(self.folders) + 1, folder_path)
+            self.folders[folder_path] = folder
+            parent_path = os.path.dirname(folder_path)
+            if folder_path != self.RootFolderPath and parent_path and parent_path != folder_path:
+                self._get_folder(parent_path).subfolders.append(folder)
+        return folder
+
+    def GetFolderFromPath(self, path):
+        self.calls.hit("GetFolderFromPath")
+        if path == self.RootFolderPath:
+            return self._get_folder(path)
+        return self.folders.get(path)
+
+    def CreateSearch(self):
+        self.calls.hit("CreateSearch")
+        return SimSearch(self)
+
+    def GetFileFromPath(self, path, folder=None):
+        self.calls.hit("GetFileFromPath")
+        sim_file = self.files.get(path)
+        if not sim_file:
+            return None, None
+        return sim_file, self.folder_for(path)
+
+
+def build_sap_vault(count, var_name="SAP Numarası", search_latency=0.0, root="C:\\PDM\\PGR2024",
+                    supports_multi_variable=False):
+    """Create a vault with `count` parts; returns (vault, sap_codes)."""
+    vault = SimVault(root=root, search_latency=search_latency, supports_multi_variable=supports_multi_variable)
+    codes = []
+    for i in range(count):
+        code = f"{100000 + i}"
+        vault.add_file(os.path.join("Parcalar", f"P{code}.SLDPRT"), {var_name: code})
+        codes.append(code)
+    return vault, codes
+
+
+def build_tree_vault(count, var_name="SAP Numarası", fanout=20, per_folder=50, var_latency=0.0,
+                     root="C:\\PDM\\PGR2024"):
+    """
+    Synthetic vault tree with `count` CAD files spread over nested folders
+    (`per_folder` files each, `fanout` subfolders per level), plus a drawing
+    per folder that the indexer must skip. Returns (vault, sap_codes).
+    """
+    vault = SimVault(root=root, var_latency=var_latency)
+    codes = []
+    folder_index = 0
+    for i in range(count):
+        if i % per_folder == 0:
+            parts = []
+            n = folder_index
+            while True:
+                parts.append(f"D{n % fanout:02d}")
+                n //= fanout
+                if not n:
+                    break
+            folder = os.path.join(*reversed(parts))
+            vault.add_file(os.path.join(folder, f"Resim{folder_index}.SLDDRW"))
+            folder_index += 1
+        code = f"{100000 + i}"
+        ext = ".SLDASM" if i % 10 == 0 else ".SLDPRT"
+        vault.add_file(os.path.join(folder, f"P{code}{ext}"), {var_name: code})
+        codes.append(code)
+    return vault, codes
+
+
+SIM_DOC_PART = 1
+SIM_DOC_ASSEMBLY = 2
+
+
+class SimDispatch:
+    """
+    Base for fake COM objects returned by property reads. win32com's CDispatch
+    defines __call__ (the default member), so such objects are callable too.
+    """
+
+    def __call__(self, *args):
+        raise TypeError(f"{type(self).__name__} has no default member")
+
+
+class SimFeatureManager(SimDispatch):
+    def __init__(self):
+        self.EnableFeatureTree = True
+        self.EnableFeatureTreeWindow = True
+
+
+class SimModelView(SimDispatch):
+    def __init__(self):
+        self.EnableGraphicsUpdate = True
+
+
+class SimModelDoc(SimDispatch):
+    def __init__(self, app, path, doc_type, title=None):
+        self._app = app
+        self.path = path
+        self.doc_type = doc_type
+        self.title = title or os.path.basename(path)
+        self.configurations = ["Default"]
+        self.FeatureManager = SimFeatureManager()
+        self.ActiveView = SimModelView()
+        self.rebuilds = 0
+
+    def updates_enabled(self):
+        return self.ActiveView.EnableGraphicsUpdate or self.FeatureManager.EnableFeatureTree
+
+    def EditRebuild3(self):
+        self._app.calls.hit("EditRebuild3")
+        self.rebuilds += 1
+        self._app.wait(self._app.rebuild_latency)
+        return True
+
+    def GraphicsRedraw2(self):
+        self._app.calls.hit("GraphicsRedraw2")
+
+    def GetTitle(self):
+        self._app.calls.hit("GetTitle")
+        return self.title
+
+    def GetType(self):
+        self._app.calls.hit("GetType")
+        return self.doc_type
+
+    def GetPathName(self):
+        self._app.calls.hit("GetPathName")
+        return self.path
+
+    def GetConfigurationNames(self):
+        self._app.calls.hit("GetConfigurationNames")
+        return list(self.configurations)
+
+
+SIM_INSERT_APIS = (
+    "InsertExistingComponent3",
+    "AddComponent6",
+    "AddComponent5",
+    "InsertExistingComponent2",
+    "AddComponent4",
+    "AddComponent",
+)
+
+
+class SimComponent:
+    def __init__(self, app, name, path, transform=None):
+        self._app = app
+        self._name = name
+        self.path = path
+        self.transform = transform
+
+    @property
+    def Name2(self):
+        self._app.calls.hit("Name2")
+        return self._name
+
+    def GetPathName(self):
+        self._app.calls.hit("GetPathName")
+        return self.path
+
+
+class SimTransform:
+    def __init__(self, data):
+        self.ArrayData = tuple(data)
+
+    @classmethod
+    def at(cls, x, y, z):
+        return cls((1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0, x, y, z, 1.0, 0.0, 0.0, 0.0))
+
+    @property
+    def position(self):
+        return tuple(self.ArrayData[9:12])
+
+
+class SimMathUtility:
+    def __init__(self, app):
+        self._app = app
+
+    def CreateTransform(self, data):
+        self._app.calls.hit("CreateTransform")
+        return SimTransform(data)
+
+
+class SimAssemblyDoc(SimModelDoc):
+    """Fake assembly; only the insert APIs listed in app.supported_apis succeed."""
+
+    def __init__(self, app, title):
+        super().__init__(app, "", SIM_DOC_ASSEMBLY, title=title)
+        self.components = []
+        self._name_counts = {}
+
+    def GetComponents(self, top_level_only):
+        self._app.calls.hit("GetComponents")
+        return list(self.components)
+
+    def GetComponentCount(self, top_level_only):
+        self._app.calls.hit("GetComponentCount")
+        return len(self.components)
+
+    def _insert(self, api, path, transform=None):
+        app = self._app
+        app.calls.hit(api)
+        if api not in app.supported_apis:
+            raise Exception(f"{api}: Member not found")
+        if not os.path.exists(path):
+            return None
+        if api in app.require_open_apis and not app.is_open(path):
+            return None
+        app.wait(app.insert_latency + app.component_latency)
+        self._after_insert()
+        return self._new_component(path, transform)
+
+    def _after_insert(self):
+        # Güncellemeler açıkken her ekleme çağrısı yeniden çizim + ağaç güncellemesi öder
+        if self.updates_enabled() and not self._app.CommandInProgress:
+            self._app.wait(self._app.redraw_latency)
+            self.rebuilds += 1
+
+    def _new_component(self, path, transform=None):
+        app = self._app
+        stem = os.path.splitext(os.path.basename(path))[0]
+        n = self._name_counts.get(stem, 0) + 1
+        self._name_counts[stem] = n
+        comp = SimComponent(app, f"{stem}-{n}", path, transform)
+        self.components.append(comp)
+        return comp
+
+    def InsertExistingComponent3(self, path, transform, option):
+        return self._insert("InsertExistingComponent3", path, transform)
+
+    def AddComponent6(self, path, config_option, config, transform, use_ref, ref_option):
+        return self._insert("AddComponent6", path, transform)
+
+    def AddComponent5(self, path, config_option, config, x, y, z):
+        return self._insert("AddComponent5", path, SimTransform.at(x, y, z))
+
+    def InsertExistingComponent2(self, path, x, y, z):
+        return self._insert("InsertExistingComponent2", path, SimTransform.at(x, y, z))
+
+    def AddComponent4(self, path, x, y, z):
+        return self._insert("AddComponent4", path, SimTransform.at(x, y, z))
+
+    def AddComponent(self, path, x, y, z):
+        return self._insert("AddComponent", path, SimTransform.at(x, y, z))
+
+    def AddComponents3(self, names, transforms, coord_sys_names):
+        """
+        Bulk insert: one call overhead (insert_latency) plus component_latency per
+        file. Paths in app.reject_paths or missing on disk come back as None.
+        """
+        app = self._app
+        app.calls.hit("AddComponents3")
+        if not app.bulk_insert:
+            raise Exception("AddComponents3: Member not found")
+        names = list(getattr(names, "value", names))
+        transforms = list(getattr(transforms, "value", transforms))
+        if len(transforms) != 16 * len(names):
+            raise Exception("AddComponents3: transform array size mismatch")
+        app.wait(app.insert_latency + app.component_latency * len(names))
+        self._after_insert()
+        result = []
+        for i, path in enumerate(names):
+            if path in app.reject_paths or not os.path.exists(path):
+                result.append(None)
+                continue
+            result.append(self._new_component(path, SimTransform(transforms[16 * i:16 * i + 16])))
+        return result
+
+
+class SimSldWorks:
+    """
+    Fake SldWorks.Application. OpenDoc6 blocks for `open_latency`; the document
+    shows up in GetOpenDocumentNames only `register_latency` seconds later,
+    like a PDM add-in finishing its get in the background.
+    """
+
+    def __init__(self, open_latency=0.0, register_latency=0.0, insert_latency=0.0, supported_apis=SIM_INSERT_APIS,
+                 component_latency=0.0, bulk_insert=True):
+        self.calls = CallCounter()
+        self.open_latency = open_latency
+        self.register_latency = register_latency
+        # insert_latency: çağrı başına sabit maliyet (yeniden oluşturma), component_latency: parça başına
+        self.insert_latency = insert_latency
+        self.component_latency = component_latency
+        self.supported_apis = set(supported_apis)
+        self.bulk_insert = bulk_insert
+        self.reject_paths = set()
+        self.redraw_latency = 0.0
+        self.rebuild_latency = 0.0
+        # Dosya meta verisinden yapılandırma okuma (GetConfigurationNames) süresi
+        self.metadata_latency = 0.0
+        # Yalnızca bileşen belgesi açıkken çalışan ekleme API'leri
+        self.require_open_apis = set()
+        self.peak_open_docs = 0
+        self.CommandInProgress = False
+        self.revision = "31.2.0"
+        self._assembly_count = 0
+        self.Visible = True
+        self.docs = {}
+        self._visible_at = {}
+        self._active = None
+        self._lock = threading.Lock()
+
+    def wait(self, seconds):
+        if seconds and seconds > 0:
+            time.sleep(seconds)
+
+    def _register(self, doc):
+        with self._lock:
+            self.docs[doc.title] = doc
+            self._visible_at[doc.title] = time.monotonic() + self.register_latency
+            self._active = doc
+            self.peak_open_docs = max(self.peak_open_docs, len(self.docs))
+
+    def is_open(self, path):
+        with self._lock:
+            return os.path.basename(path) in self.docs
+
+    def OpenDoc6(self, path, doc_type, options, config, status=None, warnings=None):
+        self.calls.hit("OpenDoc6")
+        self.wait(self.open_latency)
+        title = os.path.basename(path)
+        with self._lock:
+            doc = self.docs.get(title)
+        if doc is None:
+            doc = SimModelDoc(self, path, doc_type)
+            doc.lightweight = bool(options & 128)
+            self._register(doc)
+        return doc
+
+    def OpenDoc(self, path, doc_type):
+        self.calls.hit("OpenDoc")
+        return self.OpenDoc6(path, doc_type, 0, "")
+
+    def GetOpenDocumentNames(self):
+        self.calls.hit("GetOpenDocumentNames")
+        now = time.monotonic()
+        with self._lock:
+            return [d.path or d.title for t, d in self.docs.items() if self._visible_at.get(t, 0) <= now]
+
+    def CloseDoc(self, name):
+        self.calls.hit("CloseDoc")
+        with self._lock:
+            doc = self.docs.pop(name, None) or self.docs.pop(os.path.basename(name), None)
+            if doc is not None:
+                self._visible_at.pop(doc.title, None)
+                if self._active is doc:
+                    self._active = None
+
+    def ActivateDoc3(self, name, use_user_prefs, option, errors):
+        self.calls.hit("ActivateDoc3")
+        with self._lock:
+            doc = self.docs.get(name) or self.docs.get(os.path.basename(name))
+            if doc is not None:
+                self._active = doc
+            return doc
+
+    @property
+    def IActiveDoc2(self):
+        self.calls.hit("IActiveDoc2")
+        return self._active
+
+    @property
+    def ActiveDoc(self):
+        self.calls.hit("ActiveDoc")
+        return self._active
+
+    def NewDocument(self, template, doc_type, width, height):
+        self.calls.hit("NewDocument")
+        self._assembly_count += 1
+        doc = SimAssemblyDoc(self, f"Assem{self._assembly_count}")
+        with self._lock:
+            self.docs[doc.title] = doc
+            self._visible_at[doc.title] = 0
+            self._active = doc
+        return doc
+
+    def GetUserPreferenceStringValue(self, pref):
+        self.calls.hit("GetUserPreferenceStringValue")
+        return ""
+
+    def GetConfigurationNames(self, path):
+        self.calls.hit("GetConfigurationNames(file)")
+        self.wait(self.metadata_latency)
+        return ["Default"] if os.path.exists(path) else None
+
+    def RevisionNumber(self):
+        self.calls.hit("RevisionNumber")
+        return self.revision
+
+    def GetMathUtility(self):
+        self.calls.hit("GetMathUtility")
+        return SimMathUtility(self)
@@ -0,0 +1,171 @@
+"""
+Per-run phase profiler for LogicHandler.
+
+Spans are timed with perf_counter and recorded per phase (search, download, open,
+insert, ...) and per SAP code. summary() gives count/total/p50/p95/max per phase;
+write() stores the whole profile as JSON under PROFILE_DIR so runs can be compared
+across releases.
+"""
+import functools
+import json
+import math
+import os
+import platform
+import threading
+import time
+
+PROFILE_DIR = "profiles"
+PROFILE_KEEP = 50
+PROFILE_SCHEMA = 1
+# Faz başına tutulan en fazla örnek (yüzdelikler için)
+MAX_SAMPLES = 100000
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class _Span:
+    __slots__ = ("profiler", "phase", "key", "start")
+
+    def __init__(self, profiler, phase, key):
+        self.profiler = profiler
+        self.phase = phase
+        self.key = key
+        self.start = 0.0
+
+    def __enter__(self):
+        self.profiler._stack().append(self.phase)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        if stack:
+            stack.pop()
+        self.profiler.record(self.phase, elapsed, self.key, error=exc_type is not None)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.samples = {}
+        self.errors = {}
+        self.per_key = {}
+        self._local = threading.local()
+        # listener(phase, seconds, key, error) is called for every span (e.g. the run journal)
+        self.listener = None
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def current_phase(self):
+        """Innermost open span's phase on the calling thread, or None."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def span(self, phase, key=None):
+        """Context manager timing one `phase` call, attributed to `key` (SAP code or file)."""
+        return _Span(self, phase, key)
+
+    def record(self, phase, seconds, key=None, error=False):
+        with self.lock:
+            samples = self.samples.setdefault(phase, [])
+            if len(samples) < MAX_SAMPLES:
+                samples.append(seconds)
+            if error:
+                self.errors[phase] = self.errors.get(phase, 0) + 1
+            if key:
+                phases = self.per_key.setdefault(key, {})
+                phases[phase] = phases.get(phase, 0.0) + seconds
+        listener = self.listener
+        if listener is not None:
+            try:
+                listener(phase, seconds, key, error)
+            except Exception:
+                pass
+
+    def summary(self):
+        """{phase: {count, total, p50, p95, max, errors}} in seconds."""
+        with self.lock:
+            snapshot = {phase: sorted(values) for phase, values in self.samples.items()}
+            errors = dict(self.errors)
+        result = {}
+        for phase, values in snapshot.items():
+            result[phase] = {
+                "count": len(values),
+                "total": round(sum(values), 4),
+                "p50": round(percentile(values, 50), 4),
+                "p95": round(percentile(values, 95), 4),
+                "max": round(values[-1], 4) if values else 0.0,
+                "errors": errors.get(phase, 0),
+            }
+        return result
+
+    def per_key_summary(self, limit=None):
+        """{key: {phase: total seconds}}, slowest keys first."""
+        with self.lock:
+            items = [(key, dict(phases)) for key, phases in self.per_key.items()]
+        items.sort(key=lambda item: -sum(item[1].values()))
+        if limit:
+            items = items[:limit]
+        return {key: {phase: round(v, 4) for phase, v in phases.items()} for key, phases in items}
+
+    def to_dict(self, **meta):
+        return {
+            "schema": PROFILE_SCHEMA,
+            "started_at": self.started_at,
+            "finished_at": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            **meta,
+            "phases": self.summary(),
+            "per_code": self.per_key_summary(),
+        }
+
+    def write(self, directory=PROFILE_DIR, keep=PROFILE_KEEP, **meta):
+        """Write the profile as JSON; keeps the newest `keep` files. Returns the path."""
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self.started_at))
+        path = os.path.join(directory, f"run-{stamp}-{int(self.started_at * 1000) % 1000:03d}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(**meta), f, indent=2, ensure_ascii=False)
+        if keep:
+            runs = sorted(n for n in os.listdir(directory) if n.startswith("run-") and n.endswith(".json"))
+            for name in runs[:-keep]:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+        return path
+
+
+def profiled(phase, key=None):
+    """
+    Method decorator: time each call as a `phase` span on self.profiler.
+    `key(self, *args)` picks the SAP code / file the span is attributed to.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(self, *args, **kwargs):
+            profiler = getattr(self, "profiler", None)
+            if profiler is None:
+                return fn(self, *args, **kwargs)
+            try:
+                span_key = key(self, *args) if key else None
+            except Exception:
+                span_key = None
+            with profiler.span(phase, span_key):
+                return fn(self, *args, **kwargs)
+        return wrapper
+    return decorate
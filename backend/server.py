@@ -4,9 +4,26 @@ import signal
 import threading
 import queue
 import time
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
-from pdm_logic import LogicHandler, read_vault_path_registry, write_vault_path_registry
+from logstore import LogStore, SpillFile
+from events import (EventBus, BusChannel, EventStream, sse_stream,
+                    EVENT_LOG, EVENT_STATUS, EVENT_PROGRESS, EVENT_STATS, EVENT_RECORD)
+from events import NullChannel
+from journal import RunJournal, list_runs, read_run, recover_runs, JOURNAL_DIR, JOURNAL_KEEP
+from jobs import JobQueue, JOB_RUNNING
+
+# pdm_logic / pdm_cache / pdm_index (COM, SQLite, kayıt defteri) ilk kullanımda veya
+# arka plandaki ısınmada yüklenir; port hemen açılır ve /api/status yanıt verir.
+DEFAULT_PORT = 5000
+PORT_ENV = "PDM_SERVER_PORT"
+# Olay işçisi yayınla uyanır; bu süreler yalnızca çalışma/duraklatma durumunu yoklamak için
+WORKER_WAIT_RUNNING = 0.5
+WORKER_WAIT_IDLE = 5.0
+# Yeni iş başlarken durdurulan ön hazırlığın elindeki indirmeyi bitirmesi için beklenen en uzun süre
+# (yeni işin kendi iş parçacığında, dispatch_lock dışında beklenir)
+PREPARE_STOP_WAIT = 10.0
+
 
 class AutomationServer:
     def __init__(self):
@@ -18,32 +35,67 @@ class AutomationServer:
         self.state = {
             "status": "Sistem Hazır",
             "progress": 0.0,
-            "logs": [],
             "is_running": False,
             "is_paused": False,
-            "vault_path": read_vault_path_registry(),
+            "vault_path": "",
             "stats": {"total": 0, "success": 0, "error": 0}
         }
         
-        # Queues
-        self.log_queue = queue.Queue()
-        self.status_queue = queue.Queue()
-        self.progress_queue = queue.Queue()
-        self.stats_queue = queue.Queue()
+        # Run log: ring buffer with stable sequence numbers (size / spill from config in warm_up)
+        self.log_store = LogStore()
+
+        # Event bus from the logic handler; the channels keep its queue put() interface
+        self.bus = EventBus()
+        self.log_queue = BusChannel(self.bus, EVENT_LOG)
+        self.status_queue = BusChannel(self.bus, EVENT_STATUS)
+        self.progress_queue = BusChannel(self.bus, EVENT_PROGRESS)
+        self.stats_queue = BusChannel(self.bus, EVENT_STATS)
+        self.record_queue = BusChannel(self.bus, EVENT_RECORD)
+
+        # On-disk journal of the current run (journal.py); "run_journal" / "journal_keep" in config
+        self.journal = None
+        self.journal_settings = {"enabled": True, "keep": JOURNAL_KEEP}
+
+        # Job queue (jobs.py): one job runs at a time; run_done is set when its thread ends
+        self.jobs = JobQueue()
+        self.current_job = None
+        self.run_done = None
+        self.dispatch_lock = threading.Lock()
+        # (job, handler, thread) of the queued job being prepared during the current CAD phase
+        self.preparing = None
+        self.job_settings = {"prepare_ahead": True}
+
+        # Push channel for the UI (/api/events)
+        self.events = EventStream()
+        self.published_run_state = (False, False)
         
         # Logic Handler
         self.logic_handler = None
+
+        # Vault-wide SAP index (built in the background on demand); opened by warm_up
+        self.vault_index = None
+
+        # Long-lived vault / SolidWorks connections shared by all runs (connections.py)
+        self.connections = None
+        self.connections_lock = threading.Lock()
+
+        # Background warm-up: registry, caches, COM backend and vault login
+        self.warmup = {"state": "pending", "seconds": None, "steps": {}, "error": None}
+        self.vault_path_loaded = False
         
         # Settings
         self.current_settings = {
             "add_to_existing": False,
-            "stop_on_not_found": True
+            "stop_on_not_found": True,
+            "fast_insert": False,
+            "lightweight": False
         }
         
         # Setup
         self.setup_routes()
         self.setup_background_worker()
         self.setup_signal_handlers()
+        self.start_warmup()
 
     def get_add_to_existing(self):
         return self.current_settings["add_to_existing"]
@@ -51,151 +103,566 @@ class AutomationServer:
     def get_stop_on_not_found(self):
         return self.current_settings["stop_on_not_found"]
 
+    def get_index(self):
+        if self.vault_index is None:
+            from pdm_index import get_vault_index
+            self.vault_index = get_vault_index()
+        return self.vault_index
+
+    def start_index(self):
+        """Start (or incrementally refresh) the vault SAP index in the background."""
+        index = self.get_index()
+        if not index:
+            return False
+        from pdm_logic import try_connect_vault, PDM_VAR_NAMES
+        return index.start(try_connect_vault, PDM_VAR_NAMES)
+
+    def get_index_status(self):
+        index = self.get_index()
+        if not index:
+            return {"state": "unavailable"}
+        return index.get_status()
+
+    def get_connections(self):
+        """Connection pool, or None when "connection_pool" is false in config.json."""
+        with self.connections_lock:
+            if self.connections is None:
+                from pdm_logic import load_config
+                if not load_config().get("connection_pool", True):
+                    return None
+                from connections import get_connection_manager
+                self.connections = get_connection_manager()
+            return self.connections
+
+    def load_vault_path(self):
+        """Read the vault path from the registry once (unless the UI already set one)."""
+        if self.vault_path_loaded:
+            return
+        from pdm_logic import read_vault_path_registry
+        path = read_vault_path_registry()
+        with self.state_lock:
+            if not self.vault_path_loaded:
+                self.state["vault_path"] = path
+                self.vault_path_loaded = True
+
+    def configure_log_store(self):
+        """Apply "log_buffer_size" and "log_spill" (spill entries evicted from the ring to disk)."""
+        from pdm_logic import load_config
+        cfg = load_config()
+        try:
+            self.log_store.resize(int(cfg.get("log_buffer_size", self.log_store.capacity)))
+        except (TypeError, ValueError):
+            pass
+        if cfg.get("log_spill", False) and self.log_store.spill is None:
+            self.log_store.spill = SpillFile()
+
+    def configure_journal(self):
+        """Apply "run_journal" / "journal_keep" and compress journals left open by a crash."""
+        from pdm_logic import load_config
+        cfg = load_config()
+        self.journal_settings["enabled"] = bool(cfg.get("run_journal", True))
+        try:
+            self.journal_settings["keep"] = int(cfg.get("journal_keep", JOURNAL_KEEP))
+        except (TypeError, ValueError):
+            pass
+        active = self.journal.run_id if self.journal else None
+        recovered = recover_runs(JOURNAL_DIR, active=active)
+        if recovered:
+            print(f"Journal: compressed {recovered} unfinished run(s)", flush=True)
+
+    def configure_jobs(self):
+        """Apply "prepare_ahead" (resolve / download the next job during the current CAD phase)."""
+        from pdm_logic import load_config
+        self.job_settings["prepare_ahead"] = bool(load_config().get("prepare_ahead", True))
+
+    def start_journal(self, codes, **meta):
+        if not self.journal_settings["enabled"]:
+            return None
+        try:
+            journal = RunJournal(keep=self.journal_settings["keep"])
+            journal.start(codes=codes, settings=dict(self.current_settings), **meta)
+        except Exception as e:
+            print(f"Journal unavailable: {e}", flush=True)
+            return None
+        self.journal = journal
+        return journal
+
+    def finish_journal(self, **meta):
+        """Write the run_end record (final status and stats) and compress the run's journal."""
+        journal, self.journal = self.journal, None
+        if journal is None:
+            return
+        if self.logic_handler:
+            self.logic_handler.record_queue = None
+        with self.state_lock:
+            meta.setdefault("status", self.state["status"])
+            meta.setdefault("stats", dict(self.state["stats"]))
+        try:
+            journal.finish(**meta)
+        except Exception as e:
+            print(f"Journal error: {e}", flush=True)
+
+    def journal_events(self, batch, log_seqs):
+        journal = self.journal
+        if journal is None:
+            return
+        records = []
+        for event in batch:
+            if event.type == EVENT_RECORD:
+                records.append(event.data)
+            elif event.type == EVENT_LOG:
+                records.append({"type": EVENT_LOG, "t": event.time, "seq": log_seqs.get(event.seq),
+                                "message": event.data.get("message"), "color": event.data.get("color")})
+            else:
+                records.append({"type": event.type, "t": event.time, event.type: event.data})
+        try:
+            journal.write_many(records)
+        except Exception as e:
+            # Disk dolu / izin hatası: çalıştırma günlüksüz devam eder
+            print(f"Journal disabled for this run: {e}", flush=True)
+            self.journal = None
+            if self.logic_handler:
+                self.logic_handler.record_queue = None
+
+    def start_warmup(self):
+        thread = threading.Thread(target=self.warm_up, daemon=True)
+        thread.start()
+
+    def warm_up(self):
+        """
+        Load what the first run needs while the server is already answering: the
+        registry vault path, the SQLite caches and index, the COM stack and the
+        pooled vault logins (plus SolidWorks if it is already running).
+        Set "warm_vault": false in config.json to skip the connections.
+        """
+        started = time.perf_counter()
+        steps = self.warmup["steps"]
+        self.warmup["state"] = "running"
+
+        def step(name, fn):
+            t0 = time.perf_counter()
+            fn()
+            steps[name] = round(time.perf_counter() - t0, 4)
+
+        try:
+            step("registry", self.load_vault_path)
+            step("config", self.configure_log_store)
+            step("journal", self.configure_journal)
+            step("jobs", self.configure_jobs)
+
+            def open_caches():
+                from pdm_cache import get_resolution_cache, get_config_name_cache
+                get_resolution_cache()
+                get_config_name_cache()
+                self.get_index()
+            step("caches", open_caches)
+
+            from pdm_logic import load_config, try_connect_vault
+            if load_config().get("warm_vault", True):
+                def connect():
+                    connections = self.get_connections()
+                    if connections:
+                        if not connections.warm():
+                            print("Warm-up: no PDM/SolidWorks connection could be opened", flush=True)
+                        return
+                    # Havuz kapalı: en azından PDM istemcisi oturumu açık kalsın
+                    from backends import get_backend
+                    backend = get_backend()
+                    co_initialized = backend.co_initialize()
+                    try:
+                        if try_connect_vault() is None:
+                            print("Warm-up: vault connection failed", flush=True)
+                    finally:
+                        if co_initialized:
+                            backend.co_uninitialize()
+                step("vault", connect)
+            self.warmup["state"] = "ready"
+        except Exception as e:
+            self.warmup["state"] = "failed"
+            self.warmup["error"] = str(e)
+            print(f"Warm-up error: {e}", flush=True)
+        self.warmup["seconds"] = round(time.perf_counter() - started, 4)
+        print(f"Warm-up {self.warmup['state']} in {self.warmup['seconds']:.2f}s {steps}", flush=True)
+
+    def publish_jobs(self):
+        self.events.publish("jobs", self.jobs.summary())
+
+    def submit_job(self, data):
+        """Queue a job from a /api/start or /api/jobs body and start it if nothing runs; None without codes."""
+        codes_text = data.get('codes', [])
+        # Handle both string (newline separated) and list
+        if isinstance(codes_text, str):
+            codes = [c.strip() for c in codes_text.split('\n') if c.strip()]
+        else:
+            codes = codes_text
+        if not codes:
+            return None
+        settings = {
+            "add_to_existing": data.get('addToExisting', False),
+            "stop_on_not_found": data.get('stopOnNotFound', True),
+            "fast_insert": bool(data.get('fastInsert', False)),
+            "lightweight": bool(data.get('lightweight', False)),
+        }
+        try:
+            priority = int(data.get('priority', 0))
+        except (TypeError, ValueError):
+            priority = 0
+        job = self.jobs.submit(codes, settings, priority, data.get('name'))
+        self.dispatch_job()
+        self.publish_jobs()
+        return job
+
+    def dispatch_job(self):
+        """Start the next queued job unless one is running; returns it or None."""
+        with self.dispatch_lock:
+            if self.current_job is not None or self.run_done is not None:
+                return None
+            job = self.jobs.pop()
+            if job is None:
+                return None
+            self.current_job = job
+            try:
+                self.start_job(job)
+            except Exception as e:
+                print(f"Job {job.id} could not start: {e}", flush=True)
+                self.run_done = None
+                self.current_job = None
+                self.jobs.finish(job, status="Hata")
+                return None
+            return job
+
+    def start_job(self, job):
+        self.current_settings.update(job.settings)
+        # Yalnızca durdurma sinyali; bekleme ve devralma run_job'da, kilit dışında
+        preparing = self.stop_preparing()
+        # Drop undelivered events of the previous run to prevent stale data
+        self.bus.clear()
+
+        with self.state_lock:
+            # Reset state
+            self.log_store.clear()
+            self.state["progress"] = 0.0
+            self.state["status"] = "Başlatılıyor..."
+            self.state["is_running"] = True
+            self.state["is_paused"] = False
+            self.state["stats"] = {"total": len(job.codes), "success": 0, "error": 0}
+
+        # Yeni çalıştırmanın logları "reset" olayından sonra yayınlanır
+        self.publish_reset(is_running=True, is_paused=False)
+
+        from pdm_logic import LogicHandler
+        self.load_vault_path()
+        handler = LogicHandler(
+            self.log_queue,
+            self.status_queue,
+            self.progress_queue,
+            self.get_add_to_existing,
+            self.get_stop_on_not_found,
+            self.stats_queue,
+            vault_path=self.state["vault_path"]
+        )
+
+        handler.connections = self.get_connections()
+        handler.fast_insert = self.current_settings["fast_insert"]
+        handler.lightweight = self.current_settings["lightweight"]
+        journal = self.start_journal(job.codes, job=job.id, priority=job.priority, prepare=job.prepare)
+        if journal:
+            handler.record_queue = self.record_queue
+            job.run_id = journal.run_id
+        handler.log(f"İş #{job.id} başlatıldı ({len(job.codes)} kod).", "#94a3b8")
+
+        self.logic_handler = handler
+        done = threading.Event()
+        self.run_done = done
+        thread = threading.Thread(target=self.run_job, args=(handler, job, done, preparing), daemon=True)
+        thread.start()
+
+    def run_job(self, handler, job, done, preparing=None):
+        try:
+            if preparing is not None:
+                self.take_over_preparation(handler, job, preparing)
+                if job.cancel_requested:
+                    handler.set_status("İptal")
+                    return
+            handler.run_process(job.codes)
+        finally:
+            done.set()
+            # İşçi beklemeden uyanır; sıradaki iş boşluk bırakmadan başlar
+            self.bus.wake()
+
+    def complete_job(self):
+        """Record the finished run on its job, then start the next one."""
+        job = self.current_job
+        if job is not None:
+            with self.state_lock:
+                status = self.state["status"]
+                stats = dict(self.state["stats"])
+            self.jobs.finish(job, status=status, stats=stats)
+        # Durum okunduktan sonra; aradaki bir gönderim yeni işi ancak şimdi başlatabilir
+        self.current_job = None
+        self.dispatch_job()
+        self.publish_jobs()
+
+    def cancel_job(self, job_id):
+        """Cancel a queued job or stop the running one; returns the job or None if unknown."""
+        job = self.jobs.cancel(job_id)
+        if job is None:
+            return None
+        if job is self.current_job and self.logic_handler:
+            self.logic_handler.stop_process()
+            with self.state_lock:
+                self.state["is_running"] = False
+            self.publish_run_state()
+        preparing = self.preparing
+        if preparing is not None and preparing[0] is job:
+            self.stop_preparing()
+        self.publish_jobs()
+        return job
+
+    def prepare_next_job(self):
+        """
+        Once the current job is only inserting into SolidWorks, resolve and download the
+        next queued job in the background so that it starts with its files already local.
+        """
+        if not self.job_settings["prepare_ahead"] or self.run_done is None:
+            return
+        handler = self.logic_handler
+        # Çalışan işin arama/indirme hattı başlayıp bitmeden başlanmaz: kasa bağlantıları onda
+        if (handler is None or handler.assembly_session is None
+                or not handler.prefetch_threads or handler.is_prefetching()):
+            return
+        if self.preparing is not None and self.preparing[2].is_alive():
+            return
+        job = self.jobs.peek()
+        if job is None or (job.prepare is not None and job.prepare.get("state") != "stopped"):
+            return
+        from pdm_logic import LogicHandler
+        sink = NullChannel()
+        settings = job.settings
+        prep = LogicHandler(sink, sink, sink, lambda: settings["add_to_existing"],
+                            lambda: settings["stop_on_not_found"], sink, vault_path=self.state["vault_path"])
+        prep.connections = self.get_connections()
+        job.prepare = {"state": "running", "codes": len(job.codes), "found": 0, "local": 0}
+        thread = threading.Thread(target=self.run_prepare, args=(job, prep), daemon=True)
+        self.preparing = (job, prep, thread)
+        thread.start()
+
+    def run_prepare(self, job, handler):
+        try:
+            job.prepare = handler.prepare_files(job.codes)
+        except Exception as e:
+            job.prepare = {"state": "failed", "error": str(e)}
+        self.publish_jobs()
+
+    def stop_preparing(self):
+        """Signal the running preparation to stop; returns its (job, handler, thread) or None."""
+        preparing, self.preparing = self.preparing, None
+        if preparing is not None:
+            preparing[1].stop_process()
+        return preparing
+
+    def take_over_preparation(self, handler, job, preparing):
+        """
+        Wait (up to PREPARE_STOP_WAIT s) for a stopped preparation so its vault connections
+        are back in the pool; if it was preparing `job`, hand its resolved and downloaded
+        codes to the job's handler. Runs on the job's thread, outside dispatch_lock.
+        """
+        prep_job, prep, thread = preparing
+        thread.join(PREPARE_STOP_WAIT)
+        if prep_job is not job or thread.is_alive():
+            return
+        adopted = handler.adopt_preparation(prep)
+        if job.prepare and job.prepare.get("found"):
+            handler.log(f"Ön hazırlık: {job.prepare['found']}/{job.prepare['codes']} kod bulundu, "
+                        f"{job.prepare['local']} dosya yerelde ({job.prepare['seconds']:.1f}s), "
+                        f"{adopted} kod devralındı", "#94a3b8")
+
     def setup_signal_handlers(self):
         signal.signal(signal.SIGINT, self.shutdown)
         signal.signal(signal.SIGTERM, self.shutdown)
 
     def shutdown(self, signum, frame):
         print(f"Received signal {signum}. Shutting down...", flush=True)
+        self.jobs.cancel_queued()
+        self.stop_preparing()
         if self.logic_handler:
             self.logic_handler.stop_process()
+        if self.connections:
+            self.connections.close()
+        self.finish_journal(status="interrupted")
+        if self.log_store.spill is not None:
+            self.log_store.spill.close()
         sys.exit(0)
 
+    def get_run_state(self):
+        if self.logic_handler:
+            return self.logic_handler.is_running, self.logic_handler.is_paused
+        with self.state_lock:
+            return self.state["is_running"], self.state["is_paused"]
+
+    def publish_run_state(self, force=False):
+        run_state = self.get_run_state()
+        if force or run_state != self.published_run_state:
+            self.published_run_state = run_state
+            self.events.publish("state", {"is_running": run_state[0], "is_paused": run_state[1]})
+
+    def publish_reset(self, **overrides):
+        """Tell stream clients the log list was cleared; carries the new full state."""
+        snapshot = self.build_status()
+        snapshot.update(overrides)
+        self.published_run_state = (snapshot["is_running"], snapshot["is_paused"])
+        self.events.publish("reset", snapshot)
+
+    def apply_events(self, batch):
+        """Apply one drained bus batch to the state under a single lock, then push it to the UI."""
+        published = []
+        # bus sırası -> log sıra numarası, günlük kayıtları UI'daki numarayı taşır
+        log_seqs = {}
+        with self.state_lock:
+            for event in batch:
+                if event.type == EVENT_LOG:
+                    seq = self.log_store.append(event.data)
+                    log_seqs[event.seq] = seq
+                    published.append((EVENT_LOG, {"index": seq, **event.data}))
+                elif event.type == EVENT_STATUS:
+                    self.state["status"] = event.data
+                    published.append((EVENT_STATUS, {"status": event.data}))
+                elif event.type == EVENT_PROGRESS:
+                    self.state["progress"] = event.data
+                    published.append((EVENT_PROGRESS, {"progress": event.data}))
+                elif event.type == EVENT_STATS:
+                    # Explicitly update fields to ensure no overwrite issues
+                    current = self.state["stats"]
+                    current["total"] = event.data.get("total", current["total"])
+                    current["success"] = event.data.get("success", current["success"])
+                    current["error"] = event.data.get("error", current["error"])
+                    published.append((EVENT_STATS, dict(current)))
+        for event_type, data in published:
+            self.events.publish(event_type, data)
+        self.journal_events(batch, log_seqs)
+
     def setup_background_worker(self):
         def worker():
             print("Background worker started", flush=True)
             while True:
                 try:
-                    # Logs
-                    while not self.log_queue.empty():
-                        log_entry = self.log_queue.get_nowait()
-                        with self.state_lock:
-                            self.state["logs"].append(log_entry)
-                            if len(self.state["logs"]) > 1000:
-                                self.state["logs"].pop(0)
-                    
-                    # Status
-                    while not self.status_queue.empty():
-                        status = self.status_queue.get_nowait()
-                        with self.state_lock:
-                            self.state["status"] = status
-                    
-                    # Progress
-                    while not self.progress_queue.empty():
-                        progress = self.progress_queue.get_nowait()
-                        with self.state_lock:
-                            self.state["progress"] = progress
-                    
-                    # Stats
-                    while not self.stats_queue.empty():
-                        new_stats = self.stats_queue.get_nowait()
-                        with self.state_lock:
-                            # Explicitly update fields to ensure no overwrite issues
-                            current = self.state["stats"]
-                            current["total"] = new_stats.get("total", current["total"])
-                            current["success"] = new_stats.get("success", current["success"])
-                            current["error"] = new_stats.get("error", current["error"])
-                            print(f"Server stats updated: {self.state['stats']}", flush=True)
-                        
-                    time.sleep(0.1)
+                    running = self.run_done is not None
+                    batch = self.bus.drain(WORKER_WAIT_RUNNING if running else WORKER_WAIT_IDLE)
+                    if batch:
+                        self.apply_events(batch)
+                    if self.run_done is not None and self.run_done.is_set():
+                        # Çalıştırma bitti: kalan olaylar da günlüğe girsin, sonra dosya kapanır
+                        batch = self.bus.drain(0)
+                        while batch:
+                            self.apply_events(batch)
+                            batch = self.bus.drain(0)
+                        self.finish_journal()
+                        self.run_done = None
+                        self.publish_run_state()
+                        self.complete_job()
+                    self.prepare_next_job()
+                    self.publish_run_state()
                 except Exception as e:
                     print(f"Worker error: {e}", flush=True)
         
         thread = threading.Thread(target=worker, daemon=True)
         thread.start()
 
+    def build_status(self, since_index=0):
+        """
+        Full state for /api/status and the /api/events snapshot. Logs are the entries
+        with sequence number >= since_index; "since" is the number of the first one
+        returned and "last_log_index" the next number to ask for.
+        """
+        with self.state_lock:
+            response = {
+                "status": self.state["status"],
+                "progress": self.state["progress"],
+                "is_running": self.state["is_running"],
+                "is_paused": self.state["is_paused"],
+                "vault_path": self.state["vault_path"],
+                "stats": dict(self.state.get("stats", {"total": 0, "success": 0, "error": 0})),
+                "warmup": self.warmup["state"],
+                "jobs": self.jobs.summary()
+            }
+
+        logs, first, end, truncated = self.log_store.since(since_index)
+        response["logs"] = logs
+        response["since"] = first
+        response["last_log_index"] = end
+        # İstenen satırların bir kısmı halkadan düşmüş (ve varsa diske yazılmış)
+        response["logs_truncated"] = truncated
+
+        # Update running state from logic handler if available
+        if self.logic_handler:
+            response["is_running"] = self.logic_handler.is_running
+            response["is_paused"] = self.logic_handler.is_paused
+
+        return response
+
     def setup_routes(self):
         @self.app.route('/api/status', methods=['GET'])
         def get_status():
             since_index = request.args.get('since', 0, type=int)
-            
-            with self.state_lock:
-                response = {
-                    "status": self.state["status"],
-                    "progress": self.state["progress"],
-                    "is_running": self.state["is_running"],
-                    "is_paused": self.state["is_paused"],
-                    "vault_path": self.state["vault_path"],
-                    "stats": self.state.get("stats", {"total": 0, "success": 0, "error": 0})
-                }
-                
-                if since_index < len(self.state["logs"]):
-                    response["logs"] = self.state["logs"][since_index:]
-                else:
-                    response["logs"] = []
-                    
-                response["last_log_index"] = len(self.state["logs"])
-            
-            # Update running state from logic handler if available
-            if self.logic_handler:
-                response["is_running"] = self.logic_handler.is_running
-                response["is_paused"] = self.logic_handler.is_paused
-                
-            return jsonify(response)
+            return jsonify(self.build_status(since_index))
+
+        @self.app.route('/api/events', methods=['GET'])
+        def stream_events():
+            since_index = request.args.get('since', 0, type=int)
+            last_id = request.headers.get('Last-Event-ID', type=int)
+            generator = sse_stream(self.events, lambda: self.build_status(since_index), last_id)
+            return Response(stream_with_context(generator), mimetype='text/event-stream',
+                            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
         @self.app.route('/api/start', methods=['POST'])
         def start_process():
-            data = request.json
-            codes_text = data.get('codes', [])
-            # Handle both string (newline separated) and list
-            if isinstance(codes_text, str):
-                codes = [c.strip() for c in codes_text.split('\n') if c.strip()]
-            else:
-                codes = codes_text
-            
-            self.current_settings["add_to_existing"] = data.get('addToExisting', False)
-            self.current_settings["stop_on_not_found"] = data.get('stopOnNotFound', True)
-            
-            if not codes:
+            # Bir iş çalışıyorsa yenisi reddedilmez, kuyruğa alınır
+            job = self.submit_job(request.json or {})
+            if job is None:
                 return jsonify({"error": "No codes provided"}), 400
-                
-            if self.logic_handler and self.logic_handler.is_running:
-                return jsonify({"error": "Process already running"}), 400
-            
-            # Clear queues to prevent stale data
-            with self.stats_queue.mutex:
-                self.stats_queue.queue.clear()
-            with self.log_queue.mutex:
-                self.log_queue.queue.clear()
-            with self.status_queue.mutex:
-                self.status_queue.queue.clear()
-            with self.progress_queue.mutex:
-                self.progress_queue.queue.clear()
-                
-            with self.state_lock:
-                # Reset state
-                self.state["logs"] = []
-                self.state["progress"] = 0.0
-                self.state["status"] = "Başlatılıyor..."
-                self.state["is_running"] = True
-                self.state["is_paused"] = False
-                self.state["stats"] = {"total": len(codes), "success": 0, "error": 0}
-            
-            self.logic_handler = LogicHandler(
-                self.log_queue, 
-                self.status_queue, 
-                self.progress_queue, 
-                self.get_add_to_existing, 
-                self.get_stop_on_not_found,
-                self.stats_queue
-            )
-            
-            if self.state["vault_path"]:
-                self.logic_handler.vault_path = self.state["vault_path"]
-                
-            thread = threading.Thread(target=self.logic_handler.run_process, args=(codes,), daemon=True)
-            thread.start()
-            
-            return jsonify({"message": "Started"})
+            if job.state == JOB_RUNNING:
+                return jsonify({"message": "Started", "job": job.to_dict()})
+            return jsonify({"message": "Queued", "job": job.to_dict(), "position": self.jobs.position(job)})
+
+        @self.app.route('/api/jobs', methods=['GET', 'POST'])
+        def handle_jobs():
+            if request.method == 'POST':
+                job = self.submit_job(request.json or {})
+                if job is None:
+                    return jsonify({"error": "No codes provided"}), 400
+                return jsonify({"job": job.to_dict(), "position": self.jobs.position(job)}), 201
+            return jsonify(self.jobs.to_dict())
+
+        @self.app.route('/api/jobs/<int:job_id>', methods=['GET', 'POST'])
+        def handle_job(job_id):
+            job = self.jobs.get(job_id)
+            if job is None:
+                return jsonify({"error": f"Unknown job: {job_id}"}), 404
+            if request.method == 'POST':
+                action = (request.json or {}).get('action', 'cancel')
+                if action != 'cancel':
+                    return jsonify({"error": f"Unknown action: {action}"}), 400
+                self.cancel_job(job_id)
+                return jsonify({"message": "Cancelled", "job": job.to_dict()})
+            return jsonify({**job.to_dict(codes=True), "position": self.jobs.position(job)})
 
         @self.app.route('/api/stop', methods=['POST'])
         def stop_process():
+            # {"all": true}: kuyruktaki işler de iptal edilir
+            cancelled = self.jobs.cancel_queued() if (request.get_json(silent=True) or {}).get('all') else 0
+            if cancelled:
+                self.stop_preparing()
+                self.publish_jobs()
+            if self.current_job is not None:
+                self.cancel_job(self.current_job.id)
+                return jsonify({"message": "Stopping...", "cancelled": cancelled})
             if self.logic_handler:
                 self.logic_handler.stop_process()
                 with self.state_lock:
                     self.state["is_running"] = False
-                return jsonify({"message": "Stopping..."})
-            return jsonify({"message": "Not running"})
+                self.publish_run_state()
+                return jsonify({"message": "Stopping...", "cancelled": cancelled})
+            return jsonify({"message": "Not running", "cancelled": cancelled})
 
         @self.app.route('/api/pause', methods=['POST'])
         def pause_process():
@@ -203,6 +670,7 @@ class AutomationServer:
                 self.logic_handler.pause_process()
                 with self.state_lock:
                     self.state["is_paused"] = True
+                self.publish_run_state()
                 return jsonify({"message": "Pausing..."})
             return jsonify({"message": "Not running"})
 
@@ -212,6 +680,7 @@ class AutomationServer:
                 self.logic_handler.resume_process()
                 with self.state_lock:
                     self.state["is_paused"] = False
+                self.publish_run_state()
                 return jsonify({"message": "Resuming..."})
             return jsonify({"message": "Not running"})
 
@@ -221,28 +690,147 @@ class AutomationServer:
                 path = request.json.get('path', '')
                 with self.state_lock:
                     self.state["vault_path"] = path
+                    self.vault_path_loaded = True
                 if self.logic_handler:
                     self.logic_handler.set_vault_path(path)
                 else:
+                    from pdm_logic import write_vault_path_registry
                     write_vault_path_registry(path)
+                self.events.publish("vault_path", {"vault_path": path})
                 return jsonify({"path": path})
             else:
+                self.load_vault_path()
                 with self.state_lock:
                     return jsonify({"path": self.state["vault_path"]})
 
+        @self.app.route('/api/cache', methods=['GET', 'POST'])
+        def handle_cache():
+            from pdm_cache import get_resolution_cache
+            cache = get_resolution_cache()
+            if not cache:
+                return jsonify({"error": "Cache unavailable"}), 503
+            if request.method == 'POST':
+                data = request.json or {}
+                action = data.get('action', 'purge')
+                if action != 'purge':
+                    return jsonify({"error": f"Unknown action: {action}"}), 400
+                code = data.get('code')
+                if code:
+                    cache.invalidate(code)
+                    return jsonify({"message": "Invalidated", "code": code, "stats": cache.get_stats()})
+                removed = cache.purge()
+                return jsonify({"message": "Purged", "removed": removed, "stats": cache.get_stats()})
+            return jsonify(cache.get_stats())
+
+        @self.app.route('/api/metrics', methods=['GET'])
+        def get_metrics():
+            if not self.logic_handler:
+                return jsonify({"phases": {}, "slowest_codes": {}})
+            top = request.args.get('top', 20, type=int)
+            return jsonify(self.logic_handler.get_metrics(top=top))
+
+        @self.app.route('/api/config-cache', methods=['GET', 'POST'])
+        def handle_config_cache():
+            from pdm_cache import get_config_name_cache
+            cache = get_config_name_cache()
+            if not cache:
+                return jsonify({"error": "Cache unavailable"}), 503
+            if request.method == 'POST':
+                action = (request.json or {}).get('action', 'purge')
+                if action != 'purge':
+                    return jsonify({"error": f"Unknown action: {action}"}), 400
+                removed = cache.purge()
+                return jsonify({"message": "Purged", "removed": removed, "stats": cache.get_stats()})
+            return jsonify(cache.get_stats())
+
+        @self.app.route('/api/connections', methods=['GET', 'POST'])
+        def handle_connections():
+            connections = self.get_connections()
+            if not connections:
+                return jsonify({"error": "Connection pool disabled"}), 503
+            if request.method == 'POST':
+                action = (request.json or {}).get('action', 'reconnect')
+                if action == 'reconnect':
+                    connections.reset((request.json or {}).get('kind'))
+                    return jsonify({"message": "Reconnecting on next use", "status": connections.get_status()})
+                if action == 'warm':
+                    threading.Thread(target=connections.warm, daemon=True).start()
+                    return jsonify({"message": "Warming", "status": connections.get_status()})
+                return jsonify({"error": f"Unknown action: {action}"}), 400
+            return jsonify(connections.get_status())
+
+        @self.app.route('/api/runs', methods=['GET'])
+        def get_runs():
+            journal = self.journal
+            return jsonify({"active": journal.run_id if journal else None,
+                            "enabled": self.journal_settings["enabled"],
+                            "runs": list_runs(JOURNAL_DIR)})
+
+        @self.app.route('/api/runs/<run_id>', methods=['GET'])
+        def get_run(run_id):
+            journal = self.journal
+            if journal is not None and journal.run_id == run_id:
+                journal.flush()
+            types = {t for t in request.args.get('type', '').split(',') if t} or None
+            lines = read_run(run_id, JOURNAL_DIR, types)
+            try:
+                # İlk satır burada okunur ki bilinmeyen kimlik 404 dönsün
+                first = next(lines, None)
+            except KeyError:
+                return jsonify({"error": f"Unknown run: {run_id}"}), 404
+
+            def generate():
+                if first is not None:
+                    yield first
+                yield from lines
+            return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+        @self.app.route('/api/index', methods=['GET', 'POST'])
+        def handle_index():
+            if request.method == 'POST':
+                if not self.get_index():
+                    return jsonify({"error": "Index unavailable"}), 503
+                action = (request.json or {}).get('action', 'start')
+                if action == 'start':
+                    if not self.start_index():
+                        return jsonify({"error": "Indexing already running", "status": self.get_index_status()}), 400
+                    return jsonify({"message": "Indexing started", "status": self.get_index_status()})
+                if action == 'stop':
+                    self.vault_index.stop()
+                    return jsonify({"message": "Stopping...", "status": self.get_index_status()})
+                if action == 'clear':
+                    if self.vault_index.is_running():
+                        return jsonify({"error": "Indexing running"}), 400
+                    self.vault_index.clear()
+                    return jsonify({"message": "Cleared", "status": self.get_index_status()})
+                return jsonify({"error": f"Unknown action: {action}"}), 400
+            return jsonify(self.get_index_status())
+
+        @self.app.route('/api/debug/stats', methods=['GET'])
+        def debug_stats():
+            stats = self.logic_handler.get_debug_stats() if self.logic_handler else {}
+            stats = dict(stats or {})
+            stats["events"] = {"bus": self.bus.get_stats(), "stream": self.events.get_stats(),
+                               "logs": self.log_store.get_stats(),
+                               "journal": self.journal.get_stats() if self.journal else None}
+            return jsonify(stats)
+
         @self.app.route('/api/clear', methods=['POST'])
         def clear_logs():
             with self.state_lock:
-                self.state["logs"] = []
+                self.log_store.clear()
                 self.state["progress"] = 0.0
                 self.state["status"] = "Hazır"
                 self.state["stats"] = {"total": 0, "success": 0, "error": 0}
+            self.publish_reset()
             return jsonify({"message": "Cleared"})
 
-    def run(self):
-        print("Starting Automation Server on port 5000...", flush=True)
+    def run(self, port=None):
+        if port is None:
+            port = int(os.environ.get(PORT_ENV, DEFAULT_PORT))
+        print(f"Starting Automation Server on port {port}...", flush=True)
         # use_reloader=False is important for signal handling and to avoid double execution
-        self.app.run(port=5000, use_reloader=False)
+        self.app.run(port=port, use_reloader=False)
 
 if __name__ == '__main__':
     # Ensure stdout is unbuffered for Electron to capture logs immediately
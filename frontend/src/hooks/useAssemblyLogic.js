@@ -83,54 +83,112 @@ export const useAssemblyLogic = () => {
     }
   };
 
-  // Poll status
+  // Live updates: server-sent events (/api/events); /api/status polling as fallback
   useEffect(() => {
-    const interval = setInterval(async () => {
-      try {
-        const res = await axios.get(`${API_URL}/status`, {
-          params: { since: lastLogIndexRef.current }
-        });
-
-        const data = res.data;
+    let source = null;
+    let pollTimer = null;
+    let closed = false;
+
+    // entries[0] is log number firstIndex on the server; already shown ones are skipped
+    const appendLogs = (entries, firstIndex) => {
+      if (!entries || entries.length === 0) return;
+      const fresh = entries.slice(Math.max(0, lastLogIndexRef.current - firstIndex));
+      if (fresh.length === 0) return;
+      const normalized = fresh.map(normalizeLog);
+      normalized.forEach((log) => applyLogImpact(log.message));
+      setLogs((prev) => [...prev, ...normalized]);
+      lastLogIndexRef.current = firstIndex + entries.length;
+    };
 
-        // Sync running/paused/status from backend
-        if (data.is_running) {
-          setIsRunning(true);
-          setIsPaused(!!data.is_paused);
-          if (data.is_paused) {
-            setStatus(STATUS.PAUSED);
-          } else {
-            setStatus(data.status || STATUS.RUNNING);
-          }
-        } else {
-          setIsRunning(false);
-          setIsPaused(false);
-          // Status: prefer backend status, else keep READY unless previous was DONE
+    const applyRunState = (data) => {
+      // Sync running/paused/status from backend
+      if (data.is_running) {
+        setIsRunning(true);
+        setIsPaused(!!data.is_paused);
+        if (data.is_paused) {
+          setStatus(STATUS.PAUSED);
+        } else if (data.status !== undefined) {
+          setStatus(data.status || STATUS.RUNNING);
+        }
+      } else {
+        setIsRunning(false);
+        setIsPaused(false);
+        // Status: prefer backend status, else keep READY unless previous was DONE
+        if (data.status !== undefined) {
           setStatus(data.status || STATUS.READY);
         }
+      }
+    };
 
-        setProgress(data.progress);
+    const applySnapshot = (data, since) => {
+      applyRunState(data);
+      setProgress(data.progress);
+      if (data.stats) {
+        setStats(data.stats);
+      }
+      if (data.vault_path) {
+        setVaultPath((prev) => prev || data.vault_path);
+      }
+      if (data.logs_truncated) {
+        // Server ring buffer already dropped some of the lines this client had not seen
+        setLogs((prev) => [...prev, { message: 'Bazı eski log satırları gösterilemedi.', timestamp: Date.now() / 1000, color: '#f59e0b' }]);
+      }
+      appendLogs(data.logs, data.since ?? since);
+    };
 
-        if (data.stats) {
-          setStats(data.stats);
+    const startPolling = () => {
+      if (pollTimer || closed) return;
+      pollTimer = setInterval(async () => {
+        const since = lastLogIndexRef.current;
+        try {
+          const res = await axios.get(`${API_URL}/status`, { params: { since } });
+          applySnapshot(res.data, since);
+        } catch (err) {
+          console.error('Polling error', err);
         }
+      }, 500);
+    };
 
-        if (data.vault_path && !vaultPath) {
-          setVaultPath(data.vault_path);
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+    } else {
+      source = new EventSource(`${API_URL}/events?since=${lastLogIndexRef.current}`);
+      const on = (type, handler) => {
+        source.addEventListener(type, (event) => {
+          try {
+            handler(JSON.parse(event.data));
+          } catch (err) {
+            console.error('Event error', type, err);
+          }
+        });
+      };
+      on('snapshot', (data) => applySnapshot(data, data.since));
+      on('reset', (data) => {
+        lastLogIndexRef.current = 0;
+        applySnapshot(data, 0);
+      });
+      on('log', (data) => appendLogs([data], data.index));
+      on('status', (data) => setStatus(data.status));
+      on('progress', (data) => setProgress(data.progress));
+      on('stats', (data) => setStats(data));
+      on('state', applyRunState);
+      on('vault_path', (data) => setVaultPath(data.vault_path));
+      source.onerror = () => {
+        // Network errors are retried by EventSource itself; CLOSED means the server has no stream
+        if (source && source.readyState === EventSource.CLOSED) {
+          source.close();
+          source = null;
+          startPolling();
         }
+      };
+    }
 
-        if (data.logs && data.logs.length > 0) {
-          const normalized = data.logs.map(normalizeLog);
-          normalized.forEach((log) => applyLogImpact(log.message));
-          setLogs((prev) => [...prev, ...normalized]);
-          lastLogIndexRef.current += normalized.length;
-        }
-      } catch (err) {
-        console.error('Polling error', err);
-      }
-    }, 500);
-    return () => clearInterval(interval);
-  }, [vaultPath]);
+    return () => {
+      closed = true;
+      if (source) source.close();
+      if (pollTimer) clearInterval(pollTimer);
+    };
+  }, []);
 
   // Clear backend state on mount if persistence is disabled
   useEffect(() => {
@@ -216,11 +274,15 @@ export const useAssemblyLogic = () => {
     setLogs((prev) => [...prev, { message: 'İşlem başlatılıyor...', timestamp: Date.now() / 1000, color: 'var(--text-secondary)' }]);
 
     try {
-      await axios.post(`${API_URL}/start`, {
+      const { data } = await axios.post(`${API_URL}/start`, {
         codes: codeList,
         addToExisting,
         stopOnNotFound
       });
+      // Başka bir iş çalışıyorsa sunucu yenisini kuyruğa alır
+      if (data?.message === 'Queued') {
+        setLogs((prev) => [...prev, { message: `İş kuyruğa alındı (#${data.job.id}, sıra ${data.position}).`, timestamp: Date.now() / 1000, color: '#94a3b8' }]);
+      }
     } catch (err) {
       setIsRunning(false);
       const errorMessage = err.response?.data?.error || err.response?.data?.message || err.message || 'Bilinmeyen hata';